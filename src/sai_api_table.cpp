@@ -0,0 +1,65 @@
+#include <iostream>
+
+#include "sai_api_table.h"
+
+void *gSaiApiTable[SAI_API_MAX];
+sai_status_t gSaiApiStatus[SAI_API_MAX];
+std::recursive_mutex gSaiMutex;
+bool gSaiSerialize = true;
+
+// Every API used by the RPC handlers. The server cannot run without the core
+// ones, the others only fail the calls that need them.
+static const struct {
+  sai_api_t api;
+  const char *name;
+  bool core;
+} sai_thrift_apis[] = {
+  { SAI_API_ACL,               "SAI_API_ACL",              false },
+  { SAI_API_BRIDGE,            "SAI_API_BRIDGE",           false },
+  { SAI_API_BUFFER,            "SAI_API_BUFFER",           false },
+  { SAI_API_DEBUG_COUNTER,     "SAI_API_DEBUG_COUNTER",    false },
+  { SAI_API_FDB,               "SAI_API_FDB",              false },
+  { SAI_API_HOSTIF,            "SAI_API_HOSTIF",           false },
+  { SAI_API_LAG,               "SAI_API_LAG",              false },
+  { SAI_API_MIRROR,            "SAI_API_MIRROR",           false },
+  { SAI_API_NEIGHBOR,          "SAI_API_NEIGHBOR",         false },
+  { SAI_API_NEXT_HOP,          "SAI_API_NEXT_HOP",         false },
+  { SAI_API_NEXT_HOP_GROUP,    "SAI_API_NEXT_HOP_GROUP",   false },
+  { SAI_API_POLICER,           "SAI_API_POLICER",          false },
+  { SAI_API_PORT,              "SAI_API_PORT",             true },
+  { SAI_API_QOS_MAP,           "SAI_API_QOS_MAP",          false },
+  { SAI_API_QUEUE,             "SAI_API_QUEUE",            false },
+  { SAI_API_ROUTE,             "SAI_API_ROUTE",            false },
+  { SAI_API_ROUTER_INTERFACE,  "SAI_API_ROUTER_INTERFACE", false },
+  { SAI_API_SCHEDULER,         "SAI_API_SCHEDULER",        false },
+  { SAI_API_STP,               "SAI_API_STP",              false },
+  { SAI_API_SWITCH,            "SAI_API_SWITCH",           true },
+  { SAI_API_SYSTEM_PORT,       "SAI_API_SYSTEM_PORT",      false },
+  { SAI_API_TUNNEL,            "SAI_API_TUNNEL",           false },
+  { SAI_API_VIRTUAL_ROUTER,    "SAI_API_VIRTUAL_ROUTER",   false },
+  { SAI_API_VLAN,              "SAI_API_VLAN",             false },
+  { SAI_API_WRED,              "SAI_API_WRED",             false },
+};
+
+sai_status_t sai_thrift_api_table_init(void) {
+  sai_status_t result = SAI_STATUS_SUCCESS;
+
+  for (const auto &api : sai_thrift_apis) {
+    void *api_method_table = NULL;
+    sai_status_t status = sai_api_query(api.api, &api_method_table);
+    if (status == SAI_STATUS_SUCCESS && api_method_table == NULL) {
+      status = SAI_STATUS_FAILURE;
+    }
+    gSaiApiStatus[api.api] = status;
+    if (status != SAI_STATUS_SUCCESS) {
+      std::cerr << "Failed to query " << api.name << ": " << status << std::endl;
+      if (api.core && result == SAI_STATUS_SUCCESS) {
+        result = status;
+      }
+      continue;
+    }
+    gSaiApiTable[api.api] = api_method_table;
+  }
+
+  return result;
+}
@@ -0,0 +1,87 @@
+#pragma once
+
+#include <mutex>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+#include <sai.h>
+#ifdef __cplusplus
+}
+#endif
+
+/*
+ * SAI API method tables, queried once at startup.
+ *
+ * sai_thrift_api_table_init() must be called by main() after
+ * sai_api_initialize() and before the RPC server is started. It queries every
+ * API the RPC handlers use and keeps the table and status of each. It only
+ * fails if one of the core APIs, switch and port, is missing; any other
+ * missing API fails just the calls that need it, sai_thrift_api_query()
+ * returns the status of its query. Afterwards the tables are read-only and
+ * sai_thrift_api_query() is a plain array load that is safe to call from any
+ * thread.
+ */
+extern void *gSaiApiTable[SAI_API_MAX];
+extern sai_status_t gSaiApiStatus[SAI_API_MAX];
+
+sai_status_t sai_thrift_api_table_init(void);
+
+static inline sai_status_t sai_thrift_api_query(sai_api_t api, void **api_method_table) {
+  if (api >= SAI_API_MAX) {
+    return SAI_STATUS_FAILURE;
+  }
+  if (gSaiApiTable[api] == NULL) {
+    // Also for APIs that were never queried, their status is still 0.
+    return gSaiApiStatus[api] != SAI_STATUS_SUCCESS ? gSaiApiStatus[api] : SAI_STATUS_FAILURE;
+  }
+  *api_method_table = gSaiApiTable[api];
+  return SAI_STATUS_SUCCESS;
+}
+
+/*
+ * Serialization of the calls into the SAI library.
+ *
+ * The SAI specification does not require implementations to be thread-safe,
+ * yet RPC workers, the counter poller, the metrics server and the FDB resync
+ * all call SAI from their own threads. Unless gSaiSerialize is cleared by
+ * main() (--serialize-sai off, for vendor libraries known to be thread-safe),
+ * every such call is made holding gSaiMutex through a sai_thrift_sai_lock_t.
+ * The mutex is recursive so code holding it may call helpers that take it
+ * again.
+ */
+extern std::recursive_mutex gSaiMutex;
+extern bool gSaiSerialize;
+
+class sai_thrift_sai_lock_t {
+ public:
+  explicit sai_thrift_sai_lock_t(bool acquire = true) : locked(false) {
+    if (acquire) {
+      lock();
+    }
+  }
+
+  ~sai_thrift_sai_lock_t() {
+    unlock();
+  }
+
+  sai_thrift_sai_lock_t(const sai_thrift_sai_lock_t&) = delete;
+  sai_thrift_sai_lock_t& operator=(const sai_thrift_sai_lock_t&) = delete;
+
+  void lock() {
+    if (gSaiSerialize && !locked) {
+      gSaiMutex.lock();
+      locked = true;
+    }
+  }
+
+  void unlock() {
+    if (locked) {
+      gSaiMutex.unlock();
+      locked = false;
+    }
+  }
+
+ private:
+  bool locked;
+};
@@ -0,0 +1,326 @@
+#include <algorithm>
+#include <chrono>
+#include <condition_variable>
+#include <iostream>
+#include <map>
+#include <mutex>
+#include <thread>
+
+#include "sai_api_table.h"
+#include "sai_counter_poller.h"
+#include "sai_counter_shm.h"
+#include "sai_stats.h"
+
+typedef struct {
+  std::shared_ptr<const sai_thrift_poller_group_t> group;
+  std::chrono::steady_clock::time_point next_poll;
+  std::shared_ptr<const sai_thrift_poller_snapshot_t> snapshot;
+  std::shared_ptr<const sai_thrift_poller_snapshot_t> previous;
+  // Counters cleared since the last poll started, by object. An empty list
+  // means all counters of the object.
+  std::map<sai_object_id_t, std::vector<sai_stat_id_t>> pending_clears;
+  // Sequence number of the latest poll, kept when the group is replaced.
+  uint64_t seq;
+} sai_thrift_poller_group_state_t;
+
+// Guards gCounterGroups. It is never held while SAI is called.
+static std::mutex gCounterPollerMutex;
+// Signaled when the groups change.
+static std::condition_variable gCounterPollerCond;
+// Signaled when snapshots are published or groups are removed.
+static std::condition_variable gCounterUpdateCond;
+static std::map<std::string, sai_thrift_poller_group_state_t> gCounterGroups;
+static bool gCounterPollerStarted = false;
+// Set when a group was added, replaced or removed since the last export.
+static bool gCounterGroupsChanged = false;
+// See sai_thrift_counter_poller_generation().
+static uint64_t gCounterGroupsGeneration = 0;
+
+static bool sai_thrift_counter_was_cleared(const std::map<sai_object_id_t, std::vector<sai_stat_id_t>> &clears,
+                                           sai_object_id_t object_id, sai_stat_id_t counter_id) {
+  auto it = clears.find(object_id);
+  if (it == clears.end()) {
+    return false;
+  }
+  return it->second.empty() || std::find(it->second.begin(), it->second.end(), counter_id) != it->second.end();
+}
+
+static std::shared_ptr<sai_thrift_poller_snapshot_t> sai_thrift_counter_poll(const sai_thrift_poller_group_t &group,
+    const std::map<sai_object_id_t, std::vector<sai_stat_id_t>> &clears) {
+  auto snapshot = std::make_shared<sai_thrift_poller_snapshot_t>();
+  uint32_t object_count = group.object_ids.size();
+  uint32_t row_size = sai_thrift_counter_group_row_size(group);
+
+  snapshot->group = group;
+  snapshot->statuses.assign(object_count, SAI_STATUS_NOT_EXECUTED);
+  snapshot->counters.assign((size_t) object_count * row_size, 0);
+
+  sai_thrift_sai_lock_t sai_lock;
+  if (group.object_type == SAI_OBJECT_TYPE_DEBUG_COUNTER) {
+    snapshot->status = sai_thrift_get_debug_counters_stats(object_count, group.object_ids.data(),
+                                                           snapshot->statuses.data(), snapshot->counters.data());
+  } else {
+    snapshot->status = sai_thrift_get_objects_stats(group.object_type, object_count, group.object_ids.data(),
+                                                    row_size, group.counter_ids.data(), SAI_STATS_MODE_READ,
+                                                    snapshot->statuses.data(), snapshot->counters.data());
+  }
+  sai_lock.unlock();
+
+  snapshot->cleared.assign(snapshot->counters.size(), 0);
+  for (uint32_t i = 0; i < object_count && !clears.empty(); i++) {
+    for (uint32_t j = 0; j < row_size; j++) {
+      sai_stat_id_t counter_id = group.object_type == SAI_OBJECT_TYPE_DEBUG_COUNTER ? 0 : group.counter_ids[j];
+      snapshot->cleared[(size_t) i * row_size + j] = sai_thrift_counter_was_cleared(clears, group.object_ids[i], counter_id);
+    }
+  }
+
+  snapshot->timestamp_us = std::chrono::duration_cast<std::chrono::microseconds>(
+      std::chrono::system_clock::now().time_since_epoch()).count();
+  snapshot->monotonic_ns = std::chrono::duration_cast<std::chrono::nanoseconds>(
+      std::chrono::steady_clock::now().time_since_epoch()).count();
+  return snapshot;
+}
+
+// Called with the lock held, releases it while writing the table.
+static void sai_thrift_counter_poller_export(std::unique_lock<std::mutex> &lock) {
+  std::vector<std::shared_ptr<const sai_thrift_poller_snapshot_t>> snapshots;
+
+  // Same as sai_thrift_counter_poller_get_snapshots(), the lock is held already.
+  gCounterGroupsChanged = false;
+  if (!sai_thrift_counter_shm_enabled()) {
+    return;
+  }
+
+  for (const auto &it : gCounterGroups) {
+    if (it.second.snapshot) {
+      snapshots.push_back(it.second.snapshot);
+    }
+  }
+
+  lock.unlock();
+  sai_thrift_counter_shm_publish(snapshots);
+  lock.lock();
+}
+
+static void sai_thrift_counter_poller_thread() {
+  std::unique_lock<std::mutex> lock(gCounterPollerMutex);
+
+  while (true) {
+    auto now = std::chrono::steady_clock::now();
+    auto next_poll = now + std::chrono::hours(1);
+    std::vector<std::shared_ptr<const sai_thrift_poller_group_t>> due;
+    std::vector<std::map<sai_object_id_t, std::vector<sai_stat_id_t>>> clears;
+
+    for (auto &it : gCounterGroups) {
+      sai_thrift_poller_group_state_t &state = it.second;
+      if (state.next_poll <= now) {
+        due.push_back(state.group);
+        clears.push_back(std::move(state.pending_clears));
+        state.pending_clears.clear();
+        // Stay on the interval grid, but skip polls that were missed.
+        state.next_poll += std::chrono::milliseconds(state.group->interval_ms);
+        if (state.next_poll <= now) {
+          state.next_poll = now + std::chrono::milliseconds(state.group->interval_ms);
+        }
+      }
+      next_poll = std::min(next_poll, state.next_poll);
+    }
+
+    if (due.empty()) {
+      if (gCounterGroupsChanged) {
+        sai_thrift_counter_poller_export(lock);
+        continue;
+      }
+      gCounterPollerCond.wait_until(lock, next_poll);
+      continue;
+    }
+
+    lock.unlock();
+    std::vector<std::shared_ptr<sai_thrift_poller_snapshot_t>> snapshots;
+    for (uint32_t i = 0; i < due.size(); i++) {
+      snapshots.push_back(sai_thrift_counter_poll(*due[i], clears[i]));
+    }
+    lock.lock();
+
+    for (uint32_t i = 0; i < due.size(); i++) {
+      auto it = gCounterGroups.find(due[i]->name);
+      // Drop the poll if the group was removed or replaced meanwhile.
+      if (it == gCounterGroups.end() || it->second.group != due[i]) {
+        continue;
+      }
+      snapshots[i]->seq = ++it->second.seq;
+      it->second.previous = it->second.snapshot;
+      it->second.snapshot = snapshots[i];
+    }
+    gCounterUpdateCond.notify_all();
+    sai_thrift_counter_poller_export(lock);
+  }
+}
+
+sai_status_t sai_thrift_counter_poller_set_group(const sai_thrift_poller_group_t &group) {
+  if (group.name.empty() || group.interval_ms == 0) {
+    return SAI_STATUS_INVALID_PARAMETER;
+  }
+
+  switch (group.object_type) {
+  case SAI_OBJECT_TYPE_PORT:
+  case SAI_OBJECT_TYPE_QUEUE:
+  case SAI_OBJECT_TYPE_INGRESS_PRIORITY_GROUP:
+  case SAI_OBJECT_TYPE_BUFFER_POOL:
+  case SAI_OBJECT_TYPE_POLICER:
+    if (group.counter_ids.empty()) {
+      return SAI_STATUS_INVALID_PARAMETER;
+    }
+    break;
+  case SAI_OBJECT_TYPE_DEBUG_COUNTER:
+    break;
+  default:
+    return SAI_STATUS_NOT_SUPPORTED;
+  }
+
+  std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+  sai_thrift_poller_group_state_t &state = gCounterGroups[group.name];
+  state.group = std::make_shared<const sai_thrift_poller_group_t>(group);
+  state.next_poll = std::chrono::steady_clock::now();
+  state.snapshot = nullptr;
+  state.previous = nullptr;
+  state.pending_clears.clear();
+  gCounterGroupsChanged = true;
+  gCounterGroupsGeneration++;
+
+  if (!gCounterPollerStarted) {
+    std::cerr << "Starting SAI counter poller" << std::endl;
+    std::thread(sai_thrift_counter_poller_thread).detach();
+    gCounterPollerStarted = true;
+  }
+  gCounterPollerCond.notify_all();
+
+  return SAI_STATUS_SUCCESS;
+}
+
+sai_status_t sai_thrift_counter_poller_remove_group(const std::string &name) {
+  std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+  if (gCounterGroups.erase(name) == 0) {
+    return SAI_STATUS_ITEM_NOT_FOUND;
+  }
+  gCounterGroupsChanged = true;
+  gCounterGroupsGeneration++;
+  gCounterPollerCond.notify_all();
+  gCounterUpdateCond.notify_all();
+  return SAI_STATUS_SUCCESS;
+}
+
+std::shared_ptr<const sai_thrift_poller_snapshot_t> sai_thrift_counter_poller_get_snapshot(const std::string &name) {
+  std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+  auto it = gCounterGroups.find(name);
+  if (it == gCounterGroups.end()) {
+    return nullptr;
+  }
+  return it->second.snapshot;
+}
+
+bool sai_thrift_counter_poller_has_group(const std::string &name) {
+  std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+  return gCounterGroups.find(name) != gCounterGroups.end();
+}
+
+std::vector<std::shared_ptr<const sai_thrift_poller_snapshot_t>> sai_thrift_counter_poller_get_snapshots() {
+  std::vector<std::shared_ptr<const sai_thrift_poller_snapshot_t>> snapshots;
+  std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+
+  for (const auto &it : gCounterGroups) {
+    if (it.second.snapshot) {
+      snapshots.push_back(it.second.snapshot);
+    }
+  }
+  return snapshots;
+}
+
+uint64_t sai_thrift_counter_poller_generation() {
+  std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+  return gCounterGroupsGeneration;
+}
+
+sai_status_t sai_thrift_counter_poller_wait_snapshot(const std::string &name, uint64_t after_seq, uint32_t timeout_ms,
+                                                     std::shared_ptr<const sai_thrift_poller_snapshot_t> &snapshot) {
+  auto deadline = std::chrono::steady_clock::now() + std::chrono::milliseconds(timeout_ms);
+  std::unique_lock<std::mutex> lock(gCounterPollerMutex);
+
+  while (true) {
+    auto it = gCounterGroups.find(name);
+    if (it == gCounterGroups.end()) {
+      return SAI_STATUS_ITEM_NOT_FOUND;
+    }
+    if (it->second.snapshot && it->second.snapshot->seq > after_seq) {
+      snapshot = it->second.snapshot;
+      return SAI_STATUS_SUCCESS;
+    }
+    if (gCounterUpdateCond.wait_until(lock, deadline) == std::cv_status::timeout) {
+      return SAI_STATUS_NOT_EXECUTED;
+    }
+  }
+}
+
+sai_status_t sai_thrift_counter_poller_get_rates(const std::string &name, sai_thrift_poller_rates_t &rates) {
+  std::shared_ptr<const sai_thrift_poller_snapshot_t> previous;
+  std::shared_ptr<const sai_thrift_poller_snapshot_t> current;
+
+  {
+    std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+    auto it = gCounterGroups.find(name);
+    if (it == gCounterGroups.end()) {
+      return SAI_STATUS_ITEM_NOT_FOUND;
+    }
+    previous = it->second.previous;
+    current = it->second.snapshot;
+  }
+
+  if (!previous || !current) {
+    return SAI_STATUS_NOT_EXECUTED;
+  }
+
+  uint32_t object_count = current->group.object_ids.size();
+  uint32_t row_size = sai_thrift_counter_group_row_size(current->group);
+  double interval_s = (current->monotonic_ns - previous->monotonic_ns) / 1e9;
+
+  rates.group = current->group;
+  rates.statuses.resize(object_count);
+  rates.deltas.resize(current->counters.size());
+  rates.rates.resize(current->counters.size());
+  rates.interval_us = (current->monotonic_ns - previous->monotonic_ns) / 1000;
+  rates.timestamp_us = current->timestamp_us;
+  rates.seq = current->seq;
+
+  for (uint32_t i = 0; i < object_count; i++) {
+    rates.statuses[i] = previous->statuses[i] != SAI_STATUS_SUCCESS ? previous->statuses[i] : current->statuses[i];
+    for (uint32_t j = 0; j < row_size; j++) {
+      size_t k = (size_t) i * row_size + j;
+      rates.deltas[k] = sai_thrift_counter_delta(previous->counters[k], current->counters[k], current->cleared[k]);
+      rates.rates[k] = interval_s > 0 ? rates.deltas[k] / interval_s : 0;
+    }
+  }
+
+  return SAI_STATUS_SUCCESS;
+}
+
+void sai_thrift_counter_poller_notify_clear(sai_object_id_t object_id, uint32_t number_of_counters,
+                                            const sai_stat_id_t *counter_ids) {
+  std::lock_guard<std::mutex> lock(gCounterPollerMutex);
+
+  for (auto &it : gCounterGroups) {
+    sai_thrift_poller_group_state_t &state = it.second;
+    const std::vector<sai_object_id_t> &object_ids = state.group->object_ids;
+    if (std::find(object_ids.begin(), object_ids.end(), object_id) == object_ids.end()) {
+      continue;
+    }
+
+    auto pending = state.pending_clears.find(object_id);
+    if (number_of_counters == 0) {
+      state.pending_clears[object_id].clear();
+    } else if (pending == state.pending_clears.end()) {
+      state.pending_clears[object_id].assign(counter_ids, counter_ids + number_of_counters);
+    } else if (!pending->second.empty()) {
+      pending->second.insert(pending->second.end(), counter_ids, counter_ids + number_of_counters);
+    }
+  }
+}
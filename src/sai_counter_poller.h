@@ -0,0 +1,145 @@
+#pragma once
+
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <vector>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+#include <sai.h>
+#ifdef __cplusplus
+}
+#endif
+
+/*
+ * Server-side counter polling.
+ *
+ * A counter group names a set of objects of one type, the counters to read
+ * from each of them and a polling interval. A background thread reads every
+ * group when its interval expires and publishes the values as an immutable
+ * snapshot, so readers never touch the ASIC and always see the counters of a
+ * single poll.
+ *
+ * Supported object types are ports, queues, ingress priority groups, buffer
+ * pools, policers and debug counters. Debug counters have a single value
+ * each, counter_ids is ignored for them.
+ */
+typedef struct {
+  std::string name;
+  sai_object_type_t object_type;
+  std::vector<sai_object_id_t> object_ids;
+  std::vector<sai_stat_id_t> counter_ids;
+  uint32_t interval_ms;
+} sai_thrift_poller_group_t;
+
+// Number of values per object in a snapshot of the group.
+static inline uint32_t sai_thrift_counter_group_row_size(const sai_thrift_poller_group_t &group) {
+  return group.object_type == SAI_OBJECT_TYPE_DEBUG_COUNTER ? 1 : group.counter_ids.size();
+}
+
+typedef struct {
+  sai_thrift_poller_group_t group;
+  // Status of the poll, SAI_STATUS_SUCCESS when every object was read.
+  sai_status_t status;
+  std::vector<sai_status_t> statuses;
+  // One row of sai_thrift_counter_group_row_size() values per object, in
+  // group.object_ids order.
+  std::vector<uint64_t> counters;
+  // Per value of counters, set when the counter was cleared through the RPC
+  // server since the previous poll.
+  std::vector<uint8_t> cleared;
+  // Wall clock time of the poll in microseconds since the epoch.
+  uint64_t timestamp_us;
+  // Monotonic time of the poll in nanoseconds.
+  uint64_t monotonic_ns;
+  // Number of polls of the group, starting at 1.
+  uint64_t seq;
+} sai_thrift_poller_snapshot_t;
+
+/*
+ * Adds the group, or replaces the group with the same name. The group is
+ * polled right away. The polling thread is started with the first group.
+ */
+sai_status_t sai_thrift_counter_poller_set_group(const sai_thrift_poller_group_t &group);
+
+sai_status_t sai_thrift_counter_poller_remove_group(const std::string &name);
+
+/*
+ * Latest snapshot of the group, nullptr if there is no such group or it has
+ * not been polled yet.
+ */
+std::shared_ptr<const sai_thrift_poller_snapshot_t> sai_thrift_counter_poller_get_snapshot(const std::string &name);
+
+bool sai_thrift_counter_poller_has_group(const std::string &name);
+
+/*
+ * Latest snapshots of all groups that have been polled, ordered by group name.
+ */
+std::vector<std::shared_ptr<const sai_thrift_poller_snapshot_t>> sai_thrift_counter_poller_get_snapshots();
+
+/*
+ * Incremented whenever a group is added, replaced or removed. Consumers that
+ * keep data per polled object drop it when this changes, as the OIDs of
+ * removed objects may be reused.
+ */
+uint64_t sai_thrift_counter_poller_generation();
+
+/*
+ * Blocks until the group has a snapshot with a sequence number above
+ * after_seq and returns it in snapshot. Returns SAI_STATUS_ITEM_NOT_FOUND if
+ * the group does not exist or is removed while waiting and
+ * SAI_STATUS_NOT_EXECUTED if no newer snapshot arrived within timeout_ms.
+ */
+sai_status_t sai_thrift_counter_poller_wait_snapshot(const std::string &name, uint64_t after_seq, uint32_t timeout_ms,
+                                                     std::shared_ptr<const sai_thrift_poller_snapshot_t> &snapshot);
+
+/*
+ * Change of the counters between the two latest polls of a group.
+ *
+ * Counters are unsigned 64-bit values, the delta is computed modulo 2^64 so
+ * a counter wrapping around between two polls still gives the right delta.
+ * A counter cleared through the RPC server restarts from zero, its delta is
+ * the new value. A counter that went down without a known clear, e.g. cleared
+ * by another SAI client, is taken as wrapped when the previous value was in
+ * the upper half of the 64-bit range and as cleared otherwise.
+ */
+typedef struct {
+  sai_thrift_poller_group_t group;
+  std::vector<sai_status_t> statuses;
+  // Same layout as the counters of a snapshot.
+  std::vector<uint64_t> deltas;
+  // Deltas per second over interval_us.
+  std::vector<double> rates;
+  // Time between the two polls in microseconds.
+  uint64_t interval_us;
+  // Wall clock time and sequence number of the latest poll.
+  uint64_t timestamp_us;
+  uint64_t seq;
+} sai_thrift_poller_rates_t;
+
+// Delta of a single counter, see sai_thrift_poller_rates_t.
+static inline uint64_t sai_thrift_counter_delta(uint64_t previous, uint64_t current, bool cleared) {
+  if (cleared) {
+    return current;
+  }
+  if (current < previous && previous < (UINT64_C(1) << 63)) {
+    return current;
+  }
+  return current - previous;
+}
+
+/*
+ * Returns SAI_STATUS_ITEM_NOT_FOUND for an unknown group and
+ * SAI_STATUS_NOT_EXECUTED until the group has been polled twice.
+ */
+sai_status_t sai_thrift_counter_poller_get_rates(const std::string &name, sai_thrift_poller_rates_t &rates);
+
+/*
+ * Tells the poller that counters of the object were cleared, so the next
+ * poll does not take the drop as a wrap-around. number_of_counters 0 means
+ * all counters of the object.
+ */
+void sai_thrift_counter_poller_notify_clear(sai_object_id_t object_id, uint32_t number_of_counters,
+                                            const sai_stat_id_t *counter_ids);
@@ -0,0 +1,131 @@
+#include <chrono>
+#include <cstring>
+#include <iostream>
+
+#include <errno.h>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+
+#include "sai_counter_shm.h"
+
+static sai_counter_shm_header_t *gCounterShm = nullptr;
+
+static uint64_t sai_thrift_counter_shm_align(uint64_t offset) {
+  return (offset + 63) & ~(uint64_t) 63;
+}
+
+sai_status_t sai_thrift_counter_shm_open(const char *path, uint32_t max_objects, uint32_t max_counters) {
+  if (gCounterShm != nullptr || max_objects == 0 || max_counters == 0) {
+    return SAI_STATUS_INVALID_PARAMETER;
+  }
+
+  uint64_t objects_offset = sai_thrift_counter_shm_align(sizeof(sai_counter_shm_header_t));
+  uint64_t counter_ids_offset = sai_thrift_counter_shm_align(objects_offset + (uint64_t) max_objects * sizeof(sai_counter_shm_object_t));
+  uint64_t counters_offset = sai_thrift_counter_shm_align(counter_ids_offset + (uint64_t) max_counters * sizeof(uint32_t));
+  uint64_t size = counters_offset + (uint64_t) max_counters * sizeof(uint64_t);
+
+  if (unlink(path) < 0 && errno != ENOENT) {
+    std::cerr << "Failed to remove stale counter table " << path << ": " << strerror(errno) << std::endl;
+    return SAI_STATUS_FAILURE;
+  }
+
+  int fd = open(path, O_RDWR | O_CREAT | O_EXCL, 0644);
+  if (fd < 0) {
+    std::cerr << "Failed to create counter table " << path << ": " << strerror(errno) << std::endl;
+    return SAI_STATUS_FAILURE;
+  }
+
+  if (ftruncate(fd, size) < 0) {
+    std::cerr << "Failed to size counter table " << path << ": " << strerror(errno) << std::endl;
+    close(fd);
+    unlink(path);
+    return SAI_STATUS_FAILURE;
+  }
+
+  void *addr = mmap(nullptr, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+  close(fd);
+  if (addr == MAP_FAILED) {
+    std::cerr << "Failed to map counter table " << path << ": " << strerror(errno) << std::endl;
+    unlink(path);
+    return SAI_STATUS_FAILURE;
+  }
+
+  // The file is zero filled, the magic is written last so readers never see
+  // a half initialized header.
+  sai_counter_shm_header_t *header = (sai_counter_shm_header_t *) addr;
+  header->version = SAI_COUNTER_SHM_VERSION;
+  header->size = size;
+  header->max_objects = max_objects;
+  header->max_counters = max_counters;
+  header->objects_offset = objects_offset;
+  header->counter_ids_offset = counter_ids_offset;
+  header->counters_offset = counters_offset;
+  __atomic_store_n(&header->magic, SAI_COUNTER_SHM_MAGIC, __ATOMIC_RELEASE);
+
+  std::cerr << "Publishing counters to " << path << std::endl;
+  gCounterShm = header;
+  return SAI_STATUS_SUCCESS;
+}
+
+bool sai_thrift_counter_shm_enabled() {
+  return gCounterShm != nullptr;
+}
+
+void sai_thrift_counter_shm_publish(const std::vector<std::shared_ptr<const sai_thrift_poller_snapshot_t>> &snapshots) {
+  sai_counter_shm_header_t *header = gCounterShm;
+  if (header == nullptr) {
+    return;
+  }
+
+  char *base = (char *) header;
+  sai_counter_shm_object_t *objects = (sai_counter_shm_object_t *) (base + header->objects_offset);
+  uint32_t *counter_ids = (uint32_t *) (base + header->counter_ids_offset);
+  uint64_t *counters = (uint64_t *) (base + header->counters_offset);
+  uint32_t num_objects = 0;
+  uint32_t num_counters = 0;
+  uint32_t flags = 0;
+
+  uint64_t seq = header->seq;
+  __atomic_store_n(&header->seq, seq + 1, __ATOMIC_RELAXED);
+  __atomic_thread_fence(__ATOMIC_RELEASE);
+
+  for (const auto &snapshot : snapshots) {
+    const sai_thrift_poller_group_t &group = snapshot->group;
+    uint32_t object_count = group.object_ids.size();
+    uint32_t row_size = sai_thrift_counter_group_row_size(group);
+
+    if (object_count > header->max_objects - num_objects ||
+        (uint64_t) object_count * row_size > header->max_counters - num_counters) {
+      flags |= SAI_COUNTER_SHM_FLAG_TRUNCATED;
+      break;
+    }
+
+    for (uint32_t i = 0; i < object_count; i++) {
+      sai_counter_shm_object_t &object = objects[num_objects++];
+      memset(object.group, 0, sizeof(object.group));
+      strncpy(object.group, group.name.c_str(), sizeof(object.group) - 1);
+      object.object_id = group.object_ids[i];
+      object.object_type = group.object_type;
+      object.status = snapshot->statuses[i];
+      object.counter_index = num_counters;
+      object.number_of_counters = row_size;
+      object.timestamp_us = snapshot->timestamp_us;
+      object.seq = snapshot->seq;
+
+      for (uint32_t j = 0; j < row_size; j++) {
+        counter_ids[num_counters] = group.object_type == SAI_OBJECT_TYPE_DEBUG_COUNTER ? 0 : group.counter_ids[j];
+        counters[num_counters] = snapshot->counters[(size_t) i * row_size + j];
+        num_counters++;
+      }
+    }
+  }
+
+  header->num_objects = num_objects;
+  header->num_counters = num_counters;
+  header->flags = flags;
+  header->timestamp_us = std::chrono::duration_cast<std::chrono::microseconds>(
+      std::chrono::system_clock::now().time_since_epoch()).count();
+
+  __atomic_store_n(&header->seq, seq + 2, __ATOMIC_RELEASE);
+}
@@ -0,0 +1,28 @@
+#pragma once
+
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+#include "sai_counter_poller.h"
+#include "sai_counter_shm_layout.h"
+
+/*
+ * Writer side of the shared memory counter table, see
+ * sai_counter_shm_layout.h for the layout.
+ */
+
+/*
+ * Creates the table at path with room for max_objects objects and
+ * max_counters counter values. An existing file at path is unlinked first,
+ * readers still mapping it keep the old copy.
+ */
+sai_status_t sai_thrift_counter_shm_open(const char *path, uint32_t max_objects, uint32_t max_counters);
+
+bool sai_thrift_counter_shm_enabled();
+
+/*
+ * Replaces the content of the table with the snapshots. Must only be called
+ * from one thread at a time.
+ */
+void sai_thrift_counter_shm_publish(const std::vector<std::shared_ptr<const sai_thrift_poller_snapshot_t>> &snapshots);
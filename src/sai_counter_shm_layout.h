@@ -0,0 +1,72 @@
+#pragma once
+
+#include <stdint.h>
+
+/*
+ * Layout of the shared memory counter table written by saiserver with
+ * --counters-shm. The file holds the latest snapshot of every counter group
+ * of the counter poller, so local readers can mmap it read-only and get the
+ * counters without any RPC.
+ *
+ *   sai_counter_shm_header_t  header
+ *   sai_counter_shm_object_t  objects[max_objects]       at objects_offset
+ *   uint32_t                  counter_ids[max_counters]  at counter_ids_offset
+ *   uint64_t                  counters[max_counters]     at counters_offset
+ *
+ * Object i has number_of_counters values, starting at counter_index in both
+ * counter_ids and counters. Debug counters have a single value with counter
+ * ID 0. An object in several groups appears once per group.
+ *
+ * The table is guarded by a seqlock. The writer makes seq odd before it
+ * updates the table and even again when it is done. A reader copies what it
+ * needs and retries when seq was odd or changed meanwhile:
+ *
+ *   do {
+ *     seq = __atomic_load_n(&header->seq, __ATOMIC_ACQUIRE);
+ *     ... copy objects and counters ...
+ *     __atomic_thread_fence(__ATOMIC_ACQUIRE);
+ *   } while ((seq & 1) || seq != __atomic_load_n(&header->seq, __ATOMIC_RELAXED));
+ *
+ * The file is replaced, not reused, when saiserver restarts. Readers should
+ * reopen it when magic is not SAI_COUNTER_SHM_MAGIC or the file was unlinked.
+ */
+
+#define SAI_COUNTER_SHM_MAGIC 0x4d485343 /* "CSHM" */
+#define SAI_COUNTER_SHM_VERSION 1
+
+#define SAI_COUNTER_SHM_GROUP_NAME_SIZE 32
+
+/* Not all groups fitted into the table, the last ones are missing. */
+#define SAI_COUNTER_SHM_FLAG_TRUNCATED 0x1
+
+typedef struct {
+  uint32_t magic;
+  uint32_t version;
+  uint64_t seq;
+  uint64_t size;
+  uint32_t max_objects;
+  uint32_t num_objects;
+  uint32_t max_counters;
+  uint32_t num_counters;
+  uint64_t objects_offset;
+  uint64_t counter_ids_offset;
+  uint64_t counters_offset;
+  /* Wall clock time of the last update in microseconds. */
+  uint64_t timestamp_us;
+  uint32_t flags;
+  uint32_t reserved;
+} sai_counter_shm_header_t;
+
+typedef struct {
+  /* NUL terminated, truncated to fit. */
+  char group[SAI_COUNTER_SHM_GROUP_NAME_SIZE];
+  uint64_t object_id;
+  int32_t object_type;
+  /* SAI status of the last read of this object, its counters are 0 on error. */
+  int32_t status;
+  uint32_t counter_index;
+  uint32_t number_of_counters;
+  /* Wall clock time and sequence number of the poll of the group. */
+  uint64_t timestamp_us;
+  uint64_t seq;
+} sai_counter_shm_object_t;
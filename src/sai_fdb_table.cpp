@@ -0,0 +1,382 @@
+#include <algorithm>
+#include <cinttypes>
+#include <cstdio>
+#include <iostream>
+#include <mutex>
+
+#include "sai_api_table.h"
+#include "sai_fdb_table.h"
+
+extern sai_object_id_t gSwitchId;
+
+extern "C" {
+// Only provided by recent SAI implementations.
+extern sai_status_t sai_get_object_count(sai_object_id_t switch_id, sai_object_type_t object_type,
+                                         uint32_t *count) __attribute__((weak));
+extern sai_status_t sai_get_object_key(sai_object_id_t switch_id, sai_object_type_t object_type,
+                                       uint32_t *object_count, sai_object_key_t *object_list) __attribute__((weak));
+}
+
+// The FDB shadow of the switch, written by the notification worker. The lock
+// is taken to write the table and by readers other than the worker.
+static SaiThriftFdbTable gFdbTable;
+static std::mutex gFdbTableMutex;
+
+// Latest published snapshot, only accessed with std::atomic_load() and
+// std::atomic_store().
+static std::shared_ptr<const sai_thrift_fdb_snapshot_t> gFdbSnapshot =
+    std::make_shared<const sai_thrift_fdb_snapshot_t>();
+
+sai_thrift_fdb_key_t SaiThriftFdbTable::key(const sai_fdb_entry_t &fdb_entry) {
+  sai_thrift_fdb_key_t key;
+
+  key.mac = 0;
+  for (int i = 0; i < 6; i++) {
+    key.mac = (key.mac << 8) | fdb_entry.mac_address[i];
+  }
+  key.bv_id = fdb_entry.bv_id;
+  return key;
+}
+
+void SaiThriftFdbTable::index_erase(std::unordered_map<sai_object_id_t, key_set_t> &index, sai_object_id_t id,
+                                    const sai_thrift_fdb_key_t &key) {
+  auto it = index.find(id);
+  if (it == index.end()) {
+    return;
+  }
+  it->second.erase(key);
+  if (it->second.empty()) {
+    index.erase(it);
+  }
+}
+
+void SaiThriftFdbTable::learn(const sai_fdb_entry_t &fdb_entry, sai_object_id_t bport_id,
+                              sai_fdb_entry_type_t entry_type) {
+  sai_thrift_fdb_key_t k = key(fdb_entry);
+
+  auto it = positions_.find(k);
+  if (it != positions_.end()) {
+    sai_thrift_fdb_shadow_entry_t &entry = entries_[it->second];
+    if (entry.bport_id == bport_id && entry.entry_type == entry_type) {
+      return;
+    }
+    if (entry.bport_id != bport_id) {
+      index_erase(by_bport_, entry.bport_id, k);
+      by_bport_[bport_id].insert(k);
+      entry.bport_id = bport_id;
+    }
+    entry.entry_type = entry_type;
+    record(SAI_FDB_EVENT_MOVE, entry);
+    return;
+  }
+
+  sai_thrift_fdb_shadow_entry_t entry;
+  entry.fdb_entry = fdb_entry;
+  entry.bport_id = bport_id;
+  entry.entry_type = entry_type;
+  positions_[k] = entries_.size();
+  entries_.push_back(entry);
+  by_bport_[bport_id].insert(k);
+  by_bv_[fdb_entry.bv_id].insert(k);
+  record(SAI_FDB_EVENT_LEARNED, entry);
+}
+
+void SaiThriftFdbTable::remove_at(size_t pos, sai_fdb_event_t event_type) {
+  sai_thrift_fdb_shadow_entry_t &entry = entries_[pos];
+  sai_thrift_fdb_key_t k = key(entry.fdb_entry);
+
+  index_erase(by_bport_, entry.bport_id, k);
+  index_erase(by_bv_, entry.fdb_entry.bv_id, k);
+  positions_.erase(k);
+  record(event_type, entry);
+
+  if (pos != entries_.size() - 1) {
+    entry = entries_.back();
+    positions_[key(entry.fdb_entry)] = pos;
+  }
+  entries_.pop_back();
+}
+
+void SaiThriftFdbTable::remove(const sai_fdb_entry_t &fdb_entry) {
+  auto it = positions_.find(key(fdb_entry));
+  if (it != positions_.end()) {
+    remove_at(it->second, SAI_FDB_EVENT_AGED);
+  }
+}
+
+void SaiThriftFdbTable::flush(sai_object_id_t bv_id, sai_object_id_t bport_id) {
+  if (bv_id == 0 && bport_id == 0) {
+    clear();
+    return;
+  }
+
+  // Walk the smaller of the matching index sets, the keys are copied as
+  // removal updates the sets.
+  const key_set_t *keys = nullptr;
+  if (bport_id != 0) {
+    auto it = by_bport_.find(bport_id);
+    if (it == by_bport_.end()) {
+      return;
+    }
+    keys = &it->second;
+  }
+  if (bv_id != 0) {
+    auto it = by_bv_.find(bv_id);
+    if (it == by_bv_.end()) {
+      return;
+    }
+    if (keys == nullptr || it->second.size() < keys->size()) {
+      keys = &it->second;
+    }
+  }
+
+  std::vector<sai_thrift_fdb_key_t> matches(keys->begin(), keys->end());
+  for (const auto &k : matches) {
+    size_t pos = positions_[k];
+    const sai_thrift_fdb_shadow_entry_t &entry = entries_[pos];
+    if ((bv_id == 0 || entry.fdb_entry.bv_id == bv_id) && (bport_id == 0 || entry.bport_id == bport_id)) {
+      remove_at(pos, SAI_FDB_EVENT_FLUSHED);
+    }
+  }
+}
+
+void SaiThriftFdbTable::clear() {
+  if (entries_.empty()) {
+    return;
+  }
+  entries_.clear();
+  positions_.clear();
+  by_bport_.clear();
+  by_bv_.clear();
+  reset_changes();
+}
+
+void SaiThriftFdbTable::replace(SaiThriftFdbTable &&other) {
+  uint64_t version = version_;
+
+  *this = std::move(other);
+  version_ = version;
+  reset_changes();
+}
+
+void SaiThriftFdbTable::record(sai_fdb_event_t event_type, const sai_thrift_fdb_shadow_entry_t &entry) {
+  sai_thrift_fdb_change_record_t change;
+
+  change.seq = ++version_;
+  change.event_type = event_type;
+  change.entry = entry;
+  changes_.push_back(change);
+  if (changes_.size() > SAI_THRIFT_FDB_CHANGE_LOG_SIZE) {
+    changes_start_ = changes_.front().seq;
+    changes_.pop_front();
+  }
+}
+
+void SaiThriftFdbTable::reset_changes() {
+  version_++;
+  changes_.clear();
+  changes_start_ = version_;
+}
+
+bool SaiThriftFdbTable::changes(uint64_t since_seq, size_t max,
+                                std::vector<sai_thrift_fdb_change_record_t> &changes) const {
+  if (since_seq < changes_start_ || since_seq > version_) {
+    return false;
+  }
+
+  auto first = changes_.begin() + (since_seq - changes_start_);
+  auto last = first + std::min(max, (size_t) (changes_.end() - first));
+  changes.insert(changes.end(), first, last);
+  return true;
+}
+
+void sai_thrift_fdb_event_parse(const sai_fdb_event_notification_data_t &data, sai_thrift_fdb_event_t &event) {
+  event.event_type = data.event_type;
+  event.fdb_entry = data.fdb_entry;
+  event.bport_id = 0;
+  // Learned entries are dynamic unless the notification says otherwise.
+  event.entry_type = SAI_FDB_ENTRY_TYPE_DYNAMIC;
+
+  for (uint32_t i = 0; i < data.attr_count; i++) {
+    if (data.attr[i].id == SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID) {
+      event.bport_id = data.attr[i].value.oid;
+    } else if (data.attr[i].id == SAI_FDB_ENTRY_ATTR_TYPE) {
+      event.entry_type = (sai_fdb_entry_type_t) data.attr[i].value.s32;
+    }
+  }
+}
+
+void sai_thrift_fdb_table_apply_events(const sai_thrift_fdb_event_t *events, uint32_t count) {
+  std::lock_guard<std::mutex> lock(gFdbTableMutex);
+
+  for (uint32_t i = 0; i < count; i++) {
+    const sai_thrift_fdb_event_t &event = events[i];
+
+    switch (event.event_type) {
+    case SAI_FDB_EVENT_LEARNED:
+    case SAI_FDB_EVENT_MOVE:
+      gFdbTable.learn(event.fdb_entry, event.bport_id, event.entry_type);
+      break;
+    case SAI_FDB_EVENT_FLUSHED:
+      gFdbTable.flush(event.fdb_entry.bv_id, event.bport_id);
+      break;
+    case SAI_FDB_EVENT_AGED:
+      gFdbTable.remove(event.fdb_entry);
+      break;
+    default:
+      std::cerr << "Unknown FDB event type " << event.event_type << std::endl;
+      break;
+    }
+  }
+}
+
+sai_status_t sai_thrift_fdb_table_resync() {
+  sai_fdb_api_t *fdb_api;
+  uint32_t count = 1024;
+  sai_status_t status;
+
+  if (sai_get_object_key == NULL) {
+    return SAI_STATUS_NOT_IMPLEMENTED;
+  }
+
+  status = sai_thrift_api_query(SAI_API_FDB, (void **) &fdb_api);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  sai_thrift_sai_lock_t sai_lock;
+  if (sai_get_object_count != NULL) {
+    status = sai_get_object_count(gSwitchId, SAI_OBJECT_TYPE_FDB_ENTRY, &count);
+    if (status != SAI_STATUS_SUCCESS) {
+      return status;
+    }
+  }
+
+  // Entries learned between the two calls make the first one overflow.
+  std::vector<sai_object_key_t> keys;
+  for (int attempt = 0; attempt < 3; attempt++) {
+    keys.resize(count + 64);
+    count = keys.size();
+    status = sai_get_object_key(gSwitchId, SAI_OBJECT_TYPE_FDB_ENTRY, &count, keys.data());
+    if (status != SAI_STATUS_BUFFER_OVERFLOW) {
+      break;
+    }
+  }
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  SaiThriftFdbTable table;
+  for (uint32_t i = 0; i < count; i++) {
+    sai_attribute_t attrs[2] = {};
+    attrs[0].id = SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID;
+    attrs[1].id = SAI_FDB_ENTRY_ATTR_TYPE;
+    // Entries aged out meanwhile are skipped.
+    if (fdb_api->get_fdb_entry_attribute(&keys[i].key.fdb_entry, 2, attrs) == SAI_STATUS_SUCCESS) {
+      table.learn(keys[i].key.fdb_entry, attrs[0].value.oid, (sai_fdb_entry_type_t) attrs[1].value.s32);
+    }
+  }
+  sai_lock.unlock();
+
+  std::lock_guard<std::mutex> lock(gFdbTableMutex);
+  gFdbTable.replace(std::move(table));
+  return SAI_STATUS_SUCCESS;
+}
+
+bool sai_thrift_fdb_table_changes(uint64_t since_seq, size_t max, std::vector<sai_thrift_fdb_change_record_t> &changes,
+                                  uint64_t &version) {
+  std::lock_guard<std::mutex> lock(gFdbTableMutex);
+
+  version = gFdbTable.version();
+  return gFdbTable.changes(since_seq, max, changes);
+}
+
+void sai_thrift_fdb_table_publish() {
+  if (std::atomic_load(&gFdbSnapshot)->version == gFdbTable.version()) {
+    return;
+  }
+
+  // Only the writer calls this, so the table cannot change meanwhile. The
+  // keys are sorted with the entry positions, then the entries are copied in
+  // that order.
+  const std::vector<sai_thrift_fdb_shadow_entry_t> &entries = gFdbTable.entries();
+  std::vector<std::pair<sai_thrift_fdb_key_t, size_t>> order(entries.size());
+  for (size_t i = 0; i < entries.size(); i++) {
+    order[i] = std::make_pair(SaiThriftFdbTable::key(entries[i].fdb_entry), i);
+  }
+  std::sort(order.begin(), order.end(),
+            [](const std::pair<sai_thrift_fdb_key_t, size_t> &a, const std::pair<sai_thrift_fdb_key_t, size_t> &b) {
+              return a.first < b.first;
+            });
+
+  auto snapshot = std::make_shared<sai_thrift_fdb_snapshot_t>();
+  snapshot->entries.reserve(order.size());
+  for (const auto &o : order) {
+    snapshot->entries.push_back(entries[o.second]);
+  }
+  snapshot->version = gFdbTable.version();
+  std::atomic_store(&gFdbSnapshot, std::shared_ptr<const sai_thrift_fdb_snapshot_t>(std::move(snapshot)));
+}
+
+std::shared_ptr<const sai_thrift_fdb_snapshot_t> sai_thrift_fdb_table_snapshot() {
+  return std::atomic_load(&gFdbSnapshot);
+}
+
+bool sai_thrift_fdb_snapshot_query(const sai_thrift_fdb_snapshot_t &snapshot, const sai_thrift_fdb_filter_t &filter,
+                                   const sai_thrift_fdb_key_t *after, size_t limit,
+                                   std::vector<const sai_thrift_fdb_shadow_entry_t *> &matches) {
+  const uint64_t mac_mask = filter.mac_prefix_len == 0 ? 0 :
+                            (~0ULL << (48 - std::min(filter.mac_prefix_len, 48u))) & 0xffffffffffffULL;
+  const uint64_t mac_prefix = filter.mac_prefix & mac_mask;
+  auto entry_before = [](const sai_thrift_fdb_shadow_entry_t &entry, const sai_thrift_fdb_key_t &k) {
+    return SaiThriftFdbTable::key(entry.fdb_entry) < k;
+  };
+  auto key_before = [](const sai_thrift_fdb_key_t &k, const sai_thrift_fdb_shadow_entry_t &entry) {
+    return k < SaiThriftFdbTable::key(entry.fdb_entry);
+  };
+
+  auto it = snapshot.entries.begin();
+  if (filter.bv_id != 0) {
+    sai_thrift_fdb_key_t first = { mac_prefix, filter.bv_id };
+    it = std::lower_bound(snapshot.entries.begin(), snapshot.entries.end(), first, entry_before);
+  }
+  if (after != nullptr) {
+    it = std::max(it, std::upper_bound(snapshot.entries.begin(), snapshot.entries.end(), *after, key_before));
+  }
+
+  for (; it != snapshot.entries.end(); it++) {
+    sai_thrift_fdb_key_t k = SaiThriftFdbTable::key(it->fdb_entry);
+    if (filter.bv_id != 0 && (k.bv_id != filter.bv_id || (k.mac & mac_mask) > mac_prefix)) {
+      break;
+    }
+    if ((k.mac & mac_mask) != mac_prefix ||
+        (filter.bport_id != 0 && it->bport_id != filter.bport_id) ||
+        (filter.entry_type >= 0 && (int32_t) it->entry_type != filter.entry_type)) {
+      continue;
+    }
+    if (matches.size() == limit) {
+      return true;
+    }
+    matches.push_back(&*it);
+  }
+  return false;
+}
+
+std::string sai_thrift_fdb_cursor_encode(const sai_thrift_fdb_key_t &key) {
+  char cursor[29];
+
+  snprintf(cursor, sizeof(cursor), "%016" PRIx64 "%012" PRIx64, (uint64_t) key.bv_id, key.mac);
+  return cursor;
+}
+
+bool sai_thrift_fdb_cursor_decode(const std::string &cursor, sai_thrift_fdb_key_t &key) {
+  if (cursor.size() != 28 || cursor.find_first_not_of("0123456789abcdef") != std::string::npos) {
+    return false;
+  }
+  uint64_t bv_id;
+  if (sscanf(cursor.c_str(), "%16" SCNx64 "%12" SCNx64, &bv_id, &key.mac) != 2) {
+    return false;
+  }
+  key.bv_id = bv_id;
+  return true;
+}
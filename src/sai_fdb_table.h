@@ -0,0 +1,196 @@
+#pragma once
+
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <string>
+#include <unordered_map>
+#include <unordered_set>
+#include <vector>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+#include <sai.h>
+#ifdef __cplusplus
+}
+#endif
+
+/*
+ * Shadow of the FDB learned by the ASIC, maintained from the SAI FDB event
+ * notifications.
+ *
+ * Entries are stored densely in a vector and found through a hash index keyed
+ * by (MAC, bv_id). Secondary indexes by bridge port and by bv_id make the
+ * scoped flushes proportional to the entries they remove. Removal swaps the
+ * last entry into the freed slot, so entry order is not stable.
+ *
+ * Every change of an entry gets the next version as sequence number and is
+ * kept in a change log of the last SAI_THRIFT_FDB_CHANGE_LOG_SIZE changes, so
+ * clients can follow the table incrementally.
+ */
+#define SAI_THRIFT_FDB_CHANGE_LOG_SIZE 65536
+
+typedef struct {
+  sai_fdb_entry_t fdb_entry;
+  sai_object_id_t bport_id;
+  sai_fdb_entry_type_t entry_type;
+} sai_thrift_fdb_shadow_entry_t;
+
+typedef struct {
+  uint64_t mac;
+  sai_object_id_t bv_id;
+} sai_thrift_fdb_key_t;
+
+inline bool operator==(const sai_thrift_fdb_key_t &a, const sai_thrift_fdb_key_t &b) {
+  return a.mac == b.mac && a.bv_id == b.bv_id;
+}
+
+// Orders by bv_id, then MAC.
+inline bool operator<(const sai_thrift_fdb_key_t &a, const sai_thrift_fdb_key_t &b) {
+  return a.bv_id < b.bv_id || (a.bv_id == b.bv_id && a.mac < b.mac);
+}
+
+/*
+ * event_type tells what changed the entry: SAI_FDB_EVENT_LEARNED for a new
+ * entry, SAI_FDB_EVENT_MOVE for a new bridge port or type, SAI_FDB_EVENT_AGED
+ * or SAI_FDB_EVENT_FLUSHED for a removal. entry is the entry after the change,
+ * or the removed one.
+ */
+typedef struct {
+  uint64_t seq;
+  sai_fdb_event_t event_type;
+  sai_thrift_fdb_shadow_entry_t entry;
+} sai_thrift_fdb_change_record_t;
+
+struct sai_thrift_fdb_key_hash {
+  size_t operator()(const sai_thrift_fdb_key_t &key) const {
+    return std::hash<uint64_t>()(key.mac * 0x9e3779b97f4a7c15ULL ^ key.bv_id);
+  }
+};
+
+class SaiThriftFdbTable {
+  public:
+    // Adds the entry or updates its bridge port and type.
+    void learn(const sai_fdb_entry_t &fdb_entry, sai_object_id_t bport_id, sai_fdb_entry_type_t entry_type);
+    // Removes an aged entry.
+    void remove(const sai_fdb_entry_t &fdb_entry);
+    // Removes the entries matching bv_id and bport_id, 0 matches any.
+    void flush(sai_object_id_t bv_id, sai_object_id_t bport_id);
+    // Removing all entries and replacing them count as one change, which the
+    // change log does not describe. Clients following it have to reload.
+    void clear();
+    void replace(SaiThriftFdbTable &&other);
+
+    /*
+     * Appends the changes following since_seq, at most max of them. Returns
+     * false if some of them are no longer in the change log, or since_seq is
+     * newer than the table.
+     */
+    bool changes(uint64_t since_seq, size_t max, std::vector<sai_thrift_fdb_change_record_t> &changes) const;
+
+    const std::vector<sai_thrift_fdb_shadow_entry_t> &entries() const { return entries_; }
+    size_t size() const { return entries_.size(); }
+    // Incremented by every change of the entries, the sequence number of the
+    // latest change.
+    uint64_t version() const { return version_; }
+
+    static sai_thrift_fdb_key_t key(const sai_fdb_entry_t &fdb_entry);
+
+  private:
+    typedef std::unordered_set<sai_thrift_fdb_key_t, sai_thrift_fdb_key_hash> key_set_t;
+
+    void remove_at(size_t pos, sai_fdb_event_t event_type);
+    void record(sai_fdb_event_t event_type, const sai_thrift_fdb_shadow_entry_t &entry);
+    void reset_changes();
+    static void index_erase(std::unordered_map<sai_object_id_t, key_set_t> &index, sai_object_id_t id,
+                            const sai_thrift_fdb_key_t &key);
+
+    std::vector<sai_thrift_fdb_shadow_entry_t> entries_;
+    uint64_t version_ = 0;
+    // Changes changes_start_ + 1 up to version_, in order.
+    std::deque<sai_thrift_fdb_change_record_t> changes_;
+    uint64_t changes_start_ = 0;
+    std::unordered_map<sai_thrift_fdb_key_t, size_t, sai_thrift_fdb_key_hash> positions_;
+    std::unordered_map<sai_object_id_t, key_set_t> by_bport_;
+    std::unordered_map<sai_object_id_t, key_set_t> by_bv_;
+};
+
+/*
+ * Immutable copy of the FDB shadow, readers keep it as long as they need
+ * without holding any lock. Entries are sorted by (bv_id, MAC).
+ */
+typedef struct {
+  std::vector<sai_thrift_fdb_shadow_entry_t> entries;
+  uint64_t version;
+} sai_thrift_fdb_snapshot_t;
+
+/*
+ * An FDB event notification with the attributes the shadow needs copied out,
+ * so it stays valid after the SAI callback returned.
+ */
+typedef struct {
+  sai_fdb_event_t event_type;
+  sai_fdb_entry_t fdb_entry;
+  sai_object_id_t bport_id;
+  sai_fdb_entry_type_t entry_type;
+} sai_thrift_fdb_event_t;
+
+void sai_thrift_fdb_event_parse(const sai_fdb_event_notification_data_t &data, sai_thrift_fdb_event_t &event);
+
+/*
+ * Applies count events, in order, to the FDB shadow of the switch. The
+ * changes become visible to snapshot readers with the next
+ * sai_thrift_fdb_table_publish().
+ */
+void sai_thrift_fdb_table_apply_events(const sai_thrift_fdb_event_t *events, uint32_t count);
+
+/*
+ * Rebuilds the FDB shadow from the FDB entries SAI reports, for when events
+ * were lost. Needs sai_get_object_key(), returns SAI_STATUS_NOT_IMPLEMENTED
+ * if the vendor library lacks it.
+ */
+sai_status_t sai_thrift_fdb_table_resync();
+
+// Changes of the FDB shadow of the switch, see SaiThriftFdbTable::changes().
+bool sai_thrift_fdb_table_changes(uint64_t since_seq, size_t max, std::vector<sai_thrift_fdb_change_record_t> &changes,
+                                  uint64_t &version);
+
+/*
+ * Publishes a new snapshot if the table changed since the last one. Only the
+ * thread writing the table may call it, it reads the table without the lock
+ * so neither writing nor the change log readers wait for the copy.
+ */
+void sai_thrift_fdb_table_publish();
+
+/*
+ * Latest published snapshot of the FDB shadow, shared by all readers. Getting
+ * it is an atomic load, it never waits for the writer.
+ */
+std::shared_ptr<const sai_thrift_fdb_snapshot_t> sai_thrift_fdb_table_snapshot();
+
+typedef struct {
+  // 0 matches any.
+  sai_object_id_t bv_id;
+  sai_object_id_t bport_id;
+  // The first mac_prefix_len bits of the MAC must equal those of mac_prefix,
+  // a MAC in the low 48 bits like sai_thrift_fdb_key_t.
+  uint64_t mac_prefix;
+  uint32_t mac_prefix_len;
+  // A sai_fdb_entry_type_t, -1 matches any.
+  int32_t entry_type;
+} sai_thrift_fdb_filter_t;
+
+/*
+ * Appends to matches, in snapshot order, up to limit entries matching filter
+ * that follow the key after, or from the start if after is null. Returns true
+ * if more matching entries follow. A bv_id filter only walks the range of that
+ * bv_id, narrowed further by the MAC prefix.
+ */
+bool sai_thrift_fdb_snapshot_query(const sai_thrift_fdb_snapshot_t &snapshot, const sai_thrift_fdb_filter_t &filter,
+                                   const sai_thrift_fdb_key_t *after, size_t limit,
+                                   std::vector<const sai_thrift_fdb_shadow_entry_t *> &matches);
+
+// Cursor resuming a query after key, and back.
+std::string sai_thrift_fdb_cursor_encode(const sai_thrift_fdb_key_t &key);
+bool sai_thrift_fdb_cursor_decode(const std::string &cursor, sai_thrift_fdb_key_t &key);
@@ -0,0 +1,343 @@
+#include <cinttypes>
+#include <cstdio>
+#include <cstring>
+#include <iostream>
+#include <map>
+#include <set>
+#include <sstream>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <errno.h>
+#include <netinet/in.h>
+#include <sys/socket.h>
+#include <sys/time.h>
+#include <unistd.h>
+
+#include "sai_api_table.h"
+#include "sai_counter_poller.h"
+#include "sai_metrics_server.h"
+
+typedef struct {
+  sai_object_type_t object_type;
+  const char *family;
+  const char *label;
+} sai_thrift_metrics_family_t;
+
+static const sai_thrift_metrics_family_t gMetricsFamilies[] = {
+  { SAI_OBJECT_TYPE_PORT, "sai_port_stat", "port" },
+  { SAI_OBJECT_TYPE_QUEUE, "sai_queue_stat", "queue" },
+  { SAI_OBJECT_TYPE_INGRESS_PRIORITY_GROUP, "sai_ingress_priority_group_stat", "priority_group" },
+  { SAI_OBJECT_TYPE_BUFFER_POOL, "sai_buffer_pool_stat", "buffer_pool" },
+  { SAI_OBJECT_TYPE_POLICER, "sai_policer_stat", "policer" },
+  { SAI_OBJECT_TYPE_DEBUG_COUNTER, "sai_debug_counter_stat", "debug_counter" },
+};
+
+// Labels describing each exported object, only used by the server thread.
+// Only the objects of the last scrape are kept, and all of them are dropped
+// when the counter groups change, as a new object may reuse the OID of a
+// removed one.
+static std::map<sai_object_id_t, std::string> gMetricsLabels;
+static uint64_t gMetricsLabelsGeneration = 0;
+
+static std::string sai_thrift_metrics_oid(sai_object_id_t object_id) {
+  char buf[32];
+  snprintf(buf, sizeof(buf), "0x%" PRIx64, (uint64_t) object_id);
+  return buf;
+}
+
+static std::string sai_thrift_metrics_escape(const std::string &value) {
+  std::string escaped;
+  for (char c : value) {
+    if (c == '\\' || c == '"') {
+      escaped += '\\';
+      escaped += c;
+    } else if (c == '\n') {
+      escaped += "\\n";
+    } else {
+      escaped += c;
+    }
+  }
+  return escaped;
+}
+
+static sai_status_t sai_thrift_metrics_port_labels(sai_object_id_t port_id, std::ostringstream &labels) {
+  sai_port_api_t *port_api;
+  std::vector<uint32_t> lanes(8);
+  sai_attribute_t attr;
+
+  sai_status_t status = sai_thrift_api_query(SAI_API_PORT, (void **) &port_api);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  attr.id = SAI_PORT_ATTR_HW_LANE_LIST;
+  attr.value.u32list.count = lanes.size();
+  attr.value.u32list.list = lanes.data();
+  status = port_api->get_port_attribute(port_id, 1, &attr);
+  if (status == SAI_STATUS_BUFFER_OVERFLOW) {
+    lanes.resize(attr.value.u32list.count);
+    attr.value.u32list.list = lanes.data();
+    status = port_api->get_port_attribute(port_id, 1, &attr);
+  }
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  labels << ",lanes=\"";
+  for (uint32_t i = 0; i < attr.value.u32list.count; i++) {
+    labels << (i ? "," : "") << lanes[i];
+  }
+  labels << "\"";
+  return SAI_STATUS_SUCCESS;
+}
+
+static sai_status_t sai_thrift_metrics_queue_labels(sai_object_id_t queue_id, std::ostringstream &labels) {
+  sai_queue_api_t *queue_api;
+  sai_attribute_t attrs[2];
+
+  sai_status_t status = sai_thrift_api_query(SAI_API_QUEUE, (void **) &queue_api);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  attrs[0].id = SAI_QUEUE_ATTR_PORT;
+  attrs[1].id = SAI_QUEUE_ATTR_INDEX;
+  status = queue_api->get_queue_attribute(queue_id, 2, attrs);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  labels << ",port=\"" << sai_thrift_metrics_oid(attrs[0].value.oid) << "\",index=\"" << (unsigned) attrs[1].value.u8 << "\"";
+  return SAI_STATUS_SUCCESS;
+}
+
+static sai_status_t sai_thrift_metrics_priority_group_labels(sai_object_id_t pg_id, std::ostringstream &labels) {
+  sai_buffer_api_t *buffer_api;
+  sai_attribute_t attrs[2];
+
+  sai_status_t status = sai_thrift_api_query(SAI_API_BUFFER, (void **) &buffer_api);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  attrs[0].id = SAI_INGRESS_PRIORITY_GROUP_ATTR_PORT;
+  attrs[1].id = SAI_INGRESS_PRIORITY_GROUP_ATTR_INDEX;
+  status = buffer_api->get_ingress_priority_group_attribute(pg_id, 2, attrs);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  labels << ",port=\"" << sai_thrift_metrics_oid(attrs[0].value.oid) << "\",index=\"" << (unsigned) attrs[1].value.u8 << "\"";
+  return SAI_STATUS_SUCCESS;
+}
+
+static std::string sai_thrift_metrics_object_labels(const sai_thrift_metrics_family_t &family, sai_object_id_t object_id) {
+  auto it = gMetricsLabels.find(object_id);
+  if (it != gMetricsLabels.end()) {
+    return it->second;
+  }
+
+  std::ostringstream labels;
+  sai_status_t status = SAI_STATUS_SUCCESS;
+
+  labels << family.label << "=\"" << sai_thrift_metrics_oid(object_id) << "\"";
+  sai_thrift_sai_lock_t sai_lock;
+  if (family.object_type == SAI_OBJECT_TYPE_PORT) {
+    status = sai_thrift_metrics_port_labels(object_id, labels);
+  } else if (family.object_type == SAI_OBJECT_TYPE_QUEUE) {
+    status = sai_thrift_metrics_queue_labels(object_id, labels);
+  } else if (family.object_type == SAI_OBJECT_TYPE_INGRESS_PRIORITY_GROUP) {
+    status = sai_thrift_metrics_priority_group_labels(object_id, labels);
+  }
+  sai_lock.unlock();
+
+  if (status != SAI_STATUS_SUCCESS) {
+    // Export the object without its extra labels, retry on the next scrape.
+    return std::string(family.label) + "=\"" + sai_thrift_metrics_oid(object_id) + "\"";
+  }
+  return gMetricsLabels[object_id] = labels.str();
+}
+
+static std::string sai_thrift_metrics_render() {
+  // Read before the snapshots, a group changed meanwhile clears the labels on
+  // the next scrape.
+  uint64_t generation = sai_thrift_counter_poller_generation();
+  auto snapshots = sai_thrift_counter_poller_get_snapshots();
+  std::set<sai_object_id_t> exported;
+  std::ostringstream out;
+
+  if (generation != gMetricsLabelsGeneration) {
+    gMetricsLabels.clear();
+    gMetricsLabelsGeneration = generation;
+  }
+
+  for (const auto &family : gMetricsFamilies) {
+    bool header = false;
+
+    for (const auto &snapshot : snapshots) {
+      const sai_thrift_poller_group_t &group = snapshot->group;
+      if (group.object_type != family.object_type) {
+        continue;
+      }
+      if (!header) {
+        out << "# TYPE " << family.family << " unknown\n";
+        header = true;
+      }
+
+      std::string group_label = sai_thrift_metrics_escape(group.name);
+      uint32_t row_size = sai_thrift_counter_group_row_size(group);
+      for (uint32_t i = 0; i < group.object_ids.size(); i++) {
+        if (snapshot->statuses[i] != SAI_STATUS_SUCCESS) {
+          continue;
+        }
+        std::string labels = sai_thrift_metrics_object_labels(family, group.object_ids[i]);
+        exported.insert(group.object_ids[i]);
+        for (uint32_t j = 0; j < row_size; j++) {
+          sai_stat_id_t stat = group.object_type == SAI_OBJECT_TYPE_DEBUG_COUNTER ? 0 : group.counter_ids[j];
+          out << family.family << "{group=\"" << group_label << "\"," << labels << ",stat=\"" << stat << "\"} "
+              << snapshot->counters[(size_t) i * row_size + j] << "\n";
+        }
+      }
+    }
+  }
+
+  if (!snapshots.empty()) {
+    out << "# TYPE sai_counter_group_timestamp_seconds gauge\n";
+    for (const auto &snapshot : snapshots) {
+      char timestamp[32];
+      snprintf(timestamp, sizeof(timestamp), "%.6f", snapshot->timestamp_us / 1e6);
+      out << "sai_counter_group_timestamp_seconds{group=\"" << sai_thrift_metrics_escape(snapshot->group.name) << "\"} "
+          << timestamp << "\n";
+    }
+  }
+
+  for (auto it = gMetricsLabels.begin(); it != gMetricsLabels.end();) {
+    if (exported.count(it->first) == 0) {
+      it = gMetricsLabels.erase(it);
+    } else {
+      it++;
+    }
+  }
+
+  out << "# EOF\n";
+  return out.str();
+}
+
+static void sai_thrift_metrics_send(int fd, const std::string &data) {
+  size_t sent = 0;
+  while (sent < data.size()) {
+    ssize_t n = send(fd, data.data() + sent, data.size() - sent, MSG_NOSIGNAL);
+    if (n < 0 && errno == EINTR) {
+      continue;
+    }
+    if (n <= 0) {
+      return;
+    }
+    sent += n;
+  }
+}
+
+static void sai_thrift_metrics_serve(int fd) {
+  char request[4096];
+  size_t len = 0;
+
+  while (len < sizeof(request) - 1) {
+    ssize_t n = recv(fd, request + len, sizeof(request) - 1 - len, 0);
+    if (n < 0 && errno == EINTR) {
+      continue;
+    }
+    if (n <= 0) {
+      return;
+    }
+    len += n;
+    request[len] = '\0';
+    if (strstr(request, "\r\n\r\n") != NULL) {
+      break;
+    }
+  }
+
+  std::string line(request, strcspn(request, "\r\n"));
+  std::ostringstream response;
+  if (line.compare(0, 13, "GET /metrics ") == 0 || line.compare(0, 13, "GET /metrics?") == 0) {
+    std::string body = sai_thrift_metrics_render();
+    response << "HTTP/1.1 200 OK\r\n"
+             << "Content-Type: application/openmetrics-text; version=1.0.0; charset=utf-8\r\n"
+             << "Content-Length: " << body.size() << "\r\n"
+             << "Connection: close\r\n\r\n"
+             << body;
+  } else {
+    response << "HTTP/1.1 404 Not Found\r\n"
+             << "Content-Length: 0\r\n"
+             << "Connection: close\r\n\r\n";
+  }
+  sai_thrift_metrics_send(fd, response.str());
+}
+
+static void sai_thrift_metrics_server_thread(int listen_fd) {
+  while (true) {
+    int fd = accept(listen_fd, NULL, NULL);
+    if (fd < 0) {
+      if (errno != EINTR) {
+        std::cerr << "Failed to accept metrics connection: " << strerror(errno) << std::endl;
+      }
+      continue;
+    }
+
+    // A stalled client must not block the next scrape for long.
+    struct timeval timeout = { 5, 0 };
+    setsockopt(fd, SOL_SOCKET, SO_RCVTIMEO, &timeout, sizeof(timeout));
+    setsockopt(fd, SOL_SOCKET, SO_SNDTIMEO, &timeout, sizeof(timeout));
+
+    sai_thrift_metrics_serve(fd);
+    close(fd);
+  }
+}
+
+sai_status_t sai_thrift_metrics_server_start(int port) {
+  int one = 1;
+  int zero = 0;
+
+  // Listen on IPv6 and IPv4 when the host supports IPv6, IPv4 only otherwise.
+  int fd = socket(AF_INET6, SOCK_STREAM, 0);
+  if (fd >= 0) {
+    struct sockaddr_in6 addr = {};
+    addr.sin6_family = AF_INET6;
+    addr.sin6_addr = in6addr_any;
+    addr.sin6_port = htons(port);
+    setsockopt(fd, SOL_SOCKET, SO_REUSEADDR, &one, sizeof(one));
+    setsockopt(fd, IPPROTO_IPV6, IPV6_V6ONLY, &zero, sizeof(zero));
+    if (bind(fd, (struct sockaddr *) &addr, sizeof(addr)) < 0) {
+      std::cerr << "Failed to bind metrics port " << port << ": " << strerror(errno) << std::endl;
+      close(fd);
+      return SAI_STATUS_FAILURE;
+    }
+  } else {
+    fd = socket(AF_INET, SOCK_STREAM, 0);
+    if (fd < 0) {
+      std::cerr << "Failed to create metrics socket: " << strerror(errno) << std::endl;
+      return SAI_STATUS_FAILURE;
+    }
+    struct sockaddr_in addr = {};
+    addr.sin_family = AF_INET;
+    addr.sin_addr.s_addr = htonl(INADDR_ANY);
+    addr.sin_port = htons(port);
+    setsockopt(fd, SOL_SOCKET, SO_REUSEADDR, &one, sizeof(one));
+    if (bind(fd, (struct sockaddr *) &addr, sizeof(addr)) < 0) {
+      std::cerr << "Failed to bind metrics port " << port << ": " << strerror(errno) << std::endl;
+      close(fd);
+      return SAI_STATUS_FAILURE;
+    }
+  }
+
+  if (listen(fd, 16) < 0) {
+    std::cerr << "Failed to listen on metrics port " << port << ": " << strerror(errno) << std::endl;
+    close(fd);
+    return SAI_STATUS_FAILURE;
+  }
+
+  std::cerr << "Serving counter metrics on port " << port << std::endl;
+  std::thread(sai_thrift_metrics_server_thread, fd).detach();
+  return SAI_STATUS_SUCCESS;
+}
@@ -0,0 +1,26 @@
+#pragma once
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+#include <sai.h>
+#ifdef __cplusplus
+}
+#endif
+
+/*
+ * OpenMetrics exposition of the counter poller.
+ *
+ * Serves GET /metrics over plain HTTP on port and answers every scrape from
+ * the latest snapshots of the counter groups, so scrapes never read the ASIC.
+ * Each object type is one metric family with the SAI stat ID as the stat
+ * label, e.g.
+ *
+ *   sai_port_stat{group="ports",port="0x1000000000002",lanes="1,2,3,4",stat="0"} 1234
+ *   sai_queue_stat{group="queues",queue="0x15000000000010",port="0x1000000000002",index="3",stat="1"} 56
+ *
+ * Lanes, queue and priority group indexes are read from SAI the first time an
+ * object is exported and cached afterwards. Objects whose last read failed
+ * are left out.
+ */
+sai_status_t sai_thrift_metrics_server_start(int port);
@@ -0,0 +1,247 @@
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <iostream>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+#include "sai_fdb_table.h"
+#include "sai_notification_queue.h"
+
+#define SAI_THRIFT_NOTIFICATION_BATCH_SIZE 256
+// FDB snapshots are published at most this often. Rebuilding one copies and
+// sorts the whole table, so the worker also waits SAI_THRIFT_FDB_PUBLISH_RATIO
+// times as long as the last rebuild took.
+#define SAI_THRIFT_FDB_PUBLISH_INTERVAL_MS 100
+#define SAI_THRIFT_FDB_PUBLISH_RATIO 10
+
+/*
+ * Bounded multi-producer single-consumer ring. Every cell carries a sequence
+ * number telling whether it is free for the producer at a position or holds
+ * the event the consumer expects there, so producers only contend on
+ * gEnqueuePos and never wait for each other.
+ */
+typedef struct {
+  std::atomic<uint64_t> sequence;
+  sai_thrift_fdb_event_t event;
+} sai_thrift_notification_cell_t;
+
+// Allocated once and never freed, the worker outlives static destruction.
+static sai_thrift_notification_cell_t *gCells = nullptr;
+static uint64_t gMask = 0;
+static std::atomic<uint64_t> gEnqueuePos(0);
+// Only advanced by the worker, atomic so the stats can read it.
+static std::atomic<uint64_t> gDequeuePos(0);
+
+static std::atomic<uint64_t> gMaxDepth(0);
+static std::atomic<uint64_t> gProcessed(0);
+static std::atomic<uint64_t> gOverflows(0);
+static std::atomic<uint64_t> gFdbResyncs(0);
+static std::atomic<bool> gFdbResyncPending(false);
+
+// The worker sleeps on gWorkerCond when the ring is empty. Producers only take
+// gWorkerMutex to wake it up.
+static std::mutex gWorkerMutex;
+static std::condition_variable gWorkerCond;
+static std::atomic<bool> gWorkerSleeping(false);
+static std::atomic<bool> gStarted(false);
+// Serializes the callbacks writing the FDB shadow before the worker started.
+static std::mutex gSyncMutex;
+
+static bool sai_thrift_notification_enqueue(const sai_thrift_fdb_event_t &event) {
+  uint64_t pos = gEnqueuePos.load(std::memory_order_relaxed);
+  sai_thrift_notification_cell_t *cell;
+
+  while (true) {
+    cell = &gCells[pos & gMask];
+    uint64_t sequence = cell->sequence.load(std::memory_order_acquire);
+    int64_t diff = (int64_t) (sequence - pos);
+    if (diff == 0) {
+      if (gEnqueuePos.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed)) {
+        break;
+      }
+    } else if (diff < 0) {
+      return false;
+    } else {
+      pos = gEnqueuePos.load(std::memory_order_relaxed);
+    }
+  }
+
+  cell->event = event;
+  cell->sequence.store(pos + 1, std::memory_order_release);
+
+  uint64_t depth = pos + 1 - gDequeuePos.load(std::memory_order_relaxed);
+  uint64_t max_depth = gMaxDepth.load(std::memory_order_relaxed);
+  while (depth > max_depth && !gMaxDepth.compare_exchange_weak(max_depth, depth, std::memory_order_relaxed)) {
+  }
+  return true;
+}
+
+static bool sai_thrift_notification_dequeue(sai_thrift_fdb_event_t &event) {
+  uint64_t pos = gDequeuePos.load(std::memory_order_relaxed);
+  sai_thrift_notification_cell_t *cell = &gCells[pos & gMask];
+
+  if (cell->sequence.load(std::memory_order_acquire) != pos + 1) {
+    return false;
+  }
+  event = cell->event;
+  cell->sequence.store(pos + gMask + 1, std::memory_order_release);
+  gDequeuePos.store(pos + 1, std::memory_order_release);
+  return true;
+}
+
+static bool sai_thrift_notification_queue_empty() {
+  uint64_t pos = gDequeuePos.load(std::memory_order_relaxed);
+  return gCells[pos & gMask].sequence.load(std::memory_order_acquire) != pos + 1;
+}
+
+static void sai_thrift_notification_fdb_resync() {
+  sai_thrift_fdb_event_t event;
+  uint64_t dropped = 0;
+
+  // Everything still queued happened before SAI is read below and is
+  // reflected there already.
+  while (sai_thrift_notification_dequeue(event)) {
+    dropped++;
+  }
+  gProcessed += dropped;
+
+  sai_status_t status = sai_thrift_fdb_table_resync();
+  if (status == SAI_STATUS_SUCCESS) {
+    gFdbResyncs++;
+    std::cerr << "FDB shadow resynchronized after notification overflow" << std::endl;
+  } else if (status == SAI_STATUS_NOT_IMPLEMENTED) {
+    std::cerr << "FDB notifications were dropped, the FDB shadow may be incomplete" << std::endl;
+  } else {
+    std::cerr << "Failed to resynchronize the FDB shadow, status: " << status << std::endl;
+    std::this_thread::sleep_for(std::chrono::seconds(1));
+    gFdbResyncPending = true;
+  }
+}
+
+static void sai_thrift_notification_worker() {
+  std::vector<sai_thrift_fdb_event_t> batch(SAI_THRIFT_NOTIFICATION_BATCH_SIZE);
+  std::chrono::steady_clock::duration publish_interval = std::chrono::milliseconds(SAI_THRIFT_FDB_PUBLISH_INTERVAL_MS);
+  auto published = std::chrono::steady_clock::now();
+  bool unpublished = false;
+
+  while (true) {
+    auto now = std::chrono::steady_clock::now();
+    if (unpublished && now - published >= publish_interval) {
+      sai_thrift_fdb_table_publish();
+      published = std::chrono::steady_clock::now();
+      publish_interval = std::max<std::chrono::steady_clock::duration>(
+          std::chrono::milliseconds(SAI_THRIFT_FDB_PUBLISH_INTERVAL_MS),
+          (published - now) * SAI_THRIFT_FDB_PUBLISH_RATIO);
+      unpublished = false;
+      now = published;
+    }
+
+    if (gFdbResyncPending.exchange(false)) {
+      sai_thrift_notification_fdb_resync();
+      unpublished = true;
+      continue;
+    }
+
+    uint32_t count = 0;
+    while (count < batch.size() && sai_thrift_notification_dequeue(batch[count])) {
+      count++;
+    }
+    if (count > 0) {
+      sai_thrift_fdb_table_apply_events(batch.data(), count);
+      gProcessed += count;
+      unpublished = true;
+      continue;
+    }
+
+    // Producers check gWorkerSleeping after publishing an event, the ring is
+    // checked again after setting it so no wakeup is lost. With changes still
+    // to publish the worker only sleeps until they are due.
+    std::chrono::steady_clock::duration timeout = std::chrono::seconds(1);
+    if (unpublished) {
+      timeout = publish_interval - (now - published);
+    }
+    std::unique_lock<std::mutex> lock(gWorkerMutex);
+    gWorkerSleeping = true;
+    std::atomic_thread_fence(std::memory_order_seq_cst);
+    if (sai_thrift_notification_queue_empty() && !gFdbResyncPending) {
+      gWorkerCond.wait_for(lock, timeout);
+    }
+    gWorkerSleeping = false;
+  }
+}
+
+sai_status_t sai_thrift_notification_queue_start(uint32_t capacity) {
+  uint64_t size = 1;
+
+  if (gStarted || capacity == 0) {
+    return SAI_STATUS_INVALID_PARAMETER;
+  }
+
+  while (size < capacity) {
+    size <<= 1;
+  }
+
+  gCells = new sai_thrift_notification_cell_t[size];
+  for (uint64_t i = 0; i < size; i++) {
+    gCells[i].sequence.store(i, std::memory_order_relaxed);
+  }
+  gMask = size - 1;
+
+  {
+    // Callbacks still writing the FDB shadow themselves finish first, the
+    // worker is its only writer from now on.
+    std::lock_guard<std::mutex> lock(gSyncMutex);
+    gStarted.store(true, std::memory_order_release);
+  }
+  std::thread(sai_thrift_notification_worker).detach();
+  return SAI_STATUS_SUCCESS;
+}
+
+void sai_thrift_notification_queue_push_fdb(uint32_t count, const sai_fdb_event_notification_data_t *data) {
+  sai_thrift_fdb_event_t event;
+
+  if (!gStarted.load(std::memory_order_acquire)) {
+    std::lock_guard<std::mutex> lock(gSyncMutex);
+    if (!gStarted) {
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_fdb_event_parse(data[i], event);
+        sai_thrift_fdb_table_apply_events(&event, 1);
+      }
+      sai_thrift_fdb_table_publish();
+      return;
+    }
+  }
+
+  bool pushed = false;
+  for (uint32_t i = 0; i < count; i++) {
+    sai_thrift_fdb_event_parse(data[i], event);
+    if (sai_thrift_notification_enqueue(event)) {
+      pushed = true;
+    } else {
+      gOverflows++;
+      gFdbResyncPending = true;
+    }
+  }
+
+  std::atomic_thread_fence(std::memory_order_seq_cst);
+  if ((pushed || gFdbResyncPending) && gWorkerSleeping) {
+    std::lock_guard<std::mutex> lock(gWorkerMutex);
+    gWorkerCond.notify_one();
+  }
+}
+
+void sai_thrift_notification_queue_get_stats(sai_thrift_notification_queue_stats_t &stats) {
+  uint64_t enqueued = gEnqueuePos.load();
+  uint64_t dequeued = gDequeuePos.load();
+
+  stats.capacity = gStarted ? gMask + 1 : 0;
+  stats.depth = enqueued > dequeued ? enqueued - dequeued : 0;
+  stats.max_depth = gMaxDepth;
+  stats.enqueued = enqueued;
+  stats.processed = gProcessed;
+  stats.overflows = gOverflows;
+  stats.fdb_resyncs = gFdbResyncs;
+}
@@ -0,0 +1,45 @@
+#pragma once
+
+#include <cstdint>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+#include <sai.h>
+#ifdef __cplusplus
+}
+#endif
+
+/*
+ * Decouples the SAI notification callbacks from their processing.
+ *
+ * The callbacks copy each notification into a bounded lock-free ring and
+ * return at once, a worker thread drains the ring in batches and applies them.
+ * When the ring is full the notification is dropped and counted. A dropped
+ * FDB event leaves the FDB shadow incomplete, so the worker rebuilds it from
+ * SAI afterwards, see sai_thrift_fdb_table_resync().
+ *
+ * The worker publishes the FDB changes it applied as a new snapshot, at most
+ * every SAI_THRIFT_FDB_PUBLISH_INTERVAL_MS.
+ */
+typedef struct {
+  uint64_t capacity;
+  // Notifications waiting in the ring, and the most ever seen at once.
+  uint64_t depth;
+  uint64_t max_depth;
+  uint64_t enqueued;
+  uint64_t processed;
+  // Notifications dropped because the ring was full.
+  uint64_t overflows;
+  uint64_t fdb_resyncs;
+} sai_thrift_notification_queue_stats_t;
+
+/*
+ * Creates the ring with capacity rounded up to a power of two and starts the
+ * worker. Notifications pushed before are processed synchronously.
+ */
+sai_status_t sai_thrift_notification_queue_start(uint32_t capacity);
+
+void sai_thrift_notification_queue_push_fdb(uint32_t count, const sai_fdb_event_notification_data_t *data);
+
+void sai_thrift_notification_queue_get_stats(sai_thrift_notification_queue_stats_t &stats);
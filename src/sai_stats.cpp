@@ -0,0 +1,215 @@
+#include <mutex>
+#include <unordered_map>
+#include <vector>
+
+#include "sai_api_table.h"
+#include "sai_stats.h"
+
+extern sai_object_id_t gSwitchId;
+
+extern "C" {
+// Only provided by recent SAI implementations.
+extern sai_status_t sai_bulk_object_get_stats(sai_object_id_t switch_id, sai_object_type_t object_type,
+                                              uint32_t object_count, const sai_object_key_t *object_key,
+                                              uint32_t number_of_counters, const sai_stat_id_t *counter_ids,
+                                              sai_stats_mode_t mode, sai_status_t *object_statuses,
+                                              uint64_t *counters) __attribute__((weak));
+}
+
+sai_status_t sai_thrift_get_object_stats(sai_object_type_t object_type, sai_object_id_t object_id,
+                                         uint32_t number_of_counters, const sai_stat_id_t *counter_ids,
+                                         sai_stats_mode_t mode, uint64_t *counters) {
+  sai_status_t status;
+  void *api = NULL;
+
+  switch (object_type) {
+  case SAI_OBJECT_TYPE_PORT: {
+    status = sai_thrift_api_query(SAI_API_PORT, &api);
+    if (status != SAI_STATUS_SUCCESS) {
+      return status;
+    }
+    sai_port_api_t *port_api = (sai_port_api_t *) api;
+    if (mode == SAI_STATS_MODE_READ) {
+      return port_api->get_port_stats(object_id, number_of_counters, counter_ids, counters);
+    }
+    return port_api->get_port_stats_ext(object_id, number_of_counters, counter_ids, mode, counters);
+  }
+  case SAI_OBJECT_TYPE_QUEUE: {
+    status = sai_thrift_api_query(SAI_API_QUEUE, &api);
+    if (status != SAI_STATUS_SUCCESS) {
+      return status;
+    }
+    sai_queue_api_t *queue_api = (sai_queue_api_t *) api;
+    if (mode == SAI_STATS_MODE_READ) {
+      return queue_api->get_queue_stats(object_id, number_of_counters, counter_ids, counters);
+    }
+    return queue_api->get_queue_stats_ext(object_id, number_of_counters, counter_ids, mode, counters);
+  }
+  case SAI_OBJECT_TYPE_INGRESS_PRIORITY_GROUP: {
+    status = sai_thrift_api_query(SAI_API_BUFFER, &api);
+    if (status != SAI_STATUS_SUCCESS) {
+      return status;
+    }
+    sai_buffer_api_t *buffer_api = (sai_buffer_api_t *) api;
+    if (mode == SAI_STATS_MODE_READ) {
+      return buffer_api->get_ingress_priority_group_stats(object_id, number_of_counters, counter_ids, counters);
+    }
+    return buffer_api->get_ingress_priority_group_stats_ext(object_id, number_of_counters, counter_ids, mode, counters);
+  }
+  case SAI_OBJECT_TYPE_BUFFER_POOL: {
+    status = sai_thrift_api_query(SAI_API_BUFFER, &api);
+    if (status != SAI_STATUS_SUCCESS) {
+      return status;
+    }
+    sai_buffer_api_t *buffer_api = (sai_buffer_api_t *) api;
+    if (mode == SAI_STATS_MODE_READ) {
+      return buffer_api->get_buffer_pool_stats(object_id, number_of_counters, counter_ids, counters);
+    }
+    return buffer_api->get_buffer_pool_stats_ext(object_id, number_of_counters, counter_ids, mode, counters);
+  }
+  case SAI_OBJECT_TYPE_POLICER: {
+    status = sai_thrift_api_query(SAI_API_POLICER, &api);
+    if (status != SAI_STATUS_SUCCESS) {
+      return status;
+    }
+    sai_policer_api_t *policer_api = (sai_policer_api_t *) api;
+    if (mode == SAI_STATS_MODE_READ) {
+      return policer_api->get_policer_stats(object_id, number_of_counters, counter_ids, counters);
+    }
+    return policer_api->get_policer_stats_ext(object_id, number_of_counters, counter_ids, mode, counters);
+  }
+  default:
+    return SAI_STATUS_NOT_SUPPORTED;
+  }
+}
+
+sai_status_t sai_thrift_get_objects_stats(sai_object_type_t object_type, uint32_t object_count,
+                                          const sai_object_id_t *object_ids, uint32_t number_of_counters,
+                                          const sai_stat_id_t *counter_ids, sai_stats_mode_t mode,
+                                          sai_status_t *object_statuses, uint64_t *counters) {
+  sai_status_t status = SAI_STATUS_NOT_IMPLEMENTED;
+
+  if (object_count == 0) {
+    return SAI_STATUS_SUCCESS;
+  }
+
+  if (sai_bulk_object_get_stats != NULL) {
+    std::vector<sai_object_key_t> object_keys(object_count);
+    for (uint32_t i = 0; i < object_count; i++) {
+      object_keys[i].key.object_id = object_ids[i];
+    }
+    status = sai_bulk_object_get_stats(gSwitchId, object_type, object_count, object_keys.data(),
+                                       number_of_counters, counter_ids, mode, object_statuses, counters);
+  }
+  if (status != SAI_STATUS_NOT_IMPLEMENTED && status != SAI_STATUS_NOT_SUPPORTED) {
+    return status;
+  }
+
+  status = SAI_STATUS_SUCCESS;
+  for (uint32_t i = 0; i < object_count; i++) {
+    object_statuses[i] = sai_thrift_get_object_stats(object_type, object_ids[i], number_of_counters,
+                                                     counter_ids, mode, &counters[i * number_of_counters]);
+    if (object_statuses[i] != SAI_STATUS_SUCCESS) {
+      status = SAI_STATUS_FAILURE;
+    }
+  }
+  return status;
+}
+
+// Guards gDebugCounterStatIds, never held while SAI is called.
+static std::mutex gDebugCounterStatIdsMutex;
+static std::unordered_map<sai_object_id_t, sai_stat_id_t> gDebugCounterStatIds;
+
+sai_status_t sai_thrift_get_debug_counter_stat_id(sai_object_id_t object_id, sai_stat_id_t *stat_id) {
+  sai_debug_counter_api_t *debug_counter_api;
+  sai_attribute_t attr = {};
+  sai_stat_id_t index_base;
+
+  {
+    std::lock_guard<std::mutex> lock(gDebugCounterStatIdsMutex);
+    auto it = gDebugCounterStatIds.find(object_id);
+    if (it != gDebugCounterStatIds.end()) {
+      *stat_id = it->second;
+      return SAI_STATUS_SUCCESS;
+    }
+  }
+
+  sai_status_t status = sai_thrift_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  attr.id = SAI_DEBUG_COUNTER_ATTR_TYPE;
+  status = debug_counter_api->get_debug_counter_attribute(object_id, 1, &attr);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  switch (attr.value.s32) {
+  case SAI_DEBUG_COUNTER_TYPE_SWITCH_IN_DROP_REASONS:
+    index_base = SAI_SWITCH_STAT_IN_DROP_REASON_RANGE_BASE;
+    break;
+  case SAI_DEBUG_COUNTER_TYPE_SWITCH_OUT_DROP_REASONS:
+    index_base = SAI_SWITCH_STAT_OUT_DROP_REASON_RANGE_BASE;
+    break;
+  default:
+    return SAI_STATUS_NOT_SUPPORTED;
+  }
+
+  attr.id = SAI_DEBUG_COUNTER_ATTR_INDEX;
+  status = debug_counter_api->get_debug_counter_attribute(object_id, 1, &attr);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  *stat_id = index_base + attr.value.u32;
+
+  std::lock_guard<std::mutex> lock(gDebugCounterStatIdsMutex);
+  gDebugCounterStatIds[object_id] = *stat_id;
+  return SAI_STATUS_SUCCESS;
+}
+
+void sai_thrift_debug_counter_removed(sai_object_id_t object_id) {
+  std::lock_guard<std::mutex> lock(gDebugCounterStatIdsMutex);
+  gDebugCounterStatIds.erase(object_id);
+}
+
+sai_status_t sai_thrift_get_debug_counters_stats(uint32_t object_count, const sai_object_id_t *object_ids,
+                                                 sai_status_t *object_statuses, uint64_t *counters) {
+  sai_switch_api_t *switch_api;
+  std::vector<sai_stat_id_t> stat_ids;
+  std::vector<uint32_t> positions;
+  sai_status_t status;
+
+  status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
+  if (status != SAI_STATUS_SUCCESS) {
+    return status;
+  }
+
+  status = SAI_STATUS_SUCCESS;
+  for (uint32_t i = 0; i < object_count; i++) {
+    sai_stat_id_t stat_id;
+    object_statuses[i] = sai_thrift_get_debug_counter_stat_id(object_ids[i], &stat_id);
+    if (object_statuses[i] != SAI_STATUS_SUCCESS) {
+      status = SAI_STATUS_FAILURE;
+      continue;
+    }
+    stat_ids.push_back(stat_id);
+    positions.push_back(i);
+  }
+
+  if (stat_ids.empty()) {
+    return status;
+  }
+
+  std::vector<uint64_t> values(stat_ids.size(), 0);
+  sai_status_t stats_status = switch_api->get_switch_stats(gSwitchId, stat_ids.size(), stat_ids.data(), values.data());
+  for (uint32_t i = 0; i < positions.size(); i++) {
+    object_statuses[positions[i]] = stats_status;
+    counters[positions[i]] = values[i];
+  }
+  if (stats_status != SAI_STATUS_SUCCESS) {
+    status = SAI_STATUS_FAILURE;
+  }
+  return status;
+}
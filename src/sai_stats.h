@@ -0,0 +1,51 @@
+#pragma once
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+#include <sai.h>
+#ifdef __cplusplus
+}
+#endif
+
+/*
+ * Counter access shared by the RPC handlers and the counter poller.
+ *
+ * Supported object types are ports, queues, ingress priority groups, buffer
+ * pools and policers. Counters of one object are read through the stats
+ * function of its API, the _ext variant is used for modes other than
+ * SAI_STATS_MODE_READ.
+ */
+sai_status_t sai_thrift_get_object_stats(sai_object_type_t object_type, sai_object_id_t object_id,
+                                         uint32_t number_of_counters, const sai_stat_id_t *counter_ids,
+                                         sai_stats_mode_t mode, uint64_t *counters);
+
+/*
+ * Reads the same counters of object_count objects of one type. counters is
+ * filled row by row, object_count rows of number_of_counters values, and
+ * object_statuses gets the status of every object. Uses
+ * sai_bulk_object_get_stats() when the vendor library implements it and one
+ * call per object otherwise. Returns SAI_STATUS_SUCCESS when every object was
+ * read.
+ */
+sai_status_t sai_thrift_get_objects_stats(sai_object_type_t object_type, uint32_t object_count,
+                                          const sai_object_id_t *object_ids, uint32_t number_of_counters,
+                                          const sai_stat_id_t *counter_ids, sai_stats_mode_t mode,
+                                          sai_status_t *object_statuses, uint64_t *counters);
+
+/*
+ * Reads the value of object_count debug counters, one value per counter.
+ * The values are read from the switch drop reason counters with a single
+ * get_switch_stats() call.
+ */
+sai_status_t sai_thrift_get_debug_counters_stats(uint32_t object_count, const sai_object_id_t *object_ids,
+                                                 sai_status_t *object_statuses, uint64_t *counters);
+
+/*
+ * Switch stat ID of a debug counter, the drop reason range base of its type
+ * plus its index. Type and index never change once the counter exists, so
+ * the result is cached until sai_thrift_debug_counter_removed() is called.
+ */
+sai_status_t sai_thrift_get_debug_counter_stat_id(sai_object_id_t object_id, sai_stat_id_t *stat_id);
+
+void sai_thrift_debug_counter_removed(sai_object_id_t object_id);
@@ -15,6 +15,7 @@
 #include <signal.h>
 
 #include <cstring>
+#include <mutex>
 #include <thread>
 
 #include <sys/socket.h>
@@ -22,6 +23,10 @@
 #include <arpa/inet.h>
 #include "switch_sai_rpc.h"
 #include "switch_sai_rpc_server.h"
+#include "sai_api_table.h"
+#include "sai_counter_shm.h"
+#include "sai_notification_queue.h"
+#include "sai_metrics_server.h"
 
 extern "C" {
 #include "sai.h"
@@ -31,6 +36,11 @@ extern "C" {
 
 
 #define SWITCH_SAI_THRIFT_RPC_SERVER_PORT 9090
+#define SWITCH_SAI_THRIFT_RPC_SERVER_WORKERS 8
+#define SWITCH_SAI_THRIFT_RPC_SERVER_IO_THREADS 1
+#define SAI_COUNTER_SHM_MAX_OBJECTS 8192
+#define SAI_COUNTER_SHM_MAX_COUNTERS 262144
+#define SAI_NOTIFICATION_QUEUE_SIZE 65536
 
 typedef struct {
   const char* sai_api_version;
@@ -50,8 +60,6 @@ sai_switch_api_t* sai_switch_api;
 
 std::map<std::string, std::string> gProfileMap;
 
-extern std::vector<std::pair<sai_fdb_entry_t, sai_object_id_t>> gFdbMap;
-
 sai_object_id_t gSwitchId; ///< SAI switch global object ID.
 
 void on_switch_state_change(_In_ sai_object_id_t switch_id,
@@ -60,80 +68,7 @@ void on_switch_state_change(_In_ sai_object_id_t switch_id,
 
 void on_fdb_event(_In_ uint32_t count,
     _In_ sai_fdb_event_notification_data_t *data) {
-  sai_fdb_event_t event_type;
-  sai_fdb_entry_t fdb_entry;
-  uint32_t attr_count;
-  sai_attribute_t *attr;
-  sai_object_id_t bv_id;
-  sai_object_id_t bport_id;
-
-  attr = data->attr;
-  event_type = data->event_type;
-  fdb_entry = data->fdb_entry;
-  bv_id = fdb_entry.bv_id;
-  attr_count = data ->attr_count;
-
-  for (uint32_t i = 0; i < attr_count; i++) {
-    if (attr[i].id == SAI_FDB_ENTRY_ATTR_BRIDGE_PORT_ID) {
-      bport_id = attr[i].value.oid;
-    }
-  }
-
-  sai_fdb_entry_t fdb_m;
-  sai_object_id_t b_id;
-
-  switch (event_type) {
-  case SAI_FDB_EVENT_LEARNED:
-    gFdbMap.emplace_back(std::pair<sai_fdb_entry_t, sai_object_id_t>(fdb_entry,bport_id));
-    break;
-  case SAI_FDB_EVENT_FLUSHED:
-    if (bv_id == 0 && bport_id == 0) {
-      gFdbMap.clear();
-    } else {
-      for (auto it = gFdbMap.begin(); it != gFdbMap.end(); ) {
-        fdb_m = it->first;
-        b_id = it->second;
-
-        if (bport_id == 0 && bv_id == fdb_m.bv_id) {
-          it = gFdbMap.erase(it);
-        } else if (bv_id == 0 && bport_id == b_id) {
-          it = gFdbMap.erase(it);
-        } else if (bv_id == fdb_m.bv_id && bport_id == b_id) {
-          it = gFdbMap.erase(it);
-        } else {
-          it++;
-        }
-      }
-    }
-    break;
-  case SAI_FDB_EVENT_MOVE:
-    for (auto it = gFdbMap.begin(); it != gFdbMap.end(); it++) {
-      fdb_m = it->first;
-      b_id = it->second;
-      int n = memcmp ( fdb_entry.mac_address, fdb_m.mac_address, 6);
-
-      if (n == 0 && bv_id == fdb_m.bv_id) {
-        it->second = bport_id;
-      }
-    }
-    break;
-  case SAI_FDB_EVENT_AGED:
-    for (auto it = gFdbMap.begin(); it != gFdbMap.end(); ) {
-      fdb_m = it->first;
-      b_id = it->second;
-      int n = memcmp ( fdb_entry.mac_address, fdb_m.mac_address, 6);
-
-      if (n == 0 && bv_id == fdb_m.bv_id) {
-        it = gFdbMap.erase(it);
-      } else {
-        it++;
-      }
-    }
-    break;
-  default:
-    printf("unknown event");
-    break;
-  }
+  sai_thrift_notification_queue_push_fdb(count, data);
 }
 
 void on_port_state_change(_In_ uint32_t count,
@@ -225,21 +160,69 @@ void sai_diag_shell() {
 
 struct cmdOptions {
   std::string profileMapFile;
+  sai_thrift_server_type_t serverType;
+  int workerThreads;
+  int ioThreads;
+  sai_thrift_protocol_t protocol;
+  int port;
+  std::string unixSocket;
+  std::string countersShm;
+  int metricsPort;
+  int notificationQueueSize;
+  bool serializeSai;
 };
 
+void usage(const char *prog) {
+  fprintf(stderr, "Usage: %s [-p sai.profile] [-s simple|threaded|threadpool|nonblocking] [-w workers] [-i io-threads] [-P binary|compact|header]\n"
+      "          [-t port] [-u unix-socket] [-c counters-shm] [-m metrics-port] [-q notification-queue]\n"
+      "          [-S on|off]\n", prog);
+  fprintf(stderr, "  -p, --profile FILE    SAI profile map file\n");
+  fprintf(stderr, "  -s, --server TYPE     RPC server engine (default: simple)\n");
+  fprintf(stderr, "  -w, --workers N       worker threads for the threadpool and nonblocking engines (default: %d)\n",
+      SWITCH_SAI_THRIFT_RPC_SERVER_WORKERS);
+  fprintf(stderr, "  -i, --io-threads N    event loop threads for the nonblocking engine (default: %d)\n",
+      SWITCH_SAI_THRIFT_RPC_SERVER_IO_THREADS);
+  fprintf(stderr, "  -P, --protocol PROTO  RPC wire protocol, header accepts all encodings (default: binary)\n");
+  fprintf(stderr, "  -t, --port N          TCP port of the RPC server, 0 disables TCP (default: %d)\n",
+      SWITCH_SAI_THRIFT_RPC_SERVER_PORT);
+  fprintf(stderr, "  -u, --unix-socket PATH  also serve RPC on a unix domain socket at PATH\n");
+  fprintf(stderr, "  -c, --counters-shm PATH  publish polled counter groups to a shared memory table at PATH\n");
+  fprintf(stderr, "  -m, --metrics-port N  serve polled counter groups as OpenMetrics on HTTP port N\n");
+  fprintf(stderr, "  -q, --notification-queue N  notifications buffered for processing (default: %d)\n",
+      SAI_NOTIFICATION_QUEUE_SIZE);
+  fprintf(stderr, "  -S, --serialize-sai on|off  run one SAI call at a time, off requires a thread-safe SAI (default: on)\n");
+}
+
 cmdOptions handleCmdLine(int argc, char **argv) {
 
   cmdOptions options = {};
+  options.serverType = SAI_THRIFT_SERVER_SIMPLE;
+  options.workerThreads = SWITCH_SAI_THRIFT_RPC_SERVER_WORKERS;
+  options.ioThreads = SWITCH_SAI_THRIFT_RPC_SERVER_IO_THREADS;
+  options.protocol = SAI_THRIFT_PROTOCOL_BINARY;
+  options.port = SWITCH_SAI_THRIFT_RPC_SERVER_PORT;
+  options.notificationQueueSize = SAI_NOTIFICATION_QUEUE_SIZE;
+  options.serializeSai = true;
 
   while(true) {
     static struct option long_options[] = {
       { "profile",          required_argument, 0, 'p' },
+      { "server",           required_argument, 0, 's' },
+      { "workers",          required_argument, 0, 'w' },
+      { "io-threads",       required_argument, 0, 'i' },
+      { "protocol",         required_argument, 0, 'P' },
+      { "port",             required_argument, 0, 't' },
+      { "unix-socket",      required_argument, 0, 'u' },
+      { "counters-shm",     required_argument, 0, 'c' },
+      { "metrics-port",     required_argument, 0, 'm' },
+      { "notification-queue", required_argument, 0, 'q' },
+      { "serialize-sai",    required_argument, 0, 'S' },
       { 0,                  0,                 0,  0  }
     };
 
     int option_index = 0;
 
-    int c = getopt_long(argc, argv, "p:f:S:", long_options, &option_index);
+    int c = getopt_long(argc, argv, "p:s:w:i:P:t:u:c:m:q:S:", long_options, &option_index);
 
     if (c == -1) {
       break;
@@ -251,8 +234,98 @@ cmdOptions handleCmdLine(int argc, char **argv) {
       options.profileMapFile = std::string(optarg);
       break;
 
+    case 's':
+      if (strcmp(optarg, "simple") == 0) {
+        options.serverType = SAI_THRIFT_SERVER_SIMPLE;
+      } else if (strcmp(optarg, "threaded") == 0) {
+        options.serverType = SAI_THRIFT_SERVER_THREADED;
+      } else if (strcmp(optarg, "threadpool") == 0) {
+        options.serverType = SAI_THRIFT_SERVER_THREAD_POOL;
+      } else if (strcmp(optarg, "nonblocking") == 0) {
+        options.serverType = SAI_THRIFT_SERVER_NONBLOCKING;
+      } else {
+        fprintf(stderr, "unknown server type: %s\n", optarg);
+        usage(argv[0]);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
+    case 'w':
+      options.workerThreads = atoi(optarg);
+      if (options.workerThreads <= 0) {
+        fprintf(stderr, "invalid number of workers: %s\n", optarg);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
+    case 'i':
+      options.ioThreads = atoi(optarg);
+      if (options.ioThreads <= 0) {
+        fprintf(stderr, "invalid number of I/O threads: %s\n", optarg);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
+    case 'P':
+      if (strcmp(optarg, "binary") == 0) {
+        options.protocol = SAI_THRIFT_PROTOCOL_BINARY;
+      } else if (strcmp(optarg, "compact") == 0) {
+        options.protocol = SAI_THRIFT_PROTOCOL_COMPACT;
+      } else if (strcmp(optarg, "header") == 0) {
+        options.protocol = SAI_THRIFT_PROTOCOL_HEADER;
+      } else {
+        fprintf(stderr, "unknown protocol: %s\n", optarg);
+        usage(argv[0]);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
+    case 't':
+      options.port = atoi(optarg);
+      if (options.port < 0 || options.port > 65535) {
+        fprintf(stderr, "invalid port: %s\n", optarg);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
+    case 'u':
+      options.unixSocket = std::string(optarg);
+      break;
+
+    case 'c':
+      options.countersShm = std::string(optarg);
+      break;
+
+    case 'm':
+      options.metricsPort = atoi(optarg);
+      if (options.metricsPort <= 0 || options.metricsPort > 65535) {
+        fprintf(stderr, "invalid metrics port: %s\n", optarg);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
+    case 'q':
+      options.notificationQueueSize = atoi(optarg);
+      if (options.notificationQueueSize <= 0) {
+        fprintf(stderr, "invalid notification queue size: %s\n", optarg);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
+    case 'S':
+      if (strcmp(optarg, "on") == 0) {
+        options.serializeSai = true;
+      } else if (strcmp(optarg, "off") == 0) {
+        options.serializeSai = false;
+      } else {
+        fprintf(stderr, "invalid serialize-sai value: %s\n", optarg);
+        usage(argv[0]);
+        exit(EXIT_FAILURE);
+      }
+      break;
+
     default:
-      fprintf(stderr, "Usage: %s [-p sai.profile]\n", argv[0]);
+      usage(argv[0]);
       exit(EXIT_FAILURE);
     }
   }
@@ -300,6 +373,7 @@ int main(int argc, char* argv[]) {
   sai_api_version_t version;
   auto options = handleCmdLine(argc, argv);
   handleProfileMap(options.profileMapFile);
+  gSaiSerialize = options.serializeSai;
 
   if (sai_query_api_version(&version) == SAI_STATUS_SUCCESS) {
     int major = version / 10000;
@@ -333,17 +407,25 @@ int main(int argc, char* argv[]) {
 
   auto status = sai_api_initialize(0, (sai_service_method_table_t *)&test_services);
   if (status == SAI_STATUS_SUCCESS) {
-    int failed = sai_api_query(SAI_API_SWITCH, (void**)&sai_switch_api);
-
-    if (failed > 0) {
-      printf("SAI_API_SWITCH failed for %d apis", failed);
+    status = sai_thrift_api_table_init();
+    if (status != SAI_STATUS_SUCCESS) {
+      printf("FATAL: failed to query the core SAI APIs: %d\n", status);
       exit(EXIT_FAILURE);
     }
+
+    sai_thrift_api_query(SAI_API_SWITCH, (void**)&sai_switch_api);
   } else {
     printf("FATAL: failed to sai_api_initialize: %d", status);
     exit(EXIT_FAILURE);
   }
 
+  // Notifications may arrive as soon as the switch is created.
+  status = sai_thrift_notification_queue_start(options.notificationQueueSize);
+  if (status != SAI_STATUS_SUCCESS) {
+    printf("FATAL: failed to start the notification queue: %d\n", status);
+    exit(EXIT_FAILURE);
+  }
+
   constexpr std::uint32_t attrSz = 6;
 
   sai_attribute_t attr[attrSz];
@@ -372,40 +454,71 @@ int main(int argc, char* argv[]) {
   attr[5].id = SAI_SWITCH_ATTR_PORT_STATE_CHANGE_NOTIFY;
   attr[5].value.ptr = reinterpret_cast<sai_pointer_t>(&on_port_state_change);
 
-  status = sai_switch_api->create_switch(&gSwitchId, attrSz, attr);
+  {
+    sai_thrift_sai_lock_t sai_lock;
+    status = sai_switch_api->create_switch(&gSwitchId, attrSz, attr);
+  }
   if (status != SAI_STATUS_SUCCESS) {
     printf("Error: Failed to create switch: %d \n", status);
     exit(EXIT_FAILURE);
   }
 
+  // The diagnostic shell holds its set_switch_attribute call for as long as the
+  // shell runs, so it goes around the SAI lock instead of blocking every caller.
   std::thread diag_shell_thread = std::thread(sai_diag_shell);
   diag_shell_thread.detach();
 
-  start_sai_thrift_rpc_server(SWITCH_SAI_THRIFT_RPC_SERVER_PORT);
+  if (!options.countersShm.empty()) {
+    status = sai_thrift_counter_shm_open(options.countersShm.c_str(), SAI_COUNTER_SHM_MAX_OBJECTS, SAI_COUNTER_SHM_MAX_COUNTERS);
+    if (status != SAI_STATUS_SUCCESS) {
+      printf("Error: Failed to create counter table %s\n", options.countersShm.c_str());
+      exit(EXIT_FAILURE);
+    }
+  }
 
-  const sai_log_level_t log_level = SAI_LOG_LEVEL_NOTICE;
+  if (options.metricsPort != 0 && sai_thrift_metrics_server_start(options.metricsPort) != SAI_STATUS_SUCCESS) {
+    printf("Error: Failed to start metrics server on port %d\n", options.metricsPort);
+    exit(EXIT_FAILURE);
+  }
+
+  sai_thrift_server_config_t server_config = {};
+  server_config.port = options.port;
+  server_config.server_type = options.serverType;
+  server_config.worker_threads = options.workerThreads;
+  server_config.io_threads = options.ioThreads;
+  server_config.protocol = options.protocol;
+  server_config.unix_socket = options.unixSocket.empty() ? NULL : options.unixSocket.c_str();
+
+  if (start_sai_thrift_rpc_server(&server_config) != 0) {
+    printf("Error: Failed to start SAI RPC server\n");
+    exit(EXIT_FAILURE);
+  }
 
-  sai_log_set(SAI_API_ACL, log_level);
-  sai_log_set(SAI_API_BRIDGE, log_level);
-  sai_log_set(SAI_API_BUFFER, log_level);
-  sai_log_set(SAI_API_DEBUG_COUNTER, log_level);
-  sai_log_set(SAI_API_FDB, log_level);
-  sai_log_set(SAI_API_HOSTIF, log_level);
-  sai_log_set(SAI_API_LAG, log_level);
-  sai_log_set(SAI_API_MIRROR, log_level);
-  sai_log_set(SAI_API_NEIGHBOR, log_level);
-  sai_log_set(SAI_API_NEXT_HOP, log_level);
-  sai_log_set(SAI_API_NEXT_HOP_GROUP, log_level);
-  sai_log_set(SAI_API_POLICER, log_level);
-  sai_log_set(SAI_API_PORT, log_level);
-  sai_log_set(SAI_API_QOS_MAP, log_level);
-  sai_log_set(SAI_API_ROUTE, log_level);
-  sai_log_set(SAI_API_ROUTER_INTERFACE, log_level);
-  sai_log_set(SAI_API_SWITCH, log_level);
-  sai_log_set(SAI_API_TUNNEL, log_level);
-  sai_log_set(SAI_API_VIRTUAL_ROUTER, log_level);
-  sai_log_set(SAI_API_VLAN, log_level);
-  sai_log_set(SAI_API_WRED, log_level);
+  const sai_log_level_t log_level = SAI_LOG_LEVEL_NOTICE;
+  {
+    sai_thrift_sai_lock_t sai_lock;
+    sai_log_set(SAI_API_ACL, log_level);
+    sai_log_set(SAI_API_BRIDGE, log_level);
+    sai_log_set(SAI_API_BUFFER, log_level);
+    sai_log_set(SAI_API_DEBUG_COUNTER, log_level);
+    sai_log_set(SAI_API_FDB, log_level);
+    sai_log_set(SAI_API_HOSTIF, log_level);
+    sai_log_set(SAI_API_LAG, log_level);
+    sai_log_set(SAI_API_MIRROR, log_level);
+    sai_log_set(SAI_API_NEIGHBOR, log_level);
+    sai_log_set(SAI_API_NEXT_HOP, log_level);
+    sai_log_set(SAI_API_NEXT_HOP_GROUP, log_level);
+    sai_log_set(SAI_API_POLICER, log_level);
+    sai_log_set(SAI_API_PORT, log_level);
+    sai_log_set(SAI_API_QOS_MAP, log_level);
+    sai_log_set(SAI_API_ROUTE, log_level);
+    sai_log_set(SAI_API_ROUTER_INTERFACE, log_level);
+    sai_log_set(SAI_API_SWITCH, log_level);
+    sai_log_set(SAI_API_TUNNEL, log_level);
+    sai_log_set(SAI_API_VIRTUAL_ROUTER, log_level);
+    sai_log_set(SAI_API_VLAN, log_level);
+    sai_log_set(SAI_API_WRED, log_level);
+  }
 
   while (true) {
     pause();
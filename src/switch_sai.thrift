@@ -37,6 +37,8 @@ typedef i32 sai_thrift_pg_stat_counter_t
 typedef i32 sai_thrift_buffer_pool_stat_counter_t
 typedef i32 sai_thrift_policer_stat_t
 typedef i32 sai_thrift_stat_id_t
+typedef i32 sai_thrift_bulk_op_error_mode_t
+typedef i32 sai_thrift_stats_mode_t
 
 struct sai_thrift_fdb_entry_t {
     1: sai_thrift_mac_t mac_address;
@@ -218,21 +220,200 @@ struct sai_thrift_result_t {
     2: sai_thrift_status_t status;
 }
 
+// Result of a bulk call: status is SAI_STATUS_SUCCESS when every object
+// succeeded, statuses holds one status per object in request order.
+// object_ids is only filled by bulk creates of objects with an object ID.
+struct sai_thrift_bulk_result_t {
+    1: sai_thrift_status_t status;
+    2: list<sai_thrift_status_t> statuses;
+    3: list<sai_thrift_object_id_t> object_ids;
+}
+
+// Counters of several objects: status is SAI_STATUS_SUCCESS when every object
+// was read, statuses holds one status per object and counters one row of
+// counter values per object, in request order.
+struct sai_thrift_stats_matrix_t {
+    1: sai_thrift_status_t status;
+    2: list<sai_thrift_status_t> statuses;
+    3: list<i64> counters;
+}
+
+// Counters of one object, in request order. counters is empty unless status
+// is SAI_STATUS_SUCCESS.
+struct sai_thrift_stats_result_t {
+    1: sai_thrift_status_t status;
+    2: list<i64> counters;
+}
+
+// Counters polled by the server every interval_ms. object_type is a
+// sai_object_type_t: port, queue, ingress priority group, buffer pool,
+// policer or debug counter. Debug counters have one value each and ignore
+// counter_ids.
+struct sai_thrift_counter_group_t {
+    1: string name;
+    2: i32 object_type;
+    3: list<sai_thrift_object_id_t> object_ids;
+    4: list<sai_thrift_stat_id_t> counter_ids;
+    5: i32 interval_ms;
+}
+
+// Latest poll of a counter group. status is SAI_STATUS_ITEM_NOT_FOUND for an
+// unknown group and SAI_STATUS_NOT_EXECUTED before the first poll. counters
+// holds one row of values per object like sai_thrift_stats_matrix_t.
+struct sai_thrift_counter_snapshot_t {
+    1: sai_thrift_status_t status;
+    2: sai_thrift_counter_group_t group;
+    3: list<sai_thrift_status_t> statuses;
+    4: list<i64> counters;
+    5: i64 timestamp_us;
+    6: i64 seq;
+}
+
+// Counters of the queue between the SAI notification callbacks and their
+// processing. overflows counts notifications dropped because the queue was
+// full, fdb_resyncs the FDB shadow rebuilds that followed.
+struct sai_thrift_notification_stats_t {
+    1: i64 capacity;
+    2: i64 depth;
+    3: i64 max_depth;
+    4: i64 enqueued;
+    5: i64 processed;
+    6: i64 overflows;
+    7: i64 fdb_resyncs;
+}
+
+// Filters of sai_thrift_query_fdb_entries, 0 or -1 match any entry. The first
+// mac_prefix_len bits of an entry's MAC must match mac_address. entry_type is
+// a sai_fdb_entry_type_t.
+//
+// A query returns at most page_size entries, sorted by bv_id then MAC. Pass
+// the next_cursor of a page as cursor to get the following one, with the same
+// filters. Entries changed between pages show up in a later page or not at all.
+struct sai_thrift_fdb_query_t {
+    1: sai_thrift_object_id_t bv_id;
+    2: sai_thrift_object_id_t bport_id;
+    3: sai_thrift_mac_t mac_address;
+    4: i32 mac_prefix_len;
+    5: i32 entry_type = -1;
+    6: i32 page_size;
+    7: string cursor;
+}
+
+// mac holds the MAC in its low 48 bits, first byte most significant.
+struct sai_thrift_fdb_query_entry_t {
+    1: i64 mac;
+    2: sai_thrift_object_id_t bv_id;
+    3: sai_thrift_object_id_t bport_id;
+    4: i32 entry_type;
+}
+
+// next_cursor is empty on the last page. version is the version of the FDB
+// shadow the page was read from.
+struct sai_thrift_fdb_page_t {
+    1: sai_thrift_status_t status;
+    2: list<sai_thrift_fdb_query_entry_t> entries;
+    3: string next_cursor;
+    4: i64 version;
+}
+
+// One change of the FDB shadow. event_type is the sai_fdb_event_t behind it:
+// learned for a new entry, move for a new bridge port or entry type, aged or
+// flushed for a removal. entry is the entry after the change, or the removed
+// one.
+struct sai_thrift_fdb_change_t {
+    1: i64 seq;
+    2: i32 event_type;
+    3: sai_thrift_fdb_query_entry_t entry;
+}
+
+// Changes following since_seq, in order. seq is the sequence number to pass
+// next: the one of the last change returned, or the current version of the
+// FDB shadow when there are none.
+//
+// resync is set, without changes, when the changes since since_seq are no
+// longer known. The client then reloads the table with
+// sai_thrift_query_fdb_entries and follows the changes from the version of
+// the first page. Replaying changes onto entries read later is harmless.
+struct sai_thrift_fdb_changes_t {
+    1: bool resync;
+    2: list<sai_thrift_fdb_change_t> changes;
+    3: i64 seq;
+}
+
+struct sai_thrift_counter_rates_t {
+    1: sai_thrift_status_t status;
+    2: sai_thrift_counter_group_t group;
+    3: list<sai_thrift_status_t> statuses;
+    4: list<i64> deltas;
+    5: list<double> rates;
+    6: i64 interval_us;
+    7: i64 timestamp_us;
+    8: i64 seq;
+}
+
+enum sai_thrift_batch_op_type_t {
+    SAI_THRIFT_BATCH_OP_CREATE = 0,
+    SAI_THRIFT_BATCH_OP_REMOVE = 1,
+    SAI_THRIFT_BATCH_OP_SET = 2,
+}
+
+// One operation of sai_thrift_execute_batch. object_type is a
+// sai_object_type_t. OID objects are addressed by oid, route, neighbor and
+// FDB entries by their entry field. A create takes all of attr_list, a set
+// applies the attributes of attr_list one after the other.
+//
+// Operations refer to objects created earlier in the same batch by the index
+// of the create operation: oid_ref replaces oid, or the vr_id, rif_id or
+// bv_id of the entry, and attr_oid_refs maps an attr_list index to the
+// operation whose OID replaces that attribute's value.oid. Only successful
+// creates can be referred to, and the create of an OID object takes no
+// oid_ref.
+struct sai_thrift_batch_op_t {
+    1: sai_thrift_batch_op_type_t op;
+    2: i32 object_type;
+    3: sai_thrift_object_id_t oid;
+    4: list<sai_thrift_attribute_t> attr_list;
+    5: sai_thrift_route_entry_t route_entry;
+    6: sai_thrift_neighbor_entry_t neighbor_entry;
+    7: sai_thrift_fdb_entry_t fdb_entry;
+    8: i32 oid_ref = -1;
+    9: map<i32, i32> attr_oid_refs;
+}
+
 service switch_sai_rpc {
     //port API
     sai_thrift_status_t sai_thrift_set_port_attribute(1: sai_thrift_object_id_t port_id, 2: sai_thrift_attribute_t thrift_attr);
     sai_thrift_attribute_list_t sai_thrift_get_port_attribute(1: sai_thrift_object_id_t port_id);
+    // thrift_attrs holds either one attribute set on every port or one
+    // attribute per port.
+    sai_thrift_bulk_result_t sai_thrift_set_ports_attribute(
+                             1: list<sai_thrift_object_id_t> port_ids,
+                             2: list<sai_thrift_attribute_t> thrift_attrs,
+                             3: sai_thrift_bulk_op_error_mode_t mode);
     list<i64> sai_thrift_get_port_stats(
                              1: sai_thrift_object_id_t port_id,
                              2: list<sai_thrift_port_stat_counter_t> counter_ids,
                              3: i32 number_of_counters);
+    sai_thrift_stats_result_t sai_thrift_get_port_stats_ext(
+                             1: sai_thrift_object_id_t port_id,
+                             2: list<sai_thrift_port_stat_counter_t> counter_ids,
+                             3: sai_thrift_stats_mode_t mode);
     sai_thrift_status_t sai_thrift_clear_port_all_stats(1: sai_thrift_object_id_t port_id)
 
     //fdb API
     sai_thrift_status_t sai_thrift_create_fdb_entry(1: sai_thrift_fdb_entry_t thrift_fdb_entry, 2: list<sai_thrift_attribute_t> thrift_attr_list);
     sai_thrift_status_t sai_thrift_delete_fdb_entry(1: sai_thrift_fdb_entry_t thrift_fdb_entry);
+    sai_thrift_bulk_result_t sai_thrift_create_fdb_entries(
+                             1: list<sai_thrift_fdb_entry_t> thrift_fdb_entries,
+                             2: list<list<sai_thrift_attribute_t>> thrift_attr_lists,
+                             3: sai_thrift_bulk_op_error_mode_t mode);
+    sai_thrift_bulk_result_t sai_thrift_delete_fdb_entries(
+                             1: list<sai_thrift_fdb_entry_t> thrift_fdb_entries,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
     sai_thrift_status_t sai_thrift_flush_fdb_entries(1: list <sai_thrift_attribute_t> thrift_attr_list);
     sai_thrift_attribute_list_t sai_thrift_get_fdb_entries();
+    sai_thrift_fdb_page_t sai_thrift_query_fdb_entries(1: sai_thrift_fdb_query_t query);
+    sai_thrift_fdb_changes_t sai_thrift_get_fdb_changes(1: i64 since_seq, 2: i32 max_changes);
 
     //vlan API
     sai_thrift_object_id_t sai_thrift_create_vlan(1: list<sai_thrift_attribute_t> thrift_attr_list);
@@ -244,6 +425,12 @@ service switch_sai_rpc {
     sai_thrift_object_id_t sai_thrift_create_vlan_member(1: list<sai_thrift_attribute_t> thrift_attr_list);
     sai_thrift_attribute_list_t sai_thrift_get_vlan_member_attribute(1: sai_thrift_object_id_t vlan_member_id);
     sai_thrift_status_t sai_thrift_remove_vlan_member(1: sai_thrift_object_id_t vlan_member_id);
+    sai_thrift_bulk_result_t sai_thrift_create_vlan_members(
+                             1: list<list<sai_thrift_attribute_t>> thrift_attr_lists,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
+    sai_thrift_bulk_result_t sai_thrift_remove_vlan_members(
+                             1: list<sai_thrift_object_id_t> vlan_member_ids,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
     sai_thrift_attribute_list_t sai_thrift_get_vlan_attribute(1: sai_thrift_object_id_t vlan_id);
     sai_thrift_result_t sai_thrift_get_vlan_id(1: sai_thrift_object_id_t vlan_id);
     sai_thrift_status_t sai_thrift_set_vlan_attribute(1: sai_thrift_object_id_t vlan_oid,
@@ -256,6 +443,17 @@ service switch_sai_rpc {
     //route API
     sai_thrift_status_t sai_thrift_create_route(1: sai_thrift_route_entry_t thrift_route_entry, 2: list<sai_thrift_attribute_t> thrift_attr_list);
     sai_thrift_status_t sai_thrift_remove_route(1: sai_thrift_route_entry_t thrift_route_entry);
+    sai_thrift_bulk_result_t sai_thrift_create_routes(
+                             1: list<sai_thrift_route_entry_t> thrift_route_entries,
+                             2: list<list<sai_thrift_attribute_t>> thrift_attr_lists,
+                             3: sai_thrift_bulk_op_error_mode_t mode);
+    sai_thrift_bulk_result_t sai_thrift_remove_routes(
+                             1: list<sai_thrift_route_entry_t> thrift_route_entries,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
+    sai_thrift_bulk_result_t sai_thrift_set_routes_attribute(
+                             1: list<sai_thrift_route_entry_t> thrift_route_entries,
+                             2: list<sai_thrift_attribute_t> thrift_attrs,
+                             3: sai_thrift_bulk_op_error_mode_t mode);
 
     //router interface API
     sai_thrift_object_id_t sai_thrift_create_router_interface(1: list<sai_thrift_attribute_t> thrift_attr_list);
@@ -271,6 +469,12 @@ service switch_sai_rpc {
     sai_thrift_status_t sai_thrift_remove_next_hop_group(1: sai_thrift_object_id_t nhop_group_oid);
     sai_thrift_object_id_t sai_thrift_create_next_hop_group_member(1: list<sai_thrift_attribute_t> thrift_attr_list);
     sai_thrift_status_t sai_thrift_remove_next_hop_group_member(1: sai_thrift_object_id_t nhop_group_member_oid);
+    sai_thrift_bulk_result_t sai_thrift_create_next_hop_group_members(
+                             1: list<list<sai_thrift_attribute_t>> thrift_attr_lists,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
+    sai_thrift_bulk_result_t sai_thrift_remove_next_hop_group_members(
+                             1: list<sai_thrift_object_id_t> nhop_group_member_oids,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
 
     //lag API
     sai_thrift_object_id_t sai_thrift_create_lag(1: list<sai_thrift_attribute_t> thrift_attr_list);
@@ -279,6 +483,12 @@ service switch_sai_rpc {
                                                      2: sai_thrift_attribute_t thrift_attr);
     sai_thrift_object_id_t sai_thrift_create_lag_member(1: list<sai_thrift_attribute_t> thrift_attr_list);
     sai_thrift_status_t sai_thrift_remove_lag_member(1: sai_thrift_object_id_t lag_member_id);
+    sai_thrift_bulk_result_t sai_thrift_create_lag_members(
+                             1: list<list<sai_thrift_attribute_t>> thrift_attr_lists,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
+    sai_thrift_bulk_result_t sai_thrift_remove_lag_members(
+                             1: list<sai_thrift_object_id_t> lag_member_ids,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
     sai_thrift_attribute_list_t sai_thrift_get_lag_member_attribute(1: sai_thrift_object_id_t lag_member_id);
 
     //stp API
@@ -291,6 +501,13 @@ service switch_sai_rpc {
     sai_thrift_status_t sai_thrift_create_neighbor_entry(1: sai_thrift_neighbor_entry_t thrift_neighbor_entry, 2: list<sai_thrift_attribute_t> thrift_attr_list);
     sai_thrift_status_t sai_thrift_remove_neighbor_entry(1: sai_thrift_neighbor_entry_t thrift_neighbor_entry);
     sai_thrift_status_t sai_thrift_set_neighbor_entry_attribute(1: sai_thrift_neighbor_entry_t thrift_neighbor_entry, 2: list<sai_thrift_attribute_t> thrift_attr);
+    sai_thrift_bulk_result_t sai_thrift_create_neighbor_entries(
+                             1: list<sai_thrift_neighbor_entry_t> thrift_neighbor_entries,
+                             2: list<list<sai_thrift_attribute_t>> thrift_attr_lists,
+                             3: sai_thrift_bulk_op_error_mode_t mode);
+    sai_thrift_bulk_result_t sai_thrift_remove_neighbor_entries(
+                             1: list<sai_thrift_neighbor_entry_t> thrift_neighbor_entries,
+                             2: sai_thrift_bulk_op_error_mode_t mode);
 
     //switch API
     sai_thrift_attribute_list_t sai_thrift_get_switch_attribute();
@@ -301,6 +518,9 @@ service switch_sai_rpc {
     sai_thrift_result_t sai_thrift_get_default_vlan_id();
     sai_thrift_status_t sai_thrift_set_switch_attribute(1: sai_thrift_attribute_t attribute);
     i64 sai_thrift_get_switch_stats_by_oid(1: sai_thrift_object_id_t thrift_counter_id);
+    // One counter value per debug counter, read with a single get_switch_stats call.
+    sai_thrift_stats_matrix_t sai_thrift_get_debug_counters_stats(1: list<sai_thrift_object_id_t> debug_counter_ids);
+    sai_thrift_notification_stats_t sai_thrift_get_notification_stats();
 
     //bridge API
     sai_thrift_result_t sai_thrift_create_bridge_port(1: list<sai_thrift_attribute_t> thrift_attr_list);
@@ -378,6 +598,10 @@ service switch_sai_rpc {
                              1: sai_thrift_object_id_t queue_id,
                              2: list<sai_thrift_queue_stat_counter_t> counter_ids,
                              3: i32 number_of_counters);
+    sai_thrift_stats_result_t sai_thrift_get_queue_stats_ext(
+                             1: sai_thrift_object_id_t queue_id,
+                             2: list<sai_thrift_queue_stat_counter_t> counter_ids,
+                             3: sai_thrift_stats_mode_t mode);
     sai_thrift_status_t sai_thrift_clear_queue_stats(
                              1: sai_thrift_object_id_t queue_id,
                              2: list<sai_thrift_queue_stat_counter_t> counter_ids,
@@ -391,6 +615,10 @@ service switch_sai_rpc {
     list<i64> sai_thrift_get_buffer_pool_stats(
                         1: sai_thrift_object_id_t buffer_pool_id,
                         2: list<sai_thrift_buffer_pool_stat_counter_t> counter_ids);
+    sai_thrift_stats_result_t sai_thrift_get_buffer_pool_stats_ext(
+                        1: sai_thrift_object_id_t buffer_pool_id,
+                        2: list<sai_thrift_buffer_pool_stat_counter_t> counter_ids,
+                        3: sai_thrift_stats_mode_t mode);
     sai_thrift_status_t sai_thrift_clear_buffer_pool_stats(
                         1: sai_thrift_object_id_t buffer_pool_id,
                         2: list<sai_thrift_buffer_pool_stat_counter_t> counter_ids);
@@ -400,6 +628,26 @@ service switch_sai_rpc {
                         1: sai_thrift_object_id_t pg_id,
                         2: list<sai_thrift_pg_stat_counter_t> counter_ids,
                         3: i32 number_of_counters);
+    sai_thrift_stats_result_t sai_thrift_get_pg_stats_ext(
+                        1: sai_thrift_object_id_t pg_id,
+                        2: list<sai_thrift_pg_stat_counter_t> counter_ids,
+                        3: sai_thrift_stats_mode_t mode);
+
+    // Stats API
+    // object_type is a sai_object_type_t: port, queue, ingress priority
+    // group, buffer pool or policer.
+    sai_thrift_stats_matrix_t sai_thrift_get_objects_stats(
+                        1: i32 object_type,
+                        2: list<sai_thrift_object_id_t> object_ids,
+                        3: list<sai_thrift_stat_id_t> counter_ids,
+                        4: sai_thrift_stats_mode_t mode);
+
+    // Counter poller API
+    sai_thrift_status_t sai_thrift_set_counter_group(1: sai_thrift_counter_group_t thrift_group);
+    sai_thrift_status_t sai_thrift_remove_counter_group(1: string name);
+    sai_thrift_counter_snapshot_t sai_thrift_get_counter_snapshot(1: string name);
+    sai_thrift_counter_rates_t sai_thrift_get_counter_rates(1: string name);
+    sai_thrift_counter_snapshot_t sai_thrift_wait_counter_update(1: string name, 2: i64 after_seq, 3: i32 timeout_ms);
 
     // WRED API
     sai_thrift_object_id_t sai_thrift_create_wred_profile(1: list<sai_thrift_attribute_t> thrift_attr_list);
@@ -420,6 +668,13 @@ service switch_sai_rpc {
     sai_thrift_status_t sai_thrift_remove_debug_counter(1: sai_thrift_object_id_t thrift_debug_counter_id);
     sai_thrift_status_t sai_thrift_set_debug_counter_attribute(1: sai_thrift_object_id_t dc_id,
                                                                2: sai_thrift_attribute_t thrift_attr);
+    // Batch API
+    // Runs the operations in order and stops at the first failure, the
+    // operations after it are reported as SAI_STATUS_NOT_EXECUTED. Operations
+    // that succeeded are not rolled back. object_ids holds the OID of each
+    // OID object operation.
+    sai_thrift_bulk_result_t sai_thrift_execute_batch(1: list<sai_thrift_batch_op_t> ops);
+
     // VOQ API
     sai_thrift_object_id_t sai_thrift_get_sys_port_obj_id_by_port_id(1: i32 sys_port_id);
     sai_thrift_attribute_list_t sai_thrift_get_system_port_attribute(1: sai_thrift_object_id_t sys_port_object_id);
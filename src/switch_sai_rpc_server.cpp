@@ -14,6 +14,7 @@
    limitations under the License.
 */
 
+#include <cerrno>
 #include <cstddef>
 #include <cstdint>
 #include <cstring>
@@ -23,8 +24,11 @@
 #include <sstream>
 #include <fstream>
 
+#include <algorithm>
 #include <string>
 #include <vector>
+#include <set>
+#include <mutex>
 
 #include <iomanip>
 
@@ -32,10 +36,20 @@
 #include <string>
 #include "switch_sai_rpc.h"
 #include <thrift/protocol/TBinaryProtocol.h>
+#include <thrift/protocol/TCompactProtocol.h>
+#include <thrift/protocol/THeaderProtocol.h>
 #include <thrift/server/TSimpleServer.h>
+#include <thrift/server/TThreadedServer.h>
+#include <thrift/server/TThreadPoolServer.h>
+#include <thrift/server/TNonblockingServer.h>
+#include <thrift/concurrency/ThreadManager.h>
+#include <thrift/concurrency/ThreadFactory.h>
 #include <thrift/transport/TServerSocket.h>
+#include <thrift/transport/TNonblockingServerSocket.h>
 #include <thrift/transport/TBufferTransports.h>
 #include <arpa/inet.h>
+#include <sys/stat.h>
+#include <unistd.h>
 
 #include <inttypes.h>
 
@@ -58,6 +72,12 @@ extern "C" {
 #include <saisystemport.h>
 
 #include "arpa/inet.h"
+#include "switch_sai_rpc_server.h"
+#include "sai_api_table.h"
+#include "sai_stats.h"
+#include "sai_counter_poller.h"
+#include "sai_fdb_table.h"
+#include "sai_notification_queue.h"
 
 #define SAI_THRIFT_LOG_DBG(...) sai_thrift_timestamp_print(); \
   printf("SAI THRIFT DEBUG: %s(): ", __FUNCTION__); printf(__VA_ARGS__); printf("\n");
@@ -67,10 +87,16 @@ extern "C" {
 
 #define SAI_THRIFT_FUNC_LOG() SAI_THRIFT_LOG_DBG("Called.")
 
+// Page sizes of sai_thrift_query_fdb_entries and sai_thrift_get_fdb_changes
+// when none or a too large one is asked.
+#define SAI_THRIFT_FDB_PAGE_SIZE 1024
+#define SAI_THRIFT_FDB_MAX_PAGE_SIZE 16384
+
 using namespace ::apache::thrift;
 using namespace ::apache::thrift::protocol;
 using namespace ::apache::thrift::transport;
 using namespace ::apache::thrift::server;
+using namespace ::apache::thrift::concurrency;
 
 using std::shared_ptr;
 
@@ -80,8 +106,6 @@ extern sai_object_id_t gSwitchId;
 
 typedef std::vector<sai_thrift_attribute_t> std_sai_thrift_attr_vctr_t;
 
-std::vector<std::pair<sai_fdb_entry_t, sai_object_id_t>>gFdbMap;
-
 class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
   public:
     switch_sai_rpcHandler() noexcept {
@@ -224,7 +248,121 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       }
     }
 
+    // Attribute lists of a bulk create, in the layout the SAI bulk functions
+    // expect: one count and one list pointer per object. Nothing frees list
+    // buffers here, so only parsers that allocate none may be used, unlike
+    // the port, STP, ACL and debug counter ones.
+    struct sai_thrift_bulk_attrs_t {
+      std::vector<std::vector<sai_attribute_t>> lists;
+      std::vector<uint32_t> counts;
+      std::vector<const sai_attribute_t *> ptrs;
+    };
+
+    template<typename Parse>
+      void sai_thrift_parse_bulk_attributes(const std::vector<std_sai_thrift_attr_vctr_t> &thrift_attr_lists,
+                                            sai_thrift_bulk_attrs_t &attrs, Parse parse) {
+        attrs.lists.resize(thrift_attr_lists.size());
+        attrs.counts.resize(thrift_attr_lists.size());
+        attrs.ptrs.resize(thrift_attr_lists.size());
+        for (uint32_t i = 0; i < thrift_attr_lists.size(); i++) {
+          attrs.lists[i].resize(thrift_attr_lists[i].size());
+          parse(thrift_attr_lists[i], attrs.lists[i].data());
+          attrs.counts[i] = thrift_attr_lists[i].size();
+          attrs.ptrs[i] = attrs.lists[i].data();
+        }
+      }
+
+    /*
+     * Runs a bulk operation over object_count objects. bulk is the SAI bulk
+     * call and is skipped when the vendor library does not provide it
+     * (has_bulk is false) or reports it as not implemented. In that case
+     * single(i) is called for every object instead, following the semantics
+     * of mode: with SAI_BULK_OP_ERROR_MODE_STOP_ON_ERROR the objects after
+     * the first failure are reported as SAI_STATUS_NOT_EXECUTED.
+     */
+    template<typename Bulk, typename Single>
+      sai_status_t sai_thrift_bulk_execute(uint32_t object_count, sai_bulk_op_error_mode_t mode,
+                                           std::vector<sai_status_t> &statuses, bool has_bulk,
+                                           Bulk bulk, Single single) {
+        sai_status_t status = SAI_STATUS_NOT_IMPLEMENTED;
+        uint32_t i = 0;
+
+        statuses.assign(object_count, SAI_STATUS_NOT_EXECUTED);
+        if (object_count == 0) {
+          return SAI_STATUS_SUCCESS;
+        }
+
+        if (has_bulk) {
+          status = bulk(statuses.data());
+        }
+        if (status != SAI_STATUS_NOT_IMPLEMENTED && status != SAI_STATUS_NOT_SUPPORTED) {
+          return status;
+        }
+
+        status = SAI_STATUS_SUCCESS;
+        while (i < object_count) {
+          statuses[i] = single(i);
+          if (statuses[i] != SAI_STATUS_SUCCESS) {
+            status = SAI_STATUS_FAILURE;
+            if (mode == SAI_BULK_OP_ERROR_MODE_STOP_ON_ERROR) {
+              i++;
+              break;
+            }
+          }
+          i++;
+        }
+        for (; i < object_count; i++) {
+          statuses[i] = SAI_STATUS_NOT_EXECUTED;
+        }
+        return status;
+      }
+
+    void sai_thrift_bulk_result(sai_thrift_bulk_result_t &result, sai_status_t status, const std::vector<sai_status_t> &statuses) {
+      result.status = status;
+      result.statuses.assign(statuses.begin(), statuses.end());
+    }
+
+    // Bulk create of objects with an object ID, create is the single object
+    // create function of the same API used as fallback.
+    template<typename Create>
+      void sai_thrift_bulk_create_objects(sai_thrift_bulk_result_t &result, sai_bulk_object_create_fn bulk_create,
+                                          Create create, sai_thrift_bulk_attrs_t &attrs, sai_bulk_op_error_mode_t mode) {
+        uint32_t count = attrs.counts.size();
+        std::vector<sai_object_id_t> object_ids(count, SAI_NULL_OBJECT_ID);
+        std::vector<sai_status_t> statuses;
+
+        sai_status_t status = sai_thrift_bulk_execute(count, mode, statuses, bulk_create != NULL,
+            [&](sai_status_t *object_statuses) {
+              return bulk_create(gSwitchId, count, attrs.counts.data(), attrs.ptrs.data(), mode,
+                  object_ids.data(), object_statuses);
+            },
+            [&](uint32_t i) {
+              return create(&object_ids[i], gSwitchId, attrs.counts[i], attrs.ptrs[i]);
+            });
+        sai_thrift_bulk_result(result, status, statuses);
+        result.object_ids.assign(object_ids.begin(), object_ids.end());
+      }
+
+    template<typename Remove>
+      void sai_thrift_bulk_remove_objects(sai_thrift_bulk_result_t &result, sai_bulk_object_remove_fn bulk_remove,
+                                          Remove remove, const std::vector<sai_thrift_object_id_t> &thrift_object_ids,
+                                          sai_bulk_op_error_mode_t mode) {
+        uint32_t count = thrift_object_ids.size();
+        std::vector<sai_object_id_t> object_ids(thrift_object_ids.begin(), thrift_object_ids.end());
+        std::vector<sai_status_t> statuses;
+
+        sai_status_t status = sai_thrift_bulk_execute(count, mode, statuses, bulk_remove != NULL,
+            [&](sai_status_t *object_statuses) {
+              return bulk_remove(count, object_ids.data(), mode, object_statuses);
+            },
+            [&](uint32_t i) {
+              return remove(object_ids[i]);
+            });
+        sai_thrift_bulk_result(result, status, statuses);
+      }
+
     void sai_thrift_parse_fdb_entry(const sai_thrift_fdb_entry_t &thrift_fdb_entry, sai_fdb_entry_t *fdb_entry) {
+      fdb_entry->switch_id = gSwitchId;
       fdb_entry->bv_id = (sai_object_id_t) thrift_fdb_entry.bv_id;
       sai_thrift_string_to_mac(thrift_fdb_entry.mac_address, fdb_entry->mac_address);
     }
@@ -267,7 +405,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
             *buffer_profile_list = (sai_object_id_t *) malloc(sizeof(sai_object_id_t) * attribute.value.objlist.count);
             std::vector<sai_thrift_object_id_t>::const_iterator it2 = attribute.value.objlist.object_id_list.begin();
             for (uint32_t j = 0; j < attribute.value.objlist.object_id_list.size(); j++, *it2++) {
-              *buffer_profile_list[j] = (sai_object_id_t) *it2;
+              (*buffer_profile_list)[j] = (sai_object_id_t) *it2;
             }
             attr_list[i].value.objlist.count = attribute.value.objlist.count;
             attr_list[i].value.objlist.list = *buffer_profile_list;
@@ -279,7 +417,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
             *buffer_profile_list = (sai_object_id_t *) malloc(sizeof(sai_object_id_t) * attribute.value.objlist.count);
             std::vector<sai_thrift_object_id_t>::const_iterator it2 = attribute.value.objlist.object_id_list.begin();
             for (uint32_t j = 0; j < attribute.value.objlist.object_id_list.size(); j++, *it2++) {
-              *buffer_profile_list[j] = (sai_object_id_t) *it2;
+              (*buffer_profile_list)[j] = (sai_object_id_t) *it2;
             }
             attr_list[i].value.objlist.count = attribute.value.objlist.count;
             attr_list[i].value.objlist.list=*buffer_profile_list;
@@ -676,7 +814,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_set_port_attribute(const sai_thrift_object_id_t port_id, const sai_thrift_attribute_t &thrift_attr) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_port_api_t *port_api;
-      status = sai_api_query(SAI_API_PORT, (void **) &port_api);
+      status = sai_thrift_api_query(SAI_API_PORT, (void **) &port_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -693,10 +831,57 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return status;
     }
 
+    void sai_thrift_set_ports_attribute(sai_thrift_bulk_result_t &result,
+                                        const std::vector<sai_thrift_object_id_t> &port_ids,
+                                        const std::vector<sai_thrift_attribute_t> &thrift_attrs,
+                                        const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_port_api_t *port_api;
+      std::vector<sai_object_id_t> object_ids(port_ids.begin(), port_ids.end());
+      std::vector<sai_attribute_t> attr_list(port_ids.size());
+      std::vector<sai_object_id_t *> buffer_profile_lists(port_ids.size(), NULL);
+      std::vector<sai_status_t> statuses;
+      uint32_t count = port_ids.size();
+
+      result.status = sai_thrift_api_query(SAI_API_PORT, (void **) &port_api);
+      if (result.status != SAI_STATUS_SUCCESS || count == 0) {
+        return;
+      }
+      if (thrift_attrs.size() != 1 && thrift_attrs.size() != count) {
+        SAI_THRIFT_LOG_ERR("%u ports but %zu attributes", count, thrift_attrs.size());
+        result.status = SAI_STATUS_INVALID_PARAMETER;
+        return;
+      }
+
+      // A shared attribute is parsed again for every port, so each port owns
+      // its list buffers.
+      for (uint32_t i = 0; i < count; i++) {
+        std::vector<sai_thrift_attribute_t> thrift_attr_list(1, thrift_attrs[thrift_attrs.size() == 1 ? 0 : i]);
+        sai_thrift_parse_port_attributes(thrift_attr_list, &attr_list[i], &buffer_profile_lists[i]);
+      }
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          port_api->set_ports_attribute != NULL,
+          [&](sai_status_t *object_statuses) {
+            return port_api->set_ports_attribute(count, object_ids.data(), attr_list.data(),
+                (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return port_api->set_port_attribute(object_ids[i], &attr_list[i]);
+          });
+      if (status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to set port attributes.");
+      }
+      sai_thrift_bulk_result(result, status, statuses);
+
+      for (auto buffer_profile_list : buffer_profile_lists) {
+        if (buffer_profile_list) free(buffer_profile_list);
+      }
+    }
+
     sai_thrift_status_t sai_thrift_set_router_interface_attribute(const sai_thrift_object_id_t rif_id, const sai_thrift_attribute_t &thrift_attr) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_router_interface_api_t *rif_api;
-      status = sai_api_query(SAI_API_ROUTER_INTERFACE, (void **) &rif_api);
+      status = sai_thrift_api_query(SAI_API_ROUTER_INTERFACE, (void **) &rif_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -715,7 +900,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_fdb_api_t *fdb_api;
       sai_fdb_entry_t fdb_entry;
-      status = sai_api_query(SAI_API_FDB, (void **) &fdb_api);
+      status = sai_thrift_api_query(SAI_API_FDB, (void **) &fdb_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -732,7 +917,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_fdb_api_t *fdb_api;
       sai_fdb_entry_t fdb_entry;
-      status = sai_api_query(SAI_API_FDB, (void **) &fdb_api);
+      status = sai_thrift_api_query(SAI_API_FDB, (void **) &fdb_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -741,10 +926,79 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return status;
     }
 
+    void sai_thrift_create_fdb_entries(sai_thrift_bulk_result_t &result,
+                                       const std::vector<sai_thrift_fdb_entry_t> &thrift_fdb_entries,
+                                       const std::vector<std_sai_thrift_attr_vctr_t> &thrift_attr_lists,
+                                       const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_fdb_api_t *fdb_api;
+      std::vector<sai_fdb_entry_t> fdb_entries(thrift_fdb_entries.size());
+      sai_thrift_bulk_attrs_t attrs;
+      std::vector<sai_status_t> statuses;
+      uint32_t count = thrift_fdb_entries.size();
+
+      result.status = sai_thrift_api_query(SAI_API_FDB, (void **) &fdb_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+      if (thrift_attr_lists.size() != count) {
+        SAI_THRIFT_LOG_ERR("%u FDB entries but %zu attribute lists", count, thrift_attr_lists.size());
+        result.status = SAI_STATUS_INVALID_PARAMETER;
+        return;
+      }
+
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_parse_fdb_entry(thrift_fdb_entries[i], &fdb_entries[i]);
+      }
+      sai_thrift_parse_bulk_attributes(thrift_attr_lists, attrs,
+          [this](const std_sai_thrift_attr_vctr_t &thrift_attr_list, sai_attribute_t *attr_list) {
+            sai_thrift_parse_fdb_attributes(thrift_attr_list, attr_list);
+          });
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          fdb_api->create_fdb_entries != NULL,
+          [&](sai_status_t *object_statuses) {
+            return fdb_api->create_fdb_entries(count, fdb_entries.data(), attrs.counts.data(),
+                attrs.ptrs.data(), (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return fdb_api->create_fdb_entry(&fdb_entries[i], attrs.counts[i], attrs.ptrs[i]);
+          });
+      sai_thrift_bulk_result(result, status, statuses);
+    }
+
+    void sai_thrift_delete_fdb_entries(sai_thrift_bulk_result_t &result,
+                                       const std::vector<sai_thrift_fdb_entry_t> &thrift_fdb_entries,
+                                       const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_fdb_api_t *fdb_api;
+      std::vector<sai_fdb_entry_t> fdb_entries(thrift_fdb_entries.size());
+      std::vector<sai_status_t> statuses;
+      uint32_t count = thrift_fdb_entries.size();
+
+      result.status = sai_thrift_api_query(SAI_API_FDB, (void **) &fdb_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_parse_fdb_entry(thrift_fdb_entries[i], &fdb_entries[i]);
+      }
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          fdb_api->remove_fdb_entries != NULL,
+          [&](sai_status_t *object_statuses) {
+            return fdb_api->remove_fdb_entries(count, fdb_entries.data(),
+                (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return fdb_api->remove_fdb_entry(&fdb_entries[i]);
+          });
+      sai_thrift_bulk_result(result, status, statuses);
+    }
+
     sai_thrift_status_t sai_thrift_flush_fdb_entries(const std::vector<sai_thrift_attribute_t> & thrift_attr_list) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_fdb_api_t *fdb_api;
-      status = sai_api_query(SAI_API_FDB, (void **) &fdb_api);
+      status = sai_thrift_api_query(SAI_API_FDB, (void **) &fdb_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -757,14 +1011,16 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     }
     //listing all the fdb entries from map
     void sai_thrift_get_fdb_entries (sai_thrift_attribute_list_t& thrift_attr_list) {
-      thrift_attr_list.attr_count = gFdbMap.size();
+      auto snapshot = sai_thrift_fdb_table_snapshot();
+      thrift_attr_list.attr_count = snapshot->entries.size();
+      thrift_attr_list.attr_list.reserve(snapshot->entries.size());
 
       sai_fdb_entry_t fdb_m;
       sai_object_id_t b_id;
 
-      for (auto it = gFdbMap.begin(); it != gFdbMap.end(); it++) {
-        fdb_m = it->first;
-        b_id = it->second;
+      for (auto it = snapshot->entries.begin(); it != snapshot->entries.end(); it++) {
+        fdb_m = it->fdb_entry;
+        b_id = it->bport_id;
 
         sai_thrift_fdb_values_t fdb_value;
         fdb_value.bport_id=b_id;
@@ -780,6 +1036,86 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return;
     }
 
+    void sai_thrift_parse_fdb_shadow_entry(const sai_thrift_fdb_shadow_entry_t &entry,
+                                           sai_thrift_fdb_query_entry_t &thrift_entry) {
+      thrift_entry.mac = SaiThriftFdbTable::key(entry.fdb_entry).mac;
+      thrift_entry.bv_id = entry.fdb_entry.bv_id;
+      thrift_entry.bport_id = entry.bport_id;
+      thrift_entry.entry_type = entry.entry_type;
+    }
+
+    void sai_thrift_query_fdb_entries(sai_thrift_fdb_page_t &page, const sai_thrift_fdb_query_t &query) {
+      sai_thrift_fdb_filter_t filter;
+      sai_thrift_fdb_key_t after;
+      sai_mac_t mac;
+
+      if (query.mac_prefix_len < 0 || query.mac_prefix_len > 48 ||
+          (query.mac_prefix_len > 0 && !sai_thrift_string_to_mac(query.mac_address, mac)) ||
+          (!query.cursor.empty() && !sai_thrift_fdb_cursor_decode(query.cursor, after))) {
+        page.status = SAI_STATUS_INVALID_PARAMETER;
+        return;
+      }
+
+      filter.bv_id = query.bv_id;
+      filter.bport_id = query.bport_id;
+      filter.mac_prefix = 0;
+      if (query.mac_prefix_len > 0) {
+        for (int i = 0; i < 6; i++) {
+          filter.mac_prefix = (filter.mac_prefix << 8) | mac[i];
+        }
+      }
+      filter.mac_prefix_len = query.mac_prefix_len;
+      filter.entry_type = query.entry_type;
+
+      size_t page_size = SAI_THRIFT_FDB_PAGE_SIZE;
+      if (query.page_size > 0) {
+        page_size = std::min(query.page_size, SAI_THRIFT_FDB_MAX_PAGE_SIZE);
+      }
+
+      auto snapshot = sai_thrift_fdb_table_snapshot();
+      std::vector<const sai_thrift_fdb_shadow_entry_t *> matches;
+      bool more = sai_thrift_fdb_snapshot_query(*snapshot, filter, query.cursor.empty() ? nullptr : &after,
+                                                page_size, matches);
+
+      page.entries.resize(matches.size());
+      for (size_t i = 0; i < matches.size(); i++) {
+        sai_thrift_parse_fdb_shadow_entry(*matches[i], page.entries[i]);
+      }
+      if (more) {
+        page.next_cursor = sai_thrift_fdb_cursor_encode(SaiThriftFdbTable::key(matches.back()->fdb_entry));
+      }
+      page.version = snapshot->version;
+      page.status = SAI_STATUS_SUCCESS;
+    }
+
+    void sai_thrift_get_fdb_changes(sai_thrift_fdb_changes_t &thrift_changes, const int64_t since_seq,
+                                    const int32_t max_changes) {
+      std::vector<sai_thrift_fdb_change_record_t> changes;
+      uint64_t version;
+
+      size_t max = SAI_THRIFT_FDB_PAGE_SIZE;
+      if (max_changes > 0) {
+        max = std::min(max_changes, SAI_THRIFT_FDB_MAX_PAGE_SIZE);
+      }
+
+      // A negative since_seq is newer than the table as unsigned, so it asks for a resync too.
+      if (!sai_thrift_fdb_table_changes(since_seq, max, changes, version)) {
+        thrift_changes.resync = true;
+        thrift_changes.seq = version;
+        return;
+      }
+
+      thrift_changes.resync = false;
+      thrift_changes.changes.resize(changes.size());
+      for (size_t i = 0; i < changes.size(); i++) {
+        sai_thrift_fdb_change_t &change = thrift_changes.changes[i];
+        change.seq = changes[i].seq;
+        change.event_type = changes[i].event_type;
+        sai_thrift_parse_fdb_shadow_entry(changes[i].entry, change.entry);
+      }
+      thrift_changes.seq = changes.empty() ? version : changes.back().seq;
+    }
+
     void sai_thrift_parse_vlan_attributes(const std_sai_thrift_attr_vctr_t &thrift_attr_list, sai_attribute_t *attr_list) {
       SAI_THRIFT_LOG_DBG("Called.");
 
@@ -869,7 +1205,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_vlan_api_t *vlan_api = nullptr;
-      auto status = sai_api_query(SAI_API_VLAN, reinterpret_cast<void**>(&vlan_api));
+      auto status = sai_thrift_api_query(SAI_API_VLAN, reinterpret_cast<void**>(&vlan_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get VLAN API.");
@@ -895,7 +1231,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_vlan(const sai_thrift_object_id_t vlan_oid) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_vlan_api_t *vlan_api;
-      status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -909,7 +1245,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         const int32_t number_of_counters) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_vlan_api_t *vlan_api;
-      status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
 
       if (status != SAI_STATUS_SUCCESS) {
         return;
@@ -942,7 +1278,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_attribute_t vlan_member_list_object_attribute;
       sai_thrift_attribute_t thrift_vlan_member_list_attribute;
       sai_object_list_t *vlan_member_list_object;
-      status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
       if (status != SAI_STATUS_SUCCESS) {
         return;
       }
@@ -971,7 +1307,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_vlan_api_t *vlan_api;
       sai_attribute_t *attr_list = nullptr;
 
-      status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -993,7 +1329,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_vlan_api_t *vlan_api;
       sai_object_id_t vlan_member_id = 0;
-      status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1033,7 +1369,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       thrift_attr_list.attr_count = 0;
 
-      status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain vlan_api, status:%d", status);
         return;
@@ -1055,7 +1391,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_vlan_member(const sai_thrift_object_id_t vlan_member_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_vlan_api_t *vlan_api;
-      status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1063,13 +1399,47 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return status;
     }
 
+    void sai_thrift_create_vlan_members(sai_thrift_bulk_result_t &result,
+                                        const std::vector<std_sai_thrift_attr_vctr_t> &thrift_attr_lists,
+                                        const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_vlan_api_t *vlan_api;
+      sai_thrift_bulk_attrs_t attrs;
+
+      result.status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      sai_thrift_parse_bulk_attributes(thrift_attr_lists, attrs,
+          [this](const std_sai_thrift_attr_vctr_t &thrift_attr_list, sai_attribute_t *attr_list) {
+            sai_thrift_parse_vlan_member_attributes(thrift_attr_list, attr_list);
+          });
+
+      sai_thrift_bulk_create_objects(result, vlan_api->create_vlan_members, vlan_api->create_vlan_member,
+          attrs, (sai_bulk_op_error_mode_t) mode);
+    }
+
+    void sai_thrift_remove_vlan_members(sai_thrift_bulk_result_t &result,
+                                        const std::vector<sai_thrift_object_id_t> &vlan_member_ids,
+                                        const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_vlan_api_t *vlan_api;
+
+      result.status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      sai_thrift_bulk_remove_objects(result, vlan_api->remove_vlan_members, vlan_api->remove_vlan_member,
+          vlan_member_ids, (sai_bulk_op_error_mode_t) mode);
+    }
+
     void sai_thrift_get_vlan_id(sai_thrift_result_t &ret, sai_thrift_object_id_t vlan_id) {
       sai_attribute_t vlan_attr;
       sai_vlan_api_t *vlan_api;
 
       SAI_THRIFT_FUNC_LOG();
 
-      ret.status = sai_api_query(SAI_API_VLAN, (void **) &vlan_api);
+      ret.status = sai_thrift_api_query(SAI_API_VLAN, (void **) &vlan_api);
       if (ret.status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain vlan_api, status:%d", ret.status);
         return;
@@ -1089,7 +1459,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_virtual_router_api_t *vr_api;
       sai_object_id_t vr_id = 0;
-      status = sai_api_query(SAI_API_VIRTUAL_ROUTER, (void **) &vr_api);
+      status = sai_thrift_api_query(SAI_API_VIRTUAL_ROUTER, (void **) &vr_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1104,7 +1474,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_virtual_router(const sai_thrift_object_id_t vr_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_virtual_router_api_t *vr_api;
-      status = sai_api_query(SAI_API_VIRTUAL_ROUTER, (void **) &vr_api);
+      status = sai_thrift_api_query(SAI_API_VIRTUAL_ROUTER, (void **) &vr_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1116,7 +1486,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_route_api_t *route_api;
       sai_route_entry_t route_entry;
-      status = sai_api_query(SAI_API_ROUTE, (void **) &route_api);
+      status = sai_thrift_api_query(SAI_API_ROUTE, (void **) &route_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1134,7 +1504,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_route_api_t *route_api;
       sai_route_entry_t route_entry;
-      status = sai_api_query(SAI_API_ROUTE, (void **) &route_api);
+      status = sai_thrift_api_query(SAI_API_ROUTE, (void **) &route_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1143,11 +1513,118 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return status;
     }
 
+    void sai_thrift_create_routes(sai_thrift_bulk_result_t &result,
+                                  const std::vector<sai_thrift_route_entry_t> &thrift_route_entries,
+                                  const std::vector<std_sai_thrift_attr_vctr_t> &thrift_attr_lists,
+                                  const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_route_api_t *route_api;
+      std::vector<sai_route_entry_t> route_entries(thrift_route_entries.size());
+      sai_thrift_bulk_attrs_t attrs;
+      std::vector<sai_status_t> statuses;
+      uint32_t count = thrift_route_entries.size();
+
+      result.status = sai_thrift_api_query(SAI_API_ROUTE, (void **) &route_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+      if (thrift_attr_lists.size() != count) {
+        SAI_THRIFT_LOG_ERR("%u routes but %zu attribute lists", count, thrift_attr_lists.size());
+        result.status = SAI_STATUS_INVALID_PARAMETER;
+        return;
+      }
+
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_parse_route_entry(thrift_route_entries[i], &route_entries[i]);
+      }
+      sai_thrift_parse_bulk_attributes(thrift_attr_lists, attrs,
+          [this](const std_sai_thrift_attr_vctr_t &thrift_attr_list, sai_attribute_t *attr_list) {
+            sai_thrift_parse_route_attributes(thrift_attr_list, attr_list);
+          });
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          route_api->create_route_entries != NULL,
+          [&](sai_status_t *object_statuses) {
+            return route_api->create_route_entries(count, route_entries.data(), attrs.counts.data(),
+                attrs.ptrs.data(), (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return route_api->create_route_entry(&route_entries[i], attrs.counts[i], attrs.ptrs[i]);
+          });
+      sai_thrift_bulk_result(result, status, statuses);
+    }
+
+    void sai_thrift_remove_routes(sai_thrift_bulk_result_t &result,
+                                  const std::vector<sai_thrift_route_entry_t> &thrift_route_entries,
+                                  const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_route_api_t *route_api;
+      std::vector<sai_route_entry_t> route_entries(thrift_route_entries.size());
+      std::vector<sai_status_t> statuses;
+      uint32_t count = thrift_route_entries.size();
+
+      result.status = sai_thrift_api_query(SAI_API_ROUTE, (void **) &route_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_parse_route_entry(thrift_route_entries[i], &route_entries[i]);
+      }
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          route_api->remove_route_entries != NULL,
+          [&](sai_status_t *object_statuses) {
+            return route_api->remove_route_entries(count, route_entries.data(),
+                (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return route_api->remove_route_entry(&route_entries[i]);
+          });
+      sai_thrift_bulk_result(result, status, statuses);
+    }
+
+    // Sets one attribute per route, thrift_attrs[i] is applied to route i.
+    void sai_thrift_set_routes_attribute(sai_thrift_bulk_result_t &result,
+                                         const std::vector<sai_thrift_route_entry_t> &thrift_route_entries,
+                                         const std::vector<sai_thrift_attribute_t> &thrift_attrs,
+                                         const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_route_api_t *route_api;
+      std::vector<sai_route_entry_t> route_entries(thrift_route_entries.size());
+      std::vector<sai_attribute_t> attr_list(thrift_attrs.size());
+      std::vector<sai_status_t> statuses;
+      uint32_t count = thrift_route_entries.size();
+
+      result.status = sai_thrift_api_query(SAI_API_ROUTE, (void **) &route_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+      if (thrift_attrs.size() != count) {
+        SAI_THRIFT_LOG_ERR("%u routes but %zu attributes", count, thrift_attrs.size());
+        result.status = SAI_STATUS_INVALID_PARAMETER;
+        return;
+      }
+
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_parse_route_entry(thrift_route_entries[i], &route_entries[i]);
+      }
+      sai_thrift_parse_route_attributes(thrift_attrs, attr_list.data());
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          route_api->set_route_entries_attribute != NULL,
+          [&](sai_status_t *object_statuses) {
+            return route_api->set_route_entries_attribute(count, route_entries.data(), attr_list.data(),
+                (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return route_api->set_route_entry_attribute(&route_entries[i], &attr_list[i]);
+          });
+      sai_thrift_bulk_result(result, status, statuses);
+    }
+
     sai_thrift_object_id_t sai_thrift_create_router_interface(const std::vector<sai_thrift_attribute_t> & thrift_attr_list) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_router_interface_api_t *rif_api;
       sai_object_id_t rif_id = 0;
-      status = sai_api_query(SAI_API_ROUTER_INTERFACE, (void **) &rif_api);
+      status = sai_thrift_api_query(SAI_API_ROUTER_INTERFACE, (void **) &rif_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1162,7 +1639,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_router_interface(const sai_thrift_object_id_t rif_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_router_interface_api_t *rif_api;
-      status = sai_api_query(SAI_API_ROUTER_INTERFACE, (void **) &rif_api);
+      status = sai_thrift_api_query(SAI_API_ROUTER_INTERFACE, (void **) &rif_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1174,7 +1651,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_next_hop_api_t *nhop_api;
       sai_object_id_t nhop_id = 0;
-      status = sai_api_query(SAI_API_NEXT_HOP, (void **) &nhop_api);
+      status = sai_thrift_api_query(SAI_API_NEXT_HOP, (void **) &nhop_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1189,7 +1666,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_next_hop(const sai_thrift_object_id_t next_hop_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_next_hop_api_t *nhop_api;
-      status = sai_api_query(SAI_API_NEXT_HOP, (void **) &nhop_api);
+      status = sai_thrift_api_query(SAI_API_NEXT_HOP, (void **) &nhop_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1202,7 +1679,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_lag_api_t *lag_api;
       sai_object_id_t lag_id = 0;
 
-      status = sai_api_query(SAI_API_LAG, (void **) &lag_api);
+      status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1214,7 +1691,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_lag(const sai_thrift_object_id_t lag_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_lag_api_t *lag_api;
-      status = sai_api_query(SAI_API_LAG, (void **) &lag_api);
+      status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1228,7 +1705,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_lag_api_t *lag_api;
       sai_attribute_t *attr_list = nullptr;
 
-      status = sai_api_query(SAI_API_LAG, (void **) &lag_api);
+      status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1250,7 +1727,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_lag_api_t *lag_api;
       sai_object_id_t lag_member_id;
-      status = sai_api_query(SAI_API_LAG, (void **) &lag_api);
+      status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1264,7 +1741,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_lag_member(const sai_thrift_object_id_t lag_member_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_lag_api_t *lag_api;
-      status = sai_api_query(SAI_API_LAG, (void **) &lag_api);
+      status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1272,12 +1749,46 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return status;
     }
 
+    void sai_thrift_create_lag_members(sai_thrift_bulk_result_t &result,
+                                       const std::vector<std_sai_thrift_attr_vctr_t> &thrift_attr_lists,
+                                       const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_lag_api_t *lag_api;
+      sai_thrift_bulk_attrs_t attrs;
+
+      result.status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      sai_thrift_parse_bulk_attributes(thrift_attr_lists, attrs,
+          [this](const std_sai_thrift_attr_vctr_t &thrift_attr_list, sai_attribute_t *attr_list) {
+            sai_thrift_parse_lag_member_attributes(thrift_attr_list, attr_list);
+          });
+
+      sai_thrift_bulk_create_objects(result, lag_api->create_lag_members, lag_api->create_lag_member,
+          attrs, (sai_bulk_op_error_mode_t) mode);
+    }
+
+    void sai_thrift_remove_lag_members(sai_thrift_bulk_result_t &result,
+                                       const std::vector<sai_thrift_object_id_t> &lag_member_ids,
+                                       const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_lag_api_t *lag_api;
+
+      result.status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      sai_thrift_bulk_remove_objects(result, lag_api->remove_lag_members, lag_api->remove_lag_member,
+          lag_member_ids, (sai_bulk_op_error_mode_t) mode);
+    }
+
     void sai_thrift_get_lag_member_attribute(sai_thrift_attribute_list_t& thrift_attr_list, const sai_thrift_object_id_t lag_member_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_attribute_t sai_attrs[2];
       sai_lag_api_t *lag_api;
 
-      status = sai_api_query(SAI_API_LAG, (void **) &lag_api);
+      status = sai_thrift_api_query(SAI_API_LAG, (void **) &lag_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain lag_api, status:%d", status);
         return;
@@ -1302,7 +1813,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_stp_api_t *stp_api;
       sai_vlan_id_t *vlan_list;
       sai_object_id_t stp_id;
-      status = sai_api_query(SAI_API_STP, (void **) &stp_api);
+      status = sai_thrift_api_query(SAI_API_STP, (void **) &stp_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1318,7 +1829,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_stp_entry(const sai_thrift_object_id_t stp_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_stp_api_t *stp_api;
-      status = sai_api_query(SAI_API_STP, (void **) &stp_api);
+      status = sai_thrift_api_query(SAI_API_STP, (void **) &stp_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1329,7 +1840,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_set_stp_port_state(const sai_thrift_object_id_t stp_id, const sai_thrift_object_id_t port_id, const sai_thrift_port_stp_port_state_t stp_port_state) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_stp_api_t *stp_api;
-      status = sai_api_query(SAI_API_STP, (void **) &stp_api);
+      status = sai_thrift_api_query(SAI_API_STP, (void **) &stp_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1344,7 +1855,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_port_stp_port_state_t sai_thrift_get_stp_port_state(const sai_thrift_object_id_t stp_id, const sai_thrift_object_id_t port_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_stp_api_t *stp_api;
-      status = sai_api_query(SAI_API_STP, (void **) &stp_api);
+      status = sai_thrift_api_query(SAI_API_STP, (void **) &stp_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1358,7 +1869,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_create_neighbor_entry(const sai_thrift_neighbor_entry_t& thrift_neighbor_entry, const std::vector<sai_thrift_attribute_t> & thrift_attr_list) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_neighbor_api_t *neighbor_api;
-      status = sai_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
+      status = sai_thrift_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
       sai_neighbor_entry_t neighbor_entry;
       if (status != SAI_STATUS_SUCCESS) {
         return status;
@@ -1376,7 +1887,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_neighbor_api_t *neighbor_api;
       sai_neighbor_entry_t neighbor_entry;
-      status = sai_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
+      status = sai_thrift_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -1385,10 +1896,79 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return status;
     }
 
+    void sai_thrift_create_neighbor_entries(sai_thrift_bulk_result_t &result,
+                                            const std::vector<sai_thrift_neighbor_entry_t> &thrift_neighbor_entries,
+                                            const std::vector<std_sai_thrift_attr_vctr_t> &thrift_attr_lists,
+                                            const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_neighbor_api_t *neighbor_api;
+      std::vector<sai_neighbor_entry_t> neighbor_entries(thrift_neighbor_entries.size());
+      sai_thrift_bulk_attrs_t attrs;
+      std::vector<sai_status_t> statuses;
+      uint32_t count = thrift_neighbor_entries.size();
+
+      result.status = sai_thrift_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+      if (thrift_attr_lists.size() != count) {
+        SAI_THRIFT_LOG_ERR("%u neighbors but %zu attribute lists", count, thrift_attr_lists.size());
+        result.status = SAI_STATUS_INVALID_PARAMETER;
+        return;
+      }
+
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_parse_neighbor_entry(thrift_neighbor_entries[i], &neighbor_entries[i]);
+      }
+      sai_thrift_parse_bulk_attributes(thrift_attr_lists, attrs,
+          [this](const std_sai_thrift_attr_vctr_t &thrift_attr_list, sai_attribute_t *attr_list) {
+            sai_thrift_parse_neighbor_attributes(thrift_attr_list, attr_list);
+          });
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          neighbor_api->create_neighbor_entries != NULL,
+          [&](sai_status_t *object_statuses) {
+            return neighbor_api->create_neighbor_entries(count, neighbor_entries.data(), attrs.counts.data(),
+                attrs.ptrs.data(), (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return neighbor_api->create_neighbor_entry(&neighbor_entries[i], attrs.counts[i], attrs.ptrs[i]);
+          });
+      sai_thrift_bulk_result(result, status, statuses);
+    }
+
+    void sai_thrift_remove_neighbor_entries(sai_thrift_bulk_result_t &result,
+                                            const std::vector<sai_thrift_neighbor_entry_t> &thrift_neighbor_entries,
+                                            const sai_thrift_bulk_op_error_mode_t mode) {
+      sai_neighbor_api_t *neighbor_api;
+      std::vector<sai_neighbor_entry_t> neighbor_entries(thrift_neighbor_entries.size());
+      std::vector<sai_status_t> statuses;
+      uint32_t count = thrift_neighbor_entries.size();
+
+      result.status = sai_thrift_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      for (uint32_t i = 0; i < count; i++) {
+        sai_thrift_parse_neighbor_entry(thrift_neighbor_entries[i], &neighbor_entries[i]);
+      }
+
+      sai_status_t status = sai_thrift_bulk_execute(count, (sai_bulk_op_error_mode_t) mode, statuses,
+          neighbor_api->remove_neighbor_entries != NULL,
+          [&](sai_status_t *object_statuses) {
+            return neighbor_api->remove_neighbor_entries(count, neighbor_entries.data(),
+                (sai_bulk_op_error_mode_t) mode, object_statuses);
+          },
+          [&](uint32_t i) {
+            return neighbor_api->remove_neighbor_entry(&neighbor_entries[i]);
+          });
+      sai_thrift_bulk_result(result, status, statuses);
+    }
+
     sai_thrift_status_t sai_thrift_set_neighbor_entry_attribute(const sai_thrift_neighbor_entry_t& thrift_neighbor_entry, const std::vector<sai_thrift_attribute_t> & thrift_attr) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_neighbor_api_t *neighbor_api;
-      status = sai_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
+      status = sai_thrift_api_query(SAI_API_NEIGHBOR, (void **) &neighbor_api);
       sai_neighbor_entry_t neighbor_entry;
       if (status != SAI_STATUS_SUCCESS) {
         return status;
@@ -1406,7 +1986,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_attribute_t attr;
       sai_switch_api_t *switch_api;
       sai_thrift_object_id_t cpu_port_id;
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain switch_api, status:%d\n", status);
         return SAI_NULL_OBJECT_ID;
@@ -1426,7 +2006,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_attribute_t attr;
       sai_switch_api_t *switch_api;
       sai_thrift_object_id_t default_router_id;
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain switch_api, status:%d\n", status);
         return SAI_NULL_OBJECT_ID;
@@ -1448,7 +2028,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain switch_api, status:%d\n", status);
         return SAI_NULL_OBJECT_ID;
@@ -1470,7 +2050,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      ret.status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      ret.status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (ret.status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain switch_api, status:%d", ret.status);
         return;
@@ -1491,7 +2071,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_attribute_t attr;
       sai_switch_api_t *switch_api;
       sai_thrift_object_id_t default_trap_group;
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain switch_api, status:%d\n", status);
         return SAI_NULL_OBJECT_ID;
@@ -1514,7 +2094,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_thrift_attribute_t thrift_port_list_attribute;
       sai_object_list_t *port_list_object;
       int max_ports = 0;
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         printf("sai_api_query failed!!!\n");
         return;
@@ -1545,7 +2125,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_switch_api_t *switch_api;
       sai_attribute_t attr;
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         printf("sai_api_query failed!!!\n");
         return status;
@@ -1593,7 +2173,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      ret.status = sai_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
+      ret.status = sai_thrift_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
       if (ret.status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain bridge_api, status:%d", ret.status);
         return;
@@ -1619,7 +2199,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      status = sai_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
+      status = sai_thrift_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain bridge_api, status:%d", status);
         return status;
@@ -1636,7 +2216,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      ret.status = sai_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
+      ret.status = sai_thrift_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
       if (ret.status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain bridge_api, status:%d", ret.status);
         return;
@@ -1676,7 +2256,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      status = sai_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
+      status = sai_thrift_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain bridge_api, status:%d", status);
         return status;
@@ -1697,7 +2277,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       thrift_attr_list.attr_count = 0;
 
-      status = sai_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
+      status = sai_thrift_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain bridge_api, status:%d", status);
         return;
@@ -1745,7 +2325,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      ret.status = sai_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
+      ret.status = sai_thrift_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
       if (ret.status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain bridge_api, status:%d", ret.status);
         return;
@@ -1771,7 +2351,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
 
       SAI_THRIFT_FUNC_LOG();
 
-      status = sai_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
+      status = sai_thrift_api_query(SAI_API_BRIDGE, (void **) &bridge_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("failed to obtain bridge_api, status:%d", status);
         return status;
@@ -1784,7 +2364,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -1814,7 +2394,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -1836,7 +2416,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -1867,7 +2447,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -1897,7 +2477,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -1919,7 +2499,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -1949,7 +2529,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -1979,7 +2559,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2003,7 +2583,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2034,7 +2614,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2064,7 +2644,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2087,7 +2667,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_hostif_api_t *hostif_api = nullptr;
-      auto status = sai_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
+      auto status = sai_thrift_api_query(SAI_API_HOSTIF, reinterpret_cast<void**>(&hostif_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2437,7 +3017,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_object_id_t acl_table = 0ULL;
       sai_acl_api_t *acl_api;
       sai_status_t status = SAI_STATUS_SUCCESS;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2453,7 +3033,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_acl_table(const sai_thrift_object_id_t acl_table_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_acl_api_t *acl_api;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2465,7 +3045,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_object_id_t acl_entry = 0ULL;
       sai_acl_api_t *acl_api;
       sai_status_t status = SAI_STATUS_SUCCESS;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2491,7 +3071,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_acl_entry(const sai_thrift_object_id_t acl_entry) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_acl_api_t *acl_api;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2503,7 +3083,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_object_id_t acl_table_group_id = 0ULL;
       sai_acl_api_t *acl_api;
       sai_status_t status = SAI_STATUS_SUCCESS;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2519,7 +3099,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_acl_table_group(const sai_thrift_object_id_t acl_table_group_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_acl_api_t *acl_api;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2531,7 +3111,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_object_id_t acl_table_group_member_id = 0ULL;
       sai_acl_api_t *acl_api;
       sai_status_t status = SAI_STATUS_SUCCESS;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2547,7 +3127,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_acl_table_group_member(const sai_thrift_object_id_t acl_table_group_member_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_acl_api_t *acl_api;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2559,7 +3139,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_object_id_t acl_counter_id = 0ULL;
       sai_acl_api_t *acl_api;
       sai_status_t status = SAI_STATUS_SUCCESS;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2574,7 +3154,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_acl_counter(const sai_thrift_object_id_t acl_counter_id) {
       sai_acl_api_t *acl_api;
       sai_status_t status = SAI_STATUS_SUCCESS;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2588,7 +3168,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         const std::vector<int32_t> & thrift_attr_ids) {
       sai_acl_api_t *acl_api;
       sai_status_t status = SAI_STATUS_SUCCESS;
-      status = sai_api_query(SAI_API_ACL, (void **) &acl_api);
+      status = sai_thrift_api_query(SAI_API_ACL, (void **) &acl_api);
       if (status != SAI_STATUS_SUCCESS) {
         return;
       }
@@ -2674,7 +3254,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_mirror_api_t *mirror_api;
       sai_object_id_t session_id = 0;
-      status = sai_api_query(SAI_API_MIRROR, (void **) &mirror_api);
+      status = sai_thrift_api_query(SAI_API_MIRROR, (void **) &mirror_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2688,7 +3268,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_mirror_session(const sai_thrift_object_id_t session_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_mirror_api_t *mirror_api;
-      status = sai_api_query(SAI_API_MIRROR, (void **) &mirror_api);
+      status = sai_thrift_api_query(SAI_API_MIRROR, (void **) &mirror_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2699,7 +3279,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_set_mirror_session_attribute(const sai_thrift_object_id_t session_id, const sai_thrift_attribute_t &thrift_attr) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_mirror_api_t *mirror_api;
-      status = sai_api_query(SAI_API_MIRROR, (void **) &mirror_api);
+      status = sai_thrift_api_query(SAI_API_MIRROR, (void **) &mirror_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2774,7 +3354,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_policer_api_t *policer_api = nullptr;
-      auto status = sai_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
+      auto status = sai_thrift_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2805,7 +3385,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_policer_api_t *policer_api = nullptr;
-      auto status = sai_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
+      auto status = sai_thrift_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2828,7 +3408,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_policer_api_t *policer_api = nullptr;
-      auto status = sai_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
+      auto status = sai_thrift_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2861,7 +3441,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_policer_api_t *policer_api = nullptr;
-      auto status = sai_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
+      auto status = sai_thrift_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2892,7 +3472,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_policer_api_t *policer_api = nullptr;
-      auto status = sai_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
+      auto status = sai_thrift_api_query(SAI_API_POLICER, reinterpret_cast<void**>(&policer_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -2905,6 +3485,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       status = policer_api->clear_policer_stats(thrift_policer_id, number_of_counters, (const sai_stat_id_t *)counter_ids);
 
       if (status == SAI_STATUS_SUCCESS) {
+        sai_thrift_counter_poller_notify_clear(thrift_policer_id, number_of_counters, (const sai_stat_id_t *)counter_ids);
         SAI_THRIFT_LOG_DBG("Exited.");
         return status;
       }
@@ -2918,7 +3499,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_scheduler_api_t *scheduler_api;
       sai_object_id_t scheduler_id = 0;
-      status = sai_api_query(SAI_API_SCHEDULER, (void **) &scheduler_api);
+      status = sai_thrift_api_query(SAI_API_SCHEDULER, (void **) &scheduler_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2933,7 +3514,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_scheduler_profile(const sai_thrift_object_id_t scheduler_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_scheduler_api_t *scheduler_api;
-      status = sai_api_query(SAI_API_SCHEDULER, (void **) &scheduler_api);
+      status = sai_thrift_api_query(SAI_API_SCHEDULER, (void **) &scheduler_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -2976,7 +3557,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         const int32_t number_of_counters) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_port_api_t *port_api;
-      status = sai_api_query(SAI_API_PORT, (void **) &port_api);
+      status = sai_thrift_api_query(SAI_API_PORT, (void **) &port_api);
       if (status != SAI_STATUS_SUCCESS) {
         return;
       }
@@ -3000,14 +3581,24 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return;
     }
 
+    void sai_thrift_get_port_stats_ext(sai_thrift_stats_result_t &result,
+        const sai_thrift_object_id_t port_id,
+        const std::vector<sai_thrift_port_stat_counter_t> &thrift_counter_ids,
+        const sai_thrift_stats_mode_t mode) {
+      sai_thrift_get_object_stats_ext(result, SAI_OBJECT_TYPE_PORT, port_id, thrift_counter_ids, mode);
+    }
+
     sai_thrift_status_t sai_thrift_clear_port_all_stats(const sai_thrift_object_id_t port_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_port_api_t *port_api;
-      status = sai_api_query(SAI_API_PORT, (void **) &port_api);
+      status = sai_thrift_api_query(SAI_API_PORT, (void **) &port_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
       status = port_api->clear_port_all_stats( (sai_object_id_t) port_id);
+      if (status == SAI_STATUS_SUCCESS) {
+        sai_thrift_counter_poller_notify_clear(port_id, 0, nullptr);
+      }
       return status;
     }
 
@@ -3019,7 +3610,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_thrift_attribute_t thrift_queue_list_attribute;
       sai_object_list_t *queue_list_object;
       int max_queues = 0;
-      status = sai_api_query(SAI_API_PORT, (void **) &port_api);
+      status = sai_thrift_api_query(SAI_API_PORT, (void **) &port_api);
       if (status != SAI_STATUS_SUCCESS) {
         return;
       }
@@ -3111,7 +3702,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         const int32_t number_of_counters) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_queue_api_t *queue_api;
-      status = sai_api_query(SAI_API_QUEUE, (void **) &queue_api);
+      status = sai_thrift_api_query(SAI_API_QUEUE, (void **) &queue_api);
       if (status != SAI_STATUS_SUCCESS) {
         return;
       }
@@ -3136,11 +3727,18 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return;
     }
 
+    void sai_thrift_get_queue_stats_ext(sai_thrift_stats_result_t &result,
+        const sai_thrift_object_id_t queue_id,
+        const std::vector<sai_thrift_queue_stat_counter_t> &thrift_counter_ids,
+        const sai_thrift_stats_mode_t mode) {
+      sai_thrift_get_object_stats_ext(result, SAI_OBJECT_TYPE_QUEUE, queue_id, thrift_counter_ids, mode);
+    }
+
     sai_thrift_status_t sai_thrift_set_queue_attribute(const sai_thrift_object_id_t queue_id,
         const sai_thrift_attribute_t& thrift_attr) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_queue_api_t *queue_api;
-      status = sai_api_query(SAI_API_QUEUE, (void **) &queue_api);
+      status = sai_thrift_api_query(SAI_API_QUEUE, (void **) &queue_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3156,7 +3754,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         const int32_t number_of_counters) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_queue_api_t *queue_api;
-      status = sai_api_query(SAI_API_QUEUE, (void **) &queue_api);
+      status = sai_thrift_api_query(SAI_API_QUEUE, (void **) &queue_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3170,6 +3768,9 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
           (sai_object_id_t) queue_id,
           number_of_counters,
           (const sai_stat_id_t *)counter_ids);
+      if (status == SAI_STATUS_SUCCESS && number_of_counters > 0) {
+        sai_thrift_counter_poller_notify_clear(queue_id, number_of_counters, (const sai_stat_id_t *)counter_ids);
+      }
 
       free(counter_ids);
       return status;
@@ -3179,7 +3780,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_buffer_api_t *buffer_api;
       sai_object_id_t buffer_id = 0;
-      status = sai_api_query(SAI_API_BUFFER, (void **) &buffer_api);
+      status = sai_thrift_api_query(SAI_API_BUFFER, (void **) &buffer_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3227,7 +3828,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_buffer_api_t *buffer_api;
       sai_object_id_t pool_id = 0;
-      status = sai_api_query(SAI_API_BUFFER, (void **) &buffer_api);
+      status = sai_thrift_api_query(SAI_API_BUFFER, (void **) &buffer_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3263,7 +3864,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         const std::vector<sai_thrift_buffer_pool_stat_counter_t> &thrift_counter_ids) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_buffer_api_t *buffer_api;
-      status = sai_api_query(SAI_API_BUFFER, (void **) &buffer_api);
+      status = sai_thrift_api_query(SAI_API_BUFFER, (void **) &buffer_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to query buffer_api, status: %d", status);
         return;
@@ -3281,11 +3882,18 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       }
     }
 
+    void sai_thrift_get_buffer_pool_stats_ext(sai_thrift_stats_result_t &result,
+        const sai_thrift_object_id_t buffer_pool_id,
+        const std::vector<sai_thrift_buffer_pool_stat_counter_t> &thrift_counter_ids,
+        const sai_thrift_stats_mode_t mode) {
+      sai_thrift_get_object_stats_ext(result, SAI_OBJECT_TYPE_BUFFER_POOL, buffer_pool_id, thrift_counter_ids, mode);
+    }
+
     sai_thrift_status_t sai_thrift_clear_buffer_pool_stats(const sai_thrift_object_id_t buffer_pool_id,
         const std::vector<sai_thrift_buffer_pool_stat_counter_t> &thrift_counter_ids) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_buffer_api_t *buffer_api;
-      status = sai_api_query(SAI_API_BUFFER, (void **) &buffer_api);
+      status = sai_thrift_api_query(SAI_API_BUFFER, (void **) &buffer_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to query buffer_api, status: %d", status);
         return status;
@@ -3298,13 +3906,15 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         SAI_THRIFT_LOG_ERR("Failed to clear_buffer_pool_stats, status: %d", status);
         return status;
       }
+      sai_thrift_counter_poller_notify_clear(buffer_pool_id, (uint32_t)thrift_counter_ids.size(),
+                                             (const sai_stat_id_t *)thrift_counter_ids.data());
       return SAI_STATUS_SUCCESS;
     }
 
     sai_thrift_status_t sai_thrift_set_priority_group_attribute(const sai_thrift_object_id_t pg_id, const sai_thrift_attribute_t& thrift_attr) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_buffer_api_t *buffer_api;
-      status = sai_api_query(SAI_API_BUFFER, (void **) &buffer_api);
+      status = sai_thrift_api_query(SAI_API_BUFFER, (void **) &buffer_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3321,7 +3931,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         const int32_t number_of_counters) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_buffer_api_t *buffer_api;
-      status = sai_api_query(SAI_API_BUFFER, (void **) &buffer_api);
+      status = sai_thrift_api_query(SAI_API_BUFFER, (void **) &buffer_api);
       if (status != SAI_STATUS_SUCCESS) {
         return;
       }
@@ -3345,11 +3955,162 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return;
     }
 
+    void sai_thrift_get_pg_stats_ext(sai_thrift_stats_result_t &result,
+        const sai_thrift_object_id_t pg_id,
+        const std::vector<sai_thrift_pg_stat_counter_t> &thrift_counter_ids,
+        const sai_thrift_stats_mode_t mode) {
+      sai_thrift_get_object_stats_ext(result, SAI_OBJECT_TYPE_INGRESS_PRIORITY_GROUP, pg_id, thrift_counter_ids, mode);
+    }
+
+    void sai_thrift_get_object_stats_ext(sai_thrift_stats_result_t &result,
+        const sai_object_type_t object_type,
+        const sai_thrift_object_id_t object_id,
+        const std::vector<sai_thrift_stat_id_t> &thrift_counter_ids,
+        const sai_thrift_stats_mode_t mode) {
+      uint32_t number_of_counters = thrift_counter_ids.size();
+      std::vector<sai_stat_id_t> counter_ids(thrift_counter_ids.begin(), thrift_counter_ids.end());
+      std::vector<uint64_t> counters(number_of_counters, 0);
+
+      result.status = sai_thrift_get_object_stats(object_type, object_id, number_of_counters, counter_ids.data(),
+          (sai_stats_mode_t) mode, counters.data());
+      if (result.status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to get stats of object 0x%lx, status: %d", object_id, result.status);
+        return;
+      }
+
+      if (mode == SAI_STATS_MODE_READ_AND_CLEAR) {
+        sai_thrift_counter_poller_notify_clear(object_id, number_of_counters, counter_ids.data());
+      }
+      result.counters.assign(counters.begin(), counters.end());
+    }
+
+    void sai_thrift_get_objects_stats(sai_thrift_stats_matrix_t &result,
+        const int32_t object_type,
+        const std::vector<sai_thrift_object_id_t> &object_ids,
+        const std::vector<sai_thrift_stat_id_t> &thrift_counter_ids,
+        const sai_thrift_stats_mode_t mode) {
+      uint32_t object_count = object_ids.size();
+      uint32_t number_of_counters = thrift_counter_ids.size();
+      std::vector<sai_object_id_t> sai_object_ids(object_ids.begin(), object_ids.end());
+      std::vector<sai_stat_id_t> counter_ids(thrift_counter_ids.begin(), thrift_counter_ids.end());
+      std::vector<sai_status_t> statuses(object_count, SAI_STATUS_NOT_EXECUTED);
+      std::vector<uint64_t> counters((size_t) object_count * number_of_counters, 0);
+
+      result.status = ::sai_thrift_get_objects_stats((sai_object_type_t) object_type, object_count,
+          sai_object_ids.data(), number_of_counters, counter_ids.data(), (sai_stats_mode_t) mode,
+          statuses.data(), counters.data());
+      if (result.status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to get stats of some of %u objects, status: %d", object_count, result.status);
+      }
+
+      if (mode == SAI_STATS_MODE_READ_AND_CLEAR) {
+        for (uint32_t i = 0; i < object_count; i++) {
+          if (statuses[i] == SAI_STATUS_SUCCESS) {
+            sai_thrift_counter_poller_notify_clear(sai_object_ids[i], number_of_counters, counter_ids.data());
+          }
+        }
+      }
+
+      result.statuses.assign(statuses.begin(), statuses.end());
+      result.counters.assign(counters.begin(), counters.end());
+    }
+
+    //
+    // SAI Counter Poller API ******************************************************************************************
+    //
+
+    sai_thrift_status_t sai_thrift_set_counter_group(const sai_thrift_counter_group_t &thrift_group) {
+      sai_thrift_poller_group_t group;
+
+      SAI_THRIFT_FUNC_LOG();
+
+      if (thrift_group.interval_ms <= 0) {
+        return SAI_STATUS_INVALID_PARAMETER;
+      }
+
+      group.name = thrift_group.name;
+      group.object_type = (sai_object_type_t) thrift_group.object_type;
+      group.object_ids.assign(thrift_group.object_ids.begin(), thrift_group.object_ids.end());
+      group.counter_ids.assign(thrift_group.counter_ids.begin(), thrift_group.counter_ids.end());
+      group.interval_ms = thrift_group.interval_ms;
+
+      sai_status_t status = sai_thrift_counter_poller_set_group(group);
+      if (status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to set counter group %s, status: %d", thrift_group.name.c_str(), status);
+      }
+      return status;
+    }
+
+    sai_thrift_status_t sai_thrift_remove_counter_group(const std::string &name) {
+      SAI_THRIFT_FUNC_LOG();
+      return sai_thrift_counter_poller_remove_group(name);
+    }
+
+    void sai_thrift_parse_counter_group(const sai_thrift_poller_group_t &group, sai_thrift_counter_group_t &thrift_group) {
+      thrift_group.name = group.name;
+      thrift_group.object_type = group.object_type;
+      thrift_group.object_ids.assign(group.object_ids.begin(), group.object_ids.end());
+      thrift_group.counter_ids.assign(group.counter_ids.begin(), group.counter_ids.end());
+      thrift_group.interval_ms = group.interval_ms;
+    }
+
+    void sai_thrift_parse_counter_snapshot(const sai_thrift_poller_snapshot_t &snapshot, sai_thrift_counter_snapshot_t &thrift_snapshot) {
+      thrift_snapshot.status = snapshot.status;
+      sai_thrift_parse_counter_group(snapshot.group, thrift_snapshot.group);
+      thrift_snapshot.statuses.assign(snapshot.statuses.begin(), snapshot.statuses.end());
+      thrift_snapshot.counters.assign(snapshot.counters.begin(), snapshot.counters.end());
+      thrift_snapshot.timestamp_us = snapshot.timestamp_us;
+      thrift_snapshot.seq = snapshot.seq;
+    }
+
+    void sai_thrift_get_counter_snapshot(sai_thrift_counter_snapshot_t &thrift_snapshot, const std::string &name) {
+      auto snapshot = sai_thrift_counter_poller_get_snapshot(name);
+
+      if (!snapshot) {
+        thrift_snapshot.status = sai_thrift_counter_poller_has_group(name) ? SAI_STATUS_NOT_EXECUTED : SAI_STATUS_ITEM_NOT_FOUND;
+        return;
+      }
+      sai_thrift_parse_counter_snapshot(*snapshot, thrift_snapshot);
+    }
+
+    void sai_thrift_wait_counter_update(sai_thrift_counter_snapshot_t &thrift_snapshot, const std::string &name,
+                                        const int64_t after_seq, const int32_t timeout_ms) {
+      std::shared_ptr<const sai_thrift_poller_snapshot_t> snapshot;
+
+      if (after_seq < 0 || timeout_ms < 0) {
+        thrift_snapshot.status = SAI_STATUS_INVALID_PARAMETER;
+        return;
+      }
+
+      thrift_snapshot.status = sai_thrift_counter_poller_wait_snapshot(name, after_seq, timeout_ms, snapshot);
+      if (thrift_snapshot.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+      sai_thrift_parse_counter_snapshot(*snapshot, thrift_snapshot);
+    }
+
+    void sai_thrift_get_counter_rates(sai_thrift_counter_rates_t &thrift_rates, const std::string &name) {
+      sai_thrift_poller_rates_t rates;
+
+      thrift_rates.status = sai_thrift_counter_poller_get_rates(name, rates);
+      if (thrift_rates.status != SAI_STATUS_SUCCESS) {
+        return;
+      }
+
+      sai_thrift_parse_counter_group(rates.group, thrift_rates.group);
+      thrift_rates.statuses.assign(rates.statuses.begin(), rates.statuses.end());
+      thrift_rates.deltas.assign(rates.deltas.begin(), rates.deltas.end());
+      thrift_rates.rates.assign(rates.rates.begin(), rates.rates.end());
+      thrift_rates.interval_us = rates.interval_us;
+      thrift_rates.timestamp_us = rates.timestamp_us;
+      thrift_rates.seq = rates.seq;
+    }
+
     sai_thrift_object_id_t sai_thrift_create_wred_profile(const std::vector<sai_thrift_attribute_t> & thrift_attr_list) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_wred_api_t *wred_api;
       sai_object_id_t wred_id = 0;
-      status = sai_api_query(SAI_API_WRED, (void **) &wred_api);
+      status = sai_thrift_api_query(SAI_API_WRED, (void **) &wred_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3417,7 +4178,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_wred_profile(const sai_thrift_object_id_t wred_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_wred_api_t *wred_api;
-      status = sai_api_query(SAI_API_WRED, (void **) &wred_api);
+      status = sai_thrift_api_query(SAI_API_WRED, (void **) &wred_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3502,7 +4263,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_tunnel_api_t *tunnel_api;
 
       sai_object_id_t tunnel_id = 0;
-      status = sai_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
+      status = sai_thrift_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3517,7 +4278,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_tunnel(const sai_thrift_object_id_t thrift_tunnel_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_tunnel_api_t *tunnel_api;
-      status = sai_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
+      status = sai_thrift_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3529,7 +4290,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_object_id_t sai_thrift_create_tunnel_term_table_entry(const std::vector<sai_thrift_attribute_t> & thrift_attr_list) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_tunnel_api_t *tunnel_api;
-      status = sai_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
+      status = sai_thrift_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3545,7 +4306,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     sai_thrift_status_t sai_thrift_remove_tunnel_term_table_entry(const sai_thrift_object_id_t thrift_tunnel_entry_id) {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_tunnel_api_t *tunnel_api;
-      status = sai_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
+      status = sai_thrift_api_query(SAI_API_TUNNEL, (void **) &tunnel_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3563,7 +4324,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_object_id_t qos_map_id = 0;
       sai_qos_map_t *qos_map_list = NULL;
 
-      status = sai_api_query(SAI_API_QOS_MAP, (void **) &qos_map_api);
+      status = sai_thrift_api_query(SAI_API_QOS_MAP, (void **) &qos_map_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3616,7 +4377,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_status_t status = SAI_STATUS_SUCCESS;
       sai_qos_map_api_t *qos_map_api;
 
-      status = sai_api_query(SAI_API_QOS_MAP, (void **) &qos_map_api);
+      status = sai_thrift_api_query(SAI_API_QOS_MAP, (void **) &qos_map_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3678,7 +4439,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       int32_t                    *in_debug_counter_ids_list  = NULL;
       int32_t                    *out_debug_counter_ids_list = NULL;
 
-      status = sai_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
+      status = sai_thrift_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
       if (status != SAI_STATUS_SUCCESS) {
         return debug_counter_id;
       }
@@ -3694,6 +4455,11 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
           gSwitchId,
           list_count,
           attr_list);
+      if (status == SAI_STATUS_SUCCESS) {
+        sai_stat_id_t stat_id;
+        // Resolve the stat ID now so reads never have to.
+        sai_thrift_get_debug_counter_stat_id(debug_counter_id, &stat_id);
+      }
 
       free(attr_list);
       free(in_debug_counter_ids_list);
@@ -3706,12 +4472,15 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_debug_counter_api_t *debug_counter_api;
       sai_status_t             status = SAI_STATUS_SUCCESS;
 
-      status = sai_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
+      status = sai_thrift_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
 
       status = debug_counter_api->remove_debug_counter((sai_object_id_t) thrift_debug_counter_id);
+      if (status == SAI_STATUS_SUCCESS) {
+        sai_thrift_debug_counter_removed(thrift_debug_counter_id);
+      }
 
       return status;
     }
@@ -3722,7 +4491,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       int32_t                 *in_debug_counter_ids_list  = NULL;
       int32_t                 *out_debug_counter_ids_list = NULL;
 
-      status = sai_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
+      status = sai_thrift_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3749,7 +4518,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       sai_switch_api_t *switch_api;
       sai_status_t      status = SAI_STATUS_SUCCESS;
 
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         return status;
       }
@@ -3783,50 +4552,45 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
     }
 
     int64_t sai_thrift_get_switch_stats_by_oid(const sai_thrift_object_id_t thrift_counter_id) {
-      sai_debug_counter_api_t           *debug_counter_api;
-      std::vector<sai_thrift_stat_id_t>  thrift_counter_ids;
-      std::vector<int64_t>               thrift_counters;
-      sai_status_t                       status     = SAI_STATUS_SUCCESS;
-      sai_attribute_t                    attr       = {};
-      int32_t                            index_base = 0;
-
-      status = sai_api_query(SAI_API_DEBUG_COUNTER, (void **) &debug_counter_api);
-      if (SAI_STATUS_SUCCESS != status) {
-        return 0;
-      }
+      sai_object_id_t debug_counter_id = thrift_counter_id;
+      sai_status_t    status           = SAI_STATUS_SUCCESS;
+      uint64_t        counter          = 0;
 
-      attr.id = SAI_DEBUG_COUNTER_ATTR_TYPE;
-      status = debug_counter_api->get_debug_counter_attribute((sai_object_id_t) thrift_counter_id, 1, &attr);
+      ::sai_thrift_get_debug_counters_stats(1, &debug_counter_id, &status, &counter);
       if (SAI_STATUS_SUCCESS != status) {
         return 0;
       }
 
-      switch (attr.value.s32) {
-      case SAI_DEBUG_COUNTER_TYPE_SWITCH_IN_DROP_REASONS:
-        index_base = SAI_SWITCH_STAT_IN_DROP_REASON_RANGE_BASE;
-        break;
-      case SAI_DEBUG_COUNTER_TYPE_SWITCH_OUT_DROP_REASONS:
-        index_base = SAI_SWITCH_STAT_OUT_DROP_REASON_RANGE_BASE;
-        break;
-      default:
-        printf("Unsupported debug counter type '%d'\n", attr.value.s32);
-        return 0;
-      }
+      return counter;
+    }
 
-      attr.id = SAI_DEBUG_COUNTER_ATTR_INDEX;
-      status = debug_counter_api->get_debug_counter_attribute((sai_object_id_t) thrift_counter_id, 1, &attr);
-      if (SAI_STATUS_SUCCESS != status) {
-        return 0;
-      }
+    void sai_thrift_get_notification_stats(sai_thrift_notification_stats_t &thrift_stats) {
+      sai_thrift_notification_queue_stats_t stats;
 
-      thrift_counter_ids.push_back((sai_thrift_stat_id_t)(index_base + attr.value.s32));
+      sai_thrift_notification_queue_get_stats(stats);
+      thrift_stats.capacity = stats.capacity;
+      thrift_stats.depth = stats.depth;
+      thrift_stats.max_depth = stats.max_depth;
+      thrift_stats.enqueued = stats.enqueued;
+      thrift_stats.processed = stats.processed;
+      thrift_stats.overflows = stats.overflows;
+      thrift_stats.fdb_resyncs = stats.fdb_resyncs;
+    }
 
-      status = sai_thrift_get_switch_stats(thrift_counters, gSwitchId, thrift_counter_ids);
-      if (SAI_STATUS_SUCCESS != status) {
-        return 0;
+    void sai_thrift_get_debug_counters_stats(sai_thrift_stats_matrix_t &result,
+        const std::vector<sai_thrift_object_id_t> &debug_counter_ids) {
+      uint32_t object_count = debug_counter_ids.size();
+      std::vector<sai_object_id_t> object_ids(debug_counter_ids.begin(), debug_counter_ids.end());
+      std::vector<sai_status_t> statuses(object_count, SAI_STATUS_NOT_EXECUTED);
+      std::vector<uint64_t> counters(object_count, 0);
+
+      result.status = ::sai_thrift_get_debug_counters_stats(object_count, object_ids.data(), statuses.data(), counters.data());
+      if (result.status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to get some of %u debug counters, status: %d", object_count, result.status);
       }
 
-      return thrift_counters[0];
+      result.statuses.assign(statuses.begin(), statuses.end());
+      result.counters.assign(counters.begin(), counters.end());
     }
 
     //
@@ -3859,7 +4623,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_next_hop_group_api_t *nhop_group_api = nullptr;
-      auto status = sai_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
+      auto status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -3889,7 +4653,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_next_hop_group_api_t *nhop_group_api = nullptr;
-      auto status = sai_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
+      auto status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -3933,7 +4697,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_next_hop_group_api_t *nhop_group_api = nullptr;
-      auto status = sai_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
+      auto status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -3963,7 +4727,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       SAI_THRIFT_LOG_DBG("Called.");
 
       sai_next_hop_group_api_t *nhop_group_api = nullptr;
-      auto status = sai_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
+      auto status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
 
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("Failed to get API.");
@@ -3977,6 +4741,48 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       return status;
     }
 
+    void sai_thrift_create_next_hop_group_members(sai_thrift_bulk_result_t &result,
+                                                  const std::vector<std_sai_thrift_attr_vctr_t> &thrift_attr_lists,
+                                                  const sai_thrift_bulk_op_error_mode_t mode) noexcept {
+      sai_next_hop_group_api_t *nhop_group_api = nullptr;
+      sai_thrift_bulk_attrs_t attrs;
+
+      result.status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
+      if (result.status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to get API.");
+        return;
+      }
+
+      sai_thrift_parse_bulk_attributes(thrift_attr_lists, attrs,
+          [this](const std_sai_thrift_attr_vctr_t &thrift_attr_list, sai_attribute_t *attr_list) {
+            sai_thrift_parse_next_hop_group_member_attributes(attr_list, thrift_attr_list);
+          });
+
+      sai_thrift_bulk_create_objects(result, nhop_group_api->create_next_hop_group_members,
+          nhop_group_api->create_next_hop_group_member, attrs, (sai_bulk_op_error_mode_t) mode);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to create some of %zu group members.", thrift_attr_lists.size());
+      }
+    }
+
+    void sai_thrift_remove_next_hop_group_members(sai_thrift_bulk_result_t &result,
+                                                  const std::vector<sai_thrift_object_id_t> &nhop_group_member_oids,
+                                                  const sai_thrift_bulk_op_error_mode_t mode) noexcept {
+      sai_next_hop_group_api_t *nhop_group_api = nullptr;
+
+      result.status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, reinterpret_cast<void**>(&nhop_group_api));
+      if (result.status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to get API.");
+        return;
+      }
+
+      sai_thrift_bulk_remove_objects(result, nhop_group_api->remove_next_hop_group_members,
+          nhop_group_api->remove_next_hop_group_member, nhop_group_member_oids, (sai_bulk_op_error_mode_t) mode);
+      if (result.status != SAI_STATUS_SUCCESS) {
+        SAI_THRIFT_LOG_ERR("Failed to remove some of %zu group members.", nhop_group_member_oids.size());
+      }
+    }
+
     // Returns sai_object_id for a system_port_id
     sai_thrift_object_id_t sai_thrift_get_sys_port_obj_id_by_port_id(const int32_t sys_port_id) {
       SAI_THRIFT_LOG_DBG("Called.");
@@ -3993,7 +4799,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         return SAI_NULL_OBJECT_ID;
       }
 
-      status = sai_api_query(SAI_API_SWITCH, (void **) &switch_api);
+      status = sai_thrift_api_query(SAI_API_SWITCH, (void **) &switch_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("sai_api_query failed!!!");
         return SAI_NULL_OBJECT_ID;
@@ -4008,7 +4814,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         SAI_THRIFT_LOG_ERR("Switch is not VOQ switch!!!");
         return SAI_NULL_OBJECT_ID;
       }
-      status = sai_api_query(SAI_API_SYSTEM_PORT, (void **) &sys_port_api);
+      status = sai_thrift_api_query(SAI_API_SYSTEM_PORT, (void **) &sys_port_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("sai_api_query failed!!!");
         return SAI_NULL_OBJECT_ID;
@@ -4061,7 +4867,7 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
         SAI_THRIFT_LOG_ERR("Invalid system port!!!");
         return;
       }
-      status = sai_api_query(SAI_API_SYSTEM_PORT, (void **) &sys_port_api);
+      status = sai_thrift_api_query(SAI_API_SYSTEM_PORT, (void **) &sys_port_api);
       if (status != SAI_STATUS_SUCCESS) {
         SAI_THRIFT_LOG_ERR("sai_api_query failed!!!");
         return;
@@ -4096,36 +4902,482 @@ class switch_sai_rpcHandler : virtual public switch_sai_rpcIf {
       free(voq_list_object_attribute.value.objlist.list);
       SAI_THRIFT_LOG_DBG("Exited.");
     }
+
+    //
+    // SAI Batch API **************************************************************************************************
+    //
+
+    template<typename Create, typename Remove, typename Set>
+      sai_status_t sai_thrift_batch_apply(sai_thrift_batch_op_type_t::type op, sai_object_id_t *oid,
+                                          std::vector<sai_attribute_t> &attr_list,
+                                          Create create, Remove remove, Set set) {
+        sai_status_t status = SAI_STATUS_SUCCESS;
+
+        switch (op) {
+        case sai_thrift_batch_op_type_t::SAI_THRIFT_BATCH_OP_CREATE:
+          return create(oid, gSwitchId, attr_list.size(), attr_list.data());
+        case sai_thrift_batch_op_type_t::SAI_THRIFT_BATCH_OP_REMOVE:
+          return remove(*oid);
+        case sai_thrift_batch_op_type_t::SAI_THRIFT_BATCH_OP_SET:
+          for (uint32_t i = 0; i < attr_list.size() && status == SAI_STATUS_SUCCESS; i++) {
+            status = set(*oid, &attr_list[i]);
+          }
+          return status;
+        default:
+          return SAI_STATUS_INVALID_PARAMETER;
+        }
+      }
+
+    // Same as sai_thrift_batch_apply() for entries, whose create takes no
+    // switch ID and returns no OID.
+    template<typename Entry, typename Create, typename Remove, typename Set>
+      sai_status_t sai_thrift_batch_apply_entry(sai_thrift_batch_op_type_t::type op, const Entry *entry,
+                                                std::vector<sai_attribute_t> &attr_list,
+                                                Create create, Remove remove, Set set) {
+        sai_status_t status = SAI_STATUS_SUCCESS;
+
+        switch (op) {
+        case sai_thrift_batch_op_type_t::SAI_THRIFT_BATCH_OP_CREATE:
+          return create(entry, attr_list.size(), attr_list.data());
+        case sai_thrift_batch_op_type_t::SAI_THRIFT_BATCH_OP_REMOVE:
+          return remove(entry);
+        case sai_thrift_batch_op_type_t::SAI_THRIFT_BATCH_OP_SET:
+          for (uint32_t i = 0; i < attr_list.size() && status == SAI_STATUS_SUCCESS; i++) {
+            status = set(entry, &attr_list[i]);
+          }
+          return status;
+        default:
+          return SAI_STATUS_INVALID_PARAMETER;
+        }
+      }
+
+    sai_status_t sai_thrift_batch_execute_op(const sai_thrift_batch_op_t &op, const std_sai_thrift_attr_vctr_t &thrift_attr_list,
+                                             sai_object_id_t ref_oid, sai_object_id_t *oid) {
+      std::vector<sai_attribute_t> attr_list(thrift_attr_list.size());
+      bool has_ref = op.oid_ref >= 0;
+      void *api = nullptr;
+      sai_status_t status;
+
+      // The attribute parsers of the object types below only set scalar
+      // values, none allocates a list buffer that would need freeing.
+
+      switch (op.object_type) {
+      case SAI_OBJECT_TYPE_VIRTUAL_ROUTER: {
+        status = sai_thrift_api_query(SAI_API_VIRTUAL_ROUTER, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_virtual_router_api_t *vr_api = (sai_virtual_router_api_t *) api;
+        sai_thrift_parse_vr_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, vr_api->create_virtual_router,
+            vr_api->remove_virtual_router, vr_api->set_virtual_router_attribute);
+      }
+      case SAI_OBJECT_TYPE_ROUTER_INTERFACE: {
+        status = sai_thrift_api_query(SAI_API_ROUTER_INTERFACE, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_router_interface_api_t *rif_api = (sai_router_interface_api_t *) api;
+        sai_thrift_parse_router_interface_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, rif_api->create_router_interface,
+            rif_api->remove_router_interface, rif_api->set_router_interface_attribute);
+      }
+      case SAI_OBJECT_TYPE_NEXT_HOP: {
+        status = sai_thrift_api_query(SAI_API_NEXT_HOP, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_next_hop_api_t *nhop_api = (sai_next_hop_api_t *) api;
+        sai_thrift_parse_next_hop_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, nhop_api->create_next_hop,
+            nhop_api->remove_next_hop, nhop_api->set_next_hop_attribute);
+      }
+      case SAI_OBJECT_TYPE_NEXT_HOP_GROUP: {
+        status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_next_hop_group_api_t *nhop_group_api = (sai_next_hop_group_api_t *) api;
+        sai_thrift_parse_next_hop_group_attributes(attr_list.data(), thrift_attr_list);
+        return sai_thrift_batch_apply(op.op, oid, attr_list, nhop_group_api->create_next_hop_group,
+            nhop_group_api->remove_next_hop_group, nhop_group_api->set_next_hop_group_attribute);
+      }
+      case SAI_OBJECT_TYPE_NEXT_HOP_GROUP_MEMBER: {
+        status = sai_thrift_api_query(SAI_API_NEXT_HOP_GROUP, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_next_hop_group_api_t *nhop_group_api = (sai_next_hop_group_api_t *) api;
+        sai_thrift_parse_next_hop_group_member_attributes(attr_list.data(), thrift_attr_list);
+        return sai_thrift_batch_apply(op.op, oid, attr_list, nhop_group_api->create_next_hop_group_member,
+            nhop_group_api->remove_next_hop_group_member, nhop_group_api->set_next_hop_group_member_attribute);
+      }
+      case SAI_OBJECT_TYPE_VLAN: {
+        status = sai_thrift_api_query(SAI_API_VLAN, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_vlan_api_t *vlan_api = (sai_vlan_api_t *) api;
+        sai_thrift_parse_vlan_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, vlan_api->create_vlan,
+            vlan_api->remove_vlan, vlan_api->set_vlan_attribute);
+      }
+      case SAI_OBJECT_TYPE_VLAN_MEMBER: {
+        status = sai_thrift_api_query(SAI_API_VLAN, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_vlan_api_t *vlan_api = (sai_vlan_api_t *) api;
+        sai_thrift_parse_vlan_member_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, vlan_api->create_vlan_member,
+            vlan_api->remove_vlan_member, vlan_api->set_vlan_member_attribute);
+      }
+      case SAI_OBJECT_TYPE_LAG: {
+        status = sai_thrift_api_query(SAI_API_LAG, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_lag_api_t *lag_api = (sai_lag_api_t *) api;
+        sai_thrift_parse_lag_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, lag_api->create_lag,
+            lag_api->remove_lag, lag_api->set_lag_attribute);
+      }
+      case SAI_OBJECT_TYPE_LAG_MEMBER: {
+        status = sai_thrift_api_query(SAI_API_LAG, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_lag_api_t *lag_api = (sai_lag_api_t *) api;
+        sai_thrift_parse_lag_member_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, lag_api->create_lag_member,
+            lag_api->remove_lag_member, lag_api->set_lag_member_attribute);
+      }
+      case SAI_OBJECT_TYPE_BRIDGE_PORT: {
+        status = sai_thrift_api_query(SAI_API_BRIDGE, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_bridge_api_t *bridge_api = (sai_bridge_api_t *) api;
+        sai_thrift_parse_bridge_port_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply(op.op, oid, attr_list, bridge_api->create_bridge_port,
+            bridge_api->remove_bridge_port, bridge_api->set_bridge_port_attribute);
+      }
+      case SAI_OBJECT_TYPE_ROUTE_ENTRY: {
+        sai_route_entry_t route_entry;
+        status = sai_thrift_api_query(SAI_API_ROUTE, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_route_api_t *route_api = (sai_route_api_t *) api;
+        sai_thrift_parse_route_entry(op.route_entry, &route_entry);
+        if (has_ref) {
+          route_entry.vr_id = ref_oid;
+        }
+        sai_thrift_parse_route_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply_entry(op.op, &route_entry, attr_list, route_api->create_route_entry,
+            route_api->remove_route_entry, route_api->set_route_entry_attribute);
+      }
+      case SAI_OBJECT_TYPE_NEIGHBOR_ENTRY: {
+        sai_neighbor_entry_t neighbor_entry;
+        status = sai_thrift_api_query(SAI_API_NEIGHBOR, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_neighbor_api_t *neighbor_api = (sai_neighbor_api_t *) api;
+        sai_thrift_parse_neighbor_entry(op.neighbor_entry, &neighbor_entry);
+        if (has_ref) {
+          neighbor_entry.rif_id = ref_oid;
+        }
+        sai_thrift_parse_neighbor_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply_entry(op.op, &neighbor_entry, attr_list, neighbor_api->create_neighbor_entry,
+            neighbor_api->remove_neighbor_entry, neighbor_api->set_neighbor_entry_attribute);
+      }
+      case SAI_OBJECT_TYPE_FDB_ENTRY: {
+        sai_fdb_entry_t fdb_entry;
+        status = sai_thrift_api_query(SAI_API_FDB, &api);
+        if (status != SAI_STATUS_SUCCESS) {
+          return status;
+        }
+        sai_fdb_api_t *fdb_api = (sai_fdb_api_t *) api;
+        sai_thrift_parse_fdb_entry(op.fdb_entry, &fdb_entry);
+        if (has_ref) {
+          fdb_entry.bv_id = ref_oid;
+        }
+        sai_thrift_parse_fdb_attributes(thrift_attr_list, attr_list.data());
+        return sai_thrift_batch_apply_entry(op.op, &fdb_entry, attr_list, fdb_api->create_fdb_entry,
+            fdb_api->remove_fdb_entry, fdb_api->set_fdb_entry_attribute);
+      }
+      default:
+        SAI_THRIFT_LOG_ERR("Object type %d is not supported in batches.", op.object_type);
+        return SAI_STATUS_NOT_SUPPORTED;
+      }
+    }
+
+    void sai_thrift_execute_batch(sai_thrift_bulk_result_t &result, const std::vector<sai_thrift_batch_op_t> &ops) {
+      std::vector<sai_status_t> statuses(ops.size(), SAI_STATUS_NOT_EXECUTED);
+      std::vector<sai_object_id_t> object_ids(ops.size(), SAI_NULL_OBJECT_ID);
+
+      SAI_THRIFT_FUNC_LOG();
+
+      result.status = SAI_STATUS_SUCCESS;
+      for (uint32_t i = 0; i < ops.size(); i++) {
+        const sai_thrift_batch_op_t &op = ops[i];
+        std_sai_thrift_attr_vctr_t thrift_attr_list = op.attr_list;
+        sai_object_id_t ref_oid = SAI_NULL_OBJECT_ID;
+        sai_status_t status = SAI_STATUS_SUCCESS;
+        bool is_create = op.op == sai_thrift_batch_op_type_t::SAI_THRIFT_BATCH_OP_CREATE;
+        bool is_entry = op.object_type == SAI_OBJECT_TYPE_ROUTE_ENTRY ||
+                        op.object_type == SAI_OBJECT_TYPE_NEIGHBOR_ENTRY || op.object_type == SAI_OBJECT_TYPE_FDB_ENTRY;
+
+        // References must point to an earlier operation that created an OID.
+        // A created OID object has no OID yet that a reference could replace.
+        if (op.oid_ref >= 0) {
+          if ((is_create && !is_entry) || (uint32_t) op.oid_ref >= i || object_ids[op.oid_ref] == SAI_NULL_OBJECT_ID) {
+            status = SAI_STATUS_INVALID_PARAMETER;
+          } else {
+            ref_oid = object_ids[op.oid_ref];
+          }
+        }
+        for (const auto &ref : op.attr_oid_refs) {
+          if (ref.first < 0 || (uint32_t) ref.first >= thrift_attr_list.size() ||
+              ref.second < 0 || (uint32_t) ref.second >= i || object_ids[ref.second] == SAI_NULL_OBJECT_ID) {
+            status = SAI_STATUS_INVALID_PARAMETER;
+            break;
+          }
+          thrift_attr_list[ref.first].value.oid = object_ids[ref.second];
+        }
+
+        if (status == SAI_STATUS_SUCCESS) {
+          sai_object_id_t oid = op.oid_ref >= 0 ? ref_oid : (sai_object_id_t) op.oid;
+          status = sai_thrift_batch_execute_op(op, thrift_attr_list, ref_oid, &oid);
+          // Only created objects can be referred to, not removed or changed ones.
+          if (status == SAI_STATUS_SUCCESS && is_create && !is_entry) {
+            object_ids[i] = oid;
+          }
+        }
+
+        statuses[i] = status;
+        if (status != SAI_STATUS_SUCCESS) {
+          SAI_THRIFT_LOG_ERR("Operation %u of %zu failed, status:%d", i, ops.size(), status);
+          result.status = status;
+          break;
+        }
+      }
+
+      sai_thrift_bulk_result(result, result.status, statuses);
+      result.object_ids.assign(object_ids.begin(), object_ids.end());
+    }
 };
 
+static shared_ptr<ThreadManager> sai_thrift_new_thread_manager(int workers) {
+  shared_ptr<ThreadManager> threadManager = ThreadManager::newSimpleThreadManager(workers);
+  threadManager->threadFactory(std::make_shared<ThreadFactory>());
+  threadManager->start();
+  return threadManager;
+}
+
+static shared_ptr<TProtocolFactory> sai_thrift_new_protocol_factory(sai_thrift_protocol_t protocol) {
+  switch (protocol) {
+  case SAI_THRIFT_PROTOCOL_COMPACT:
+    return std::make_shared<TCompactProtocolFactory>();
+  case SAI_THRIFT_PROTOCOL_HEADER:
+    // THeaderProtocol wraps the connection in a THeaderTransport, which
+    // detects whether the client speaks header, binary or compact and
+    // replies in the same encoding.
+    return std::make_shared<THeaderProtocolFactory>();
+  case SAI_THRIFT_PROTOCOL_BINARY:
+  default:
+    return std::make_shared<TBinaryProtocolFactory>();
+  }
+}
+
+// Group read/write, access to the RPC service is granted through the group
+// owning the socket or the permissions of its directory.
+#define SAI_THRIFT_UNIX_SOCKET_MODE 0660
+
+class SaiThriftUnixSocketEventHandler : public TServerEventHandler {
+ public:
+  SaiThriftUnixSocketEventHandler(const std::string &path) : path_(path) {}
+
+  // Called once the socket is bound and listening.
+  void preServe() override {
+    if (chmod(path_.c_str(), SAI_THRIFT_UNIX_SOCKET_MODE) != 0) {
+      std::cerr << "Failed to set permissions of " << path_ << ": " << strerror(errno) << std::endl;
+    }
+  }
+
+ private:
+  std::string path_;
+};
+
+/*
+ * Holds the SAI lock, see sai_thrift_sai_lock_t, while a call runs: from
+ * after its arguments are read until its result is written. Calls that only
+ * read state kept by the server never enter SAI and skip it, which also keeps
+ * sai_thrift_wait_counter_update from blocking the counter poller it waits for.
+ */
+class SaiThriftSerializeEventHandler : public TProcessorEventHandler {
+ public:
+  void *getContext(const char *fn_name, void *serverContext) override {
+    return new sai_thrift_sai_lock_t(false);
+  }
+
+  void freeContext(void *ctx, const char *fn_name) override {
+    delete (sai_thrift_sai_lock_t *) ctx;
+  }
+
+  void postRead(void *ctx, const char *fn_name, uint32_t bytes) override {
+    static const std::set<std::string> unlocked = {
+      "switch_sai_rpc.sai_thrift_get_fdb_entries",
+      "switch_sai_rpc.sai_thrift_query_fdb_entries",
+      "switch_sai_rpc.sai_thrift_get_fdb_changes",
+      "switch_sai_rpc.sai_thrift_get_notification_stats",
+      "switch_sai_rpc.sai_thrift_get_counter_snapshot",
+      "switch_sai_rpc.sai_thrift_get_counter_rates",
+      "switch_sai_rpc.sai_thrift_wait_counter_update",
+    };
+    if (unlocked.count(fn_name) == 0) {
+      ((sai_thrift_sai_lock_t *) ctx)->lock();
+    }
+  }
+
+  void preWrite(void *ctx, const char *fn_name) override {
+    ((sai_thrift_sai_lock_t *) ctx)->unlock();
+  }
+};
+
+typedef struct {
+  const sai_thrift_server_config_t *config;
+  shared_ptr<TProcessor> processor;
+  // Empty for the TCP listener.
+  std::string unix_socket;
+} sai_thrift_listener_t;
+
 static void * switch_sai_thrift_rpc_server_thread(void *arg) {
-  int port = *(int *) arg;
-  shared_ptr<switch_sai_rpcHandler> handler(new switch_sai_rpcHandler());
-  shared_ptr<TProcessor> processor(new switch_sai_rpcProcessor(handler));
-  shared_ptr<TServerTransport> serverTransport(new TServerSocket(port));
-  shared_ptr<TTransportFactory> transportFactory(new TBufferedTransportFactory());
-  shared_ptr<TProtocolFactory> protocolFactory(new TBinaryProtocolFactory());
-
-  TSimpleServer server(processor, serverTransport, transportFactory, protocolFactory);
-  server.serve();
+  const sai_thrift_listener_t *listener = (const sai_thrift_listener_t *) arg;
+  const sai_thrift_server_config_t *config = listener->config;
+  shared_ptr<TProcessor> processor = listener->processor;
+  shared_ptr<TProtocolFactory> protocolFactory = sai_thrift_new_protocol_factory(config->protocol);
+  shared_ptr<TServer> server;
+
+  if (config->server_type == SAI_THRIFT_SERVER_NONBLOCKING) {
+    // TNonblockingServer always speaks TFramedTransport: the I/O threads run
+    // the libevent loops and hand complete frames to the task workers.
+    shared_ptr<TNonblockingServerTransport> serverTransport;
+    if (listener->unix_socket.empty()) {
+      serverTransport.reset(new TNonblockingServerSocket(config->port));
+    } else {
+      serverTransport.reset(new TNonblockingServerSocket(listener->unix_socket));
+    }
+    shared_ptr<TNonblockingServer> nbServer(new TNonblockingServer(processor, protocolFactory, serverTransport,
+          sai_thrift_new_thread_manager(config->worker_threads)));
+    nbServer->setNumIOThreads(config->io_threads);
+    server = nbServer;
+  } else {
+    shared_ptr<TServerTransport> serverTransport;
+    if (listener->unix_socket.empty()) {
+      serverTransport.reset(new TServerSocket(config->port));
+    } else {
+      serverTransport.reset(new TServerSocket(listener->unix_socket));
+    }
+    shared_ptr<TTransportFactory> transportFactory(new TBufferedTransportFactory());
+
+    switch (config->server_type) {
+    case SAI_THRIFT_SERVER_THREADED:
+      server.reset(new TThreadedServer(processor, serverTransport, transportFactory, protocolFactory));
+      break;
+    case SAI_THRIFT_SERVER_THREAD_POOL:
+      server.reset(new TThreadPoolServer(processor, serverTransport, transportFactory, protocolFactory,
+            sai_thrift_new_thread_manager(config->worker_threads)));
+      break;
+    case SAI_THRIFT_SERVER_SIMPLE:
+    default:
+      server.reset(new TSimpleServer(processor, serverTransport, transportFactory, protocolFactory));
+      break;
+    }
+  }
+
+  if (!listener->unix_socket.empty()) {
+    server->setServerEventHandler(std::make_shared<SaiThriftUnixSocketEventHandler>(listener->unix_socket));
+  }
+
+  server->serve();
   return 0;
 }
 
-static pthread_t switch_sai_thrift_rpc_thread;
+static int sai_thrift_start_listener(const sai_thrift_listener_t *listener) {
+  pthread_t thread;
+
+  int rc = pthread_create(&thread, NULL, switch_sai_thrift_rpc_server_thread, (void *) listener);
+  std::cerr << "create pthread switch_sai_thrift_rpc_server_thread result " << rc << std::endl;
+  if (rc != 0) {
+    return rc;
+  }
+
+  rc = pthread_detach(thread);
+  std::cerr << "detach switch_sai_thrift_rpc_server_thread rc" << rc  << std::endl;
+
+  return rc;
+}
 
 extern "C" {
 
-  int start_sai_thrift_rpc_server(int port) {
-    static int param = port;
+  int start_sai_thrift_rpc_server(const sai_thrift_server_config_t *config) {
+    static sai_thrift_server_config_t param = *config;
+    // Both listeners share one handler, so they serve the same state.
+    static shared_ptr<TProcessor> processor(new switch_sai_rpcProcessor(
+          std::make_shared<switch_sai_rpcHandler>()));
+    static sai_thrift_listener_t tcp_listener = { &param, processor, "" };
+    static sai_thrift_listener_t unix_listener = { &param, processor,
+      param.unix_socket ? param.unix_socket : "" };
+    int rc;
 
-    std::cerr << "Starting SAI RPC server on port " << port << std::endl;
+    processor->setEventHandler(std::make_shared<SaiThriftSerializeEventHandler>());
 
-    int rc = pthread_create(&switch_sai_thrift_rpc_thread, NULL, switch_sai_thrift_rpc_server_thread, &param);
-    std::cerr << "create pthread switch_sai_thrift_rpc_server_thread result " << rc << std::endl;
+    if ((param.server_type == SAI_THRIFT_SERVER_THREAD_POOL || param.server_type == SAI_THRIFT_SERVER_NONBLOCKING) &&
+        param.worker_threads <= 0) {
+      std::cerr << "Invalid number of worker threads " << param.worker_threads << std::endl;
+      return -1;
+    }
 
-    rc = pthread_detach(switch_sai_thrift_rpc_thread);
-    std::cerr << "detach switch_sai_thrift_rpc_server_thread rc" << rc  << std::endl;
+    if (param.server_type == SAI_THRIFT_SERVER_NONBLOCKING && param.io_threads <= 0) {
+      std::cerr << "Invalid number of I/O threads " << param.io_threads << std::endl;
+      return -1;
+    }
 
-    return rc;
+    if (param.server_type == SAI_THRIFT_SERVER_NONBLOCKING && param.protocol == SAI_THRIFT_PROTOCOL_HEADER) {
+      std::cerr << "Header protocol is not supported by the nonblocking server" << std::endl;
+      return -1;
+    }
+
+    if (param.port <= 0 && unix_listener.unix_socket.empty()) {
+      std::cerr << "Neither a TCP port nor a unix socket is configured" << std::endl;
+      return -1;
+    }
+
+    if (!unix_listener.unix_socket.empty()) {
+      // Remove the socket left behind by a previous run, bind() fails otherwise.
+      // Anything else at that path is left alone and reported by bind().
+      struct stat st;
+      if (lstat(unix_listener.unix_socket.c_str(), &st) == 0 && S_ISSOCK(st.st_mode)) {
+        unlink(unix_listener.unix_socket.c_str());
+      }
+
+      std::cerr << "Starting SAI RPC server on unix socket " << unix_listener.unix_socket << std::endl;
+      rc = sai_thrift_start_listener(&unix_listener);
+      if (rc != 0) {
+        return rc;
+      }
+    }
+
+    if (param.port > 0) {
+      std::cerr << "Starting SAI RPC server on port " << param.port << std::endl;
+      rc = sai_thrift_start_listener(&tcp_listener);
+      if (rc != 0) {
+        return rc;
+      }
+    }
+
+    return 0;
   }
 }
@@ -1,3 +1,58 @@
+#pragma once
+
+/*
+ * Server engines for the SAI RPC service.
+ *
+ * SIMPLE serves one connection at a time. THREADED spawns one thread per
+ * connection. THREAD_POOL serves connections from a fixed pool of
+ * worker_threads, further connections wait for a free worker. NONBLOCKING
+ * multiplexes all connections over io_threads event loops and runs the calls
+ * on a pool of worker_threads; clients must use TFramedTransport.
+ *
+ * With any engine other than SIMPLE, handlers run concurrently. The shared
+ * handler state follows these rules:
+ *  - gSwitchId is written once by main() before the server is started and is
+ *    read-only afterwards, so it needs no locking.
+ *  - The FDB shadow is written by the notification worker, RPC handlers
+ *    read it through immutable snapshots, see sai_fdb_table.h and
+ *    sai_notification_queue.h.
+ *  - SAI implementations are not required to be thread-safe, so every call
+ *    into the library holds the SAI lock, see sai_thrift_sai_lock_t in
+ *    sai_api_table.h. RPCs that only read server state skip it. With
+ *    --serialize-sai off the lock is a no-op and correctness depends on the
+ *    vendor SAI being thread-safe.
+ */
+typedef enum {
+  SAI_THRIFT_SERVER_SIMPLE,
+  SAI_THRIFT_SERVER_THREADED,
+  SAI_THRIFT_SERVER_THREAD_POOL,
+  SAI_THRIFT_SERVER_NONBLOCKING,
+} sai_thrift_server_type_t;
+
+/*
+ * The wire encoding is selected with protocol. HEADER accepts header, binary
+ * and compact clients on the same port and answers each in its own encoding.
+ */
+typedef enum {
+  SAI_THRIFT_PROTOCOL_BINARY,
+  SAI_THRIFT_PROTOCOL_COMPACT,
+  SAI_THRIFT_PROTOCOL_HEADER,
+} sai_thrift_protocol_t;
+
+/*
+ * The service listens on the TCP port and, when unix_socket is set, on a unix
+ * domain socket at that path as well. Both listeners use the same engine and
+ * protocol and share one handler. A port of 0 disables the TCP listener.
+ */
+typedef struct {
+  int port;
+  sai_thrift_server_type_t server_type;
+  int worker_threads;
+  int io_threads;
+  sai_thrift_protocol_t protocol;
+  const char *unix_socket;
+} sai_thrift_server_config_t;
+
 extern "C" {
-int start_sai_thrift_rpc_server(int port);
+int start_sai_thrift_rpc_server(const sai_thrift_server_config_t *config);
 }
@@ -0,0 +1,53 @@
+#undef NDEBUG
+#include <cassert>
+#include <iostream>
+
+#include "sai_counter_poller.h"
+
+static void test_delta() {
+  assert(sai_thrift_counter_delta(0, 0, false) == 0);
+  assert(sai_thrift_counter_delta(100, 150, false) == 50);
+  assert(sai_thrift_counter_delta(150, 150, false) == 0);
+}
+
+static void test_delta_wrap() {
+  // Wrapped around 2^64 between the polls.
+  assert(sai_thrift_counter_delta(UINT64_MAX, 0, false) == 1);
+  assert(sai_thrift_counter_delta(UINT64_MAX - 9, 5, false) == 15);
+  assert(sai_thrift_counter_delta(UINT64_C(1) << 63, 0, false) == UINT64_C(1) << 63);
+}
+
+static void test_delta_cleared() {
+  // Cleared through the RPC server, counted up from 0 since.
+  assert(sai_thrift_counter_delta(100, 30, true) == 30);
+  assert(sai_thrift_counter_delta(100, 130, true) == 130);
+  assert(sai_thrift_counter_delta(UINT64_MAX, 5, true) == 5);
+
+  // Went down without a known clear, taken as cleared below 2^63.
+  assert(sai_thrift_counter_delta(100, 30, false) == 30);
+  assert(sai_thrift_counter_delta((UINT64_C(1) << 63) - 1, 0, false) == 0);
+}
+
+static void test_row_size() {
+  sai_thrift_poller_group_t group;
+
+  group.object_type = SAI_OBJECT_TYPE_PORT;
+  group.counter_ids = { 1, 2, 3 };
+  assert(sai_thrift_counter_group_row_size(group) == 3);
+
+  // Debug counters have a single value whatever counter_ids holds.
+  group.object_type = SAI_OBJECT_TYPE_DEBUG_COUNTER;
+  assert(sai_thrift_counter_group_row_size(group) == 1);
+  group.counter_ids.clear();
+  assert(sai_thrift_counter_group_row_size(group) == 1);
+}
+
+int main() {
+  test_row_size();
+  test_delta();
+  test_delta_wrap();
+  test_delta_cleared();
+
+  std::cout << "test_counter_poller: OK" << std::endl;
+  return 0;
+}
@@ -0,0 +1,158 @@
+#undef NDEBUG
+#include <cassert>
+#include <cstddef>
+#include <cstring>
+#include <iostream>
+#include <string>
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include "sai_counter_shm.h"
+
+// The layout is read by other programs, any change of it needs a new
+// SAI_COUNTER_SHM_VERSION.
+static void test_layout() {
+  assert(sizeof(sai_counter_shm_header_t) == 80);
+  assert(offsetof(sai_counter_shm_header_t, magic) == 0);
+  assert(offsetof(sai_counter_shm_header_t, version) == 4);
+  assert(offsetof(sai_counter_shm_header_t, seq) == 8);
+  assert(offsetof(sai_counter_shm_header_t, size) == 16);
+  assert(offsetof(sai_counter_shm_header_t, max_objects) == 24);
+  assert(offsetof(sai_counter_shm_header_t, num_objects) == 28);
+  assert(offsetof(sai_counter_shm_header_t, max_counters) == 32);
+  assert(offsetof(sai_counter_shm_header_t, num_counters) == 36);
+  assert(offsetof(sai_counter_shm_header_t, objects_offset) == 40);
+  assert(offsetof(sai_counter_shm_header_t, counter_ids_offset) == 48);
+  assert(offsetof(sai_counter_shm_header_t, counters_offset) == 56);
+  assert(offsetof(sai_counter_shm_header_t, timestamp_us) == 64);
+  assert(offsetof(sai_counter_shm_header_t, flags) == 72);
+
+  assert(sizeof(sai_counter_shm_object_t) == 72);
+  assert(offsetof(sai_counter_shm_object_t, group) == 0);
+  assert(offsetof(sai_counter_shm_object_t, object_id) == 32);
+  assert(offsetof(sai_counter_shm_object_t, object_type) == 40);
+  assert(offsetof(sai_counter_shm_object_t, status) == 44);
+  assert(offsetof(sai_counter_shm_object_t, counter_index) == 48);
+  assert(offsetof(sai_counter_shm_object_t, number_of_counters) == 52);
+  assert(offsetof(sai_counter_shm_object_t, timestamp_us) == 56);
+  assert(offsetof(sai_counter_shm_object_t, seq) == 64);
+}
+
+static std::shared_ptr<const sai_thrift_poller_snapshot_t> snapshot(const std::string &name,
+                                                                    sai_object_type_t object_type,
+                                                                    uint32_t object_count, uint32_t counter_count,
+                                                                    uint64_t seq) {
+  auto snapshot = std::make_shared<sai_thrift_poller_snapshot_t>();
+
+  snapshot->group.name = name;
+  snapshot->group.object_type = object_type;
+  for (uint32_t i = 0; i < object_count; i++) {
+    snapshot->group.object_ids.push_back(0x1000 + i);
+  }
+  for (uint32_t j = 0; j < counter_count; j++) {
+    snapshot->group.counter_ids.push_back(10 + j);
+  }
+  snapshot->group.interval_ms = 1000;
+  snapshot->status = SAI_STATUS_SUCCESS;
+  snapshot->statuses.assign(object_count, SAI_STATUS_SUCCESS);
+  uint32_t row_size = sai_thrift_counter_group_row_size(snapshot->group);
+  for (uint32_t k = 0; k < object_count * row_size; k++) {
+    snapshot->counters.push_back(seq * 1000 + k);
+  }
+  snapshot->cleared.assign(snapshot->counters.size(), 0);
+  snapshot->timestamp_us = 42;
+  snapshot->monotonic_ns = 0;
+  snapshot->seq = seq;
+  return snapshot;
+}
+
+static void test_publish(const char *path) {
+  // Room for 4 objects and 8 counters.
+  assert(sai_thrift_counter_shm_open(path, 4, 8) == SAI_STATUS_SUCCESS);
+  assert(sai_thrift_counter_shm_enabled());
+  assert(sai_thrift_counter_shm_open(path, 4, 8) == SAI_STATUS_INVALID_PARAMETER);
+
+  int fd = open(path, O_RDONLY);
+  assert(fd >= 0);
+  struct stat st;
+  assert(fstat(fd, &st) == 0);
+  void *addr = mmap(nullptr, st.st_size, PROT_READ, MAP_SHARED, fd, 0);
+  assert(addr != MAP_FAILED);
+  close(fd);
+
+  const char *base = (const char *) addr;
+  const sai_counter_shm_header_t *header = (const sai_counter_shm_header_t *) addr;
+  assert(header->magic == SAI_COUNTER_SHM_MAGIC);
+  assert(header->version == SAI_COUNTER_SHM_VERSION);
+  assert(header->size == (uint64_t) st.st_size);
+  assert(header->max_objects == 4 && header->max_counters == 8);
+  assert(header->seq == 0);
+
+  // Every array starts on a cache line and fits before the next one.
+  assert(header->objects_offset % 64 == 0 && header->objects_offset >= sizeof(sai_counter_shm_header_t));
+  assert(header->counter_ids_offset % 64 == 0 &&
+         header->counter_ids_offset >= header->objects_offset + 4 * sizeof(sai_counter_shm_object_t));
+  assert(header->counters_offset % 64 == 0 &&
+         header->counters_offset >= header->counter_ids_offset + 8 * sizeof(uint32_t));
+  assert(header->size >= header->counters_offset + 8 * sizeof(uint64_t));
+
+  const sai_counter_shm_object_t *objects = (const sai_counter_shm_object_t *) (base + header->objects_offset);
+  const uint32_t *counter_ids = (const uint32_t *) (base + header->counter_ids_offset);
+  const uint64_t *counters = (const uint64_t *) (base + header->counters_offset);
+
+  sai_thrift_counter_shm_publish({
+      snapshot("ports-with-a-name-longer-than-the-field", SAI_OBJECT_TYPE_PORT, 2, 3, 7),
+      snapshot("drops", SAI_OBJECT_TYPE_DEBUG_COUNTER, 1, 0, 3),
+  });
+  // Each update is one odd and one even step of the seqlock.
+  assert(header->seq == 2);
+  assert(header->num_objects == 3 && header->num_counters == 7);
+  assert(header->flags == 0);
+  assert(header->timestamp_us != 0);
+
+  assert(strlen(objects[0].group) == SAI_COUNTER_SHM_GROUP_NAME_SIZE - 1);
+  assert(strncmp(objects[0].group, "ports-with-a-name-longer-than-the-field", SAI_COUNTER_SHM_GROUP_NAME_SIZE - 1) == 0);
+  assert(objects[1].object_id == 0x1001 && objects[1].object_type == SAI_OBJECT_TYPE_PORT);
+  assert(objects[1].counter_index == 3 && objects[1].number_of_counters == 3);
+  assert(objects[1].seq == 7 && objects[1].timestamp_us == 42);
+  assert(counter_ids[3] == 10 && counter_ids[5] == 12);
+  assert(counters[3] == 7003 && counters[5] == 7005);
+
+  assert(strcmp(objects[2].group, "drops") == 0);
+  assert(objects[2].object_type == SAI_OBJECT_TYPE_DEBUG_COUNTER);
+  assert(objects[2].counter_index == 6 && objects[2].number_of_counters == 1);
+  assert(counter_ids[6] == 0 && counters[6] == 3000);
+
+  // The second group no longer fits and is left out.
+  sai_thrift_counter_shm_publish({
+      snapshot("queues", SAI_OBJECT_TYPE_QUEUE, 2, 2, 8),
+      snapshot("ports", SAI_OBJECT_TYPE_PORT, 2, 3, 8),
+  });
+  assert(header->seq == 4);
+  assert(header->num_objects == 2 && header->num_counters == 4);
+  assert(header->flags & SAI_COUNTER_SHM_FLAG_TRUNCATED);
+
+  sai_thrift_counter_shm_publish({});
+  assert(header->seq == 6);
+  assert(header->num_objects == 0 && header->flags == 0);
+
+  munmap(addr, st.st_size);
+}
+
+int main() {
+  char path[] = "/tmp/test_counter_shm.XXXXXX";
+  int fd = mkstemp(path);
+  assert(fd >= 0);
+  close(fd);
+
+  test_layout();
+  // The table replaces whatever is at the path.
+  test_publish(path);
+  unlink(path);
+
+  std::cout << "test_counter_shm: OK" << std::endl;
+  return 0;
+}
@@ -0,0 +1,422 @@
+#undef NDEBUG
+#include <cassert>
+#include <cstring>
+#include <iostream>
+
+#include "sai_fdb_table.h"
+
+sai_object_id_t gSwitchId;
+
+static sai_fdb_entry_t fdb_entry(sai_object_id_t bv_id, uint64_t mac) {
+  sai_fdb_entry_t fdb_entry;
+
+  memset(&fdb_entry, 0, sizeof(fdb_entry));
+  for (int i = 5; i >= 0; i--) {
+    fdb_entry.mac_address[i] = mac & 0xff;
+    mac >>= 8;
+  }
+  fdb_entry.bv_id = bv_id;
+  return fdb_entry;
+}
+
+static const sai_thrift_fdb_shadow_entry_t *find(const SaiThriftFdbTable &table, sai_object_id_t bv_id, uint64_t mac) {
+  for (const auto &entry : table.entries()) {
+    sai_thrift_fdb_key_t k = SaiThriftFdbTable::key(entry.fdb_entry);
+    if (k.bv_id == bv_id && k.mac == mac) {
+      return &entry;
+    }
+  }
+  return nullptr;
+}
+
+static void test_key() {
+  sai_thrift_fdb_key_t k = SaiThriftFdbTable::key(fdb_entry(7, 0x001122334455ULL));
+
+  assert(k.mac == 0x001122334455ULL);
+  assert(k.bv_id == 7);
+
+  sai_thrift_fdb_key_t a = { 0xff, 1 };
+  sai_thrift_fdb_key_t b = { 0x01, 2 };
+  assert(a < b && !(b < a));
+}
+
+static void test_learn_move_age() {
+  SaiThriftFdbTable table;
+
+  table.learn(fdb_entry(1, 0xa), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.learn(fdb_entry(1, 0xb), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.learn(fdb_entry(1, 0xa), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  assert(table.size() == 2);
+
+  table.learn(fdb_entry(1, 0xa), 200, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_STATIC);
+  assert(table.size() == 2);
+  assert(find(table, 1, 0xa)->bport_id == 200);
+  assert(find(table, 1, 0xa)->entry_type == (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_STATIC);
+
+  // Aging the first entry moves the last one into its slot.
+  table.remove(fdb_entry(1, 0xa));
+  assert(table.size() == 1);
+  assert(find(table, 1, 0xa) == nullptr);
+  assert(find(table, 1, 0xb) != nullptr);
+  table.remove(fdb_entry(1, 0xa));
+  assert(table.size() == 1);
+
+  // The moved entry is still found by its port.
+  table.flush(0, 100);
+  assert(table.size() == 0);
+}
+
+static void test_flush() {
+  SaiThriftFdbTable table;
+
+  for (uint64_t mac = 1; mac <= 4; mac++) {
+    table.learn(fdb_entry(1, mac), mac % 2 ? 100 : 200, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+    table.learn(fdb_entry(2, mac), mac % 2 ? 100 : 200, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  }
+  assert(table.size() == 8);
+
+  // Unknown port or bv_id.
+  table.flush(0, 300);
+  table.flush(3, 0);
+  assert(table.size() == 8);
+
+  table.flush(1, 100);
+  assert(table.size() == 6);
+  assert(find(table, 1, 1) == nullptr && find(table, 1, 3) == nullptr);
+  assert(find(table, 2, 1) != nullptr);
+
+  table.flush(0, 100);
+  assert(table.size() == 4);
+  assert(find(table, 2, 1) == nullptr && find(table, 2, 3) == nullptr);
+
+  table.flush(2, 0);
+  assert(table.size() == 2);
+  assert(find(table, 1, 2) != nullptr && find(table, 1, 4) != nullptr);
+
+  // The indexes followed the entries moved by the removals.
+  table.flush(1, 200);
+  assert(table.size() == 0);
+
+  table.learn(fdb_entry(1, 1), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.flush(0, 0);
+  assert(table.size() == 0);
+}
+
+static void test_version() {
+  SaiThriftFdbTable table;
+
+  assert(table.version() == 0);
+  table.learn(fdb_entry(1, 0xa), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.learn(fdb_entry(1, 0xb), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  assert(table.version() == 2);
+
+  // Neither learning an entry unchanged nor aging a missing one is a change.
+  table.learn(fdb_entry(1, 0xa), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.remove(fdb_entry(1, 0xc));
+  assert(table.version() == 2);
+
+  table.learn(fdb_entry(1, 0xa), 200, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.remove(fdb_entry(1, 0xb));
+  assert(table.version() == 4);
+}
+
+static void test_apply_events_publish() {
+  sai_thrift_fdb_event_t events[3];
+
+  events[0].event_type = SAI_FDB_EVENT_LEARNED;
+  events[0].fdb_entry = fdb_entry(2, 0x1);
+  events[0].bport_id = 100;
+  events[0].entry_type = (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC;
+  events[1] = events[0];
+  events[1].fdb_entry = fdb_entry(1, 0x2);
+  events[2] = events[0];
+  events[2].fdb_entry = fdb_entry(1, 0x1);
+
+  auto empty = sai_thrift_fdb_table_snapshot();
+  assert(empty->entries.empty() && empty->version == 0);
+
+  sai_thrift_fdb_table_apply_events(events, 3);
+  // Not visible before it is published.
+  assert(sai_thrift_fdb_table_snapshot() == empty);
+
+  sai_thrift_fdb_table_publish();
+  auto snapshot = sai_thrift_fdb_table_snapshot();
+  assert(snapshot->version == 3);
+  assert(snapshot->entries.size() == 3);
+  assert(SaiThriftFdbTable::key(snapshot->entries[0].fdb_entry) == SaiThriftFdbTable::key(events[2].fdb_entry));
+  assert(SaiThriftFdbTable::key(snapshot->entries[1].fdb_entry) == SaiThriftFdbTable::key(events[1].fdb_entry));
+  assert(SaiThriftFdbTable::key(snapshot->entries[2].fdb_entry) == SaiThriftFdbTable::key(events[0].fdb_entry));
+
+  // Nothing changed, the snapshot is kept.
+  sai_thrift_fdb_table_publish();
+  assert(sai_thrift_fdb_table_snapshot() == snapshot);
+
+  // Aging a MAC by an event of its own, flushing a port of a bv_id.
+  events[0].event_type = SAI_FDB_EVENT_AGED;
+  events[1].event_type = SAI_FDB_EVENT_FLUSHED;
+  events[1].fdb_entry = fdb_entry(1, 0);
+  sai_thrift_fdb_table_apply_events(events, 2);
+  sai_thrift_fdb_table_publish();
+  assert(sai_thrift_fdb_table_snapshot()->entries.empty());
+  assert(sai_thrift_fdb_table_snapshot()->version == 6);
+  // The old snapshot is left untouched for its readers.
+  assert(snapshot->entries.size() == 3);
+}
+
+static sai_thrift_fdb_shadow_entry_t shadow_entry(sai_object_id_t bv_id, uint64_t mac, sai_object_id_t bport_id,
+                                                  int32_t entry_type) {
+  sai_thrift_fdb_shadow_entry_t entry;
+
+  entry.fdb_entry = fdb_entry(bv_id, mac);
+  entry.bport_id = bport_id;
+  entry.entry_type = (sai_fdb_entry_type_t) entry_type;
+  return entry;
+}
+
+static sai_thrift_fdb_filter_t filter_any() {
+  sai_thrift_fdb_filter_t filter;
+
+  filter.bv_id = 0;
+  filter.bport_id = 0;
+  filter.mac_prefix = 0;
+  filter.mac_prefix_len = 0;
+  filter.entry_type = -1;
+  return filter;
+}
+
+static void test_snapshot_query() {
+  sai_thrift_fdb_snapshot_t snapshot;
+  std::vector<const sai_thrift_fdb_shadow_entry_t *> matches;
+  sai_thrift_fdb_filter_t filter;
+
+  // Sorted by (bv_id, MAC), as published.
+  snapshot.entries.push_back(shadow_entry(1, 0x001100000001ULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.entries.push_back(shadow_entry(1, 0x001100000002ULL, 200, SAI_FDB_ENTRY_TYPE_STATIC));
+  snapshot.entries.push_back(shadow_entry(1, 0x0022000000ffULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.entries.push_back(shadow_entry(2, 0x001100000001ULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.entries.push_back(shadow_entry(2, 0xffffffffffffULL, 200, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.version = 5;
+
+  filter = filter_any();
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 5);
+
+  matches.clear();
+  filter.bv_id = 2;
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 2 && matches[0] == &snapshot.entries[3]);
+
+  matches.clear();
+  filter = filter_any();
+  filter.bport_id = 200;
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 2 && matches[0] == &snapshot.entries[1] && matches[1] == &snapshot.entries[4]);
+
+  matches.clear();
+  filter = filter_any();
+  filter.entry_type = SAI_FDB_ENTRY_TYPE_STATIC;
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 1 && matches[0] == &snapshot.entries[1]);
+
+  // Paging resumes after the last key returned.
+  matches.clear();
+  filter = filter_any();
+  assert(sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 2, matches));
+  assert(matches.size() == 2);
+  sai_thrift_fdb_key_t after = SaiThriftFdbTable::key(matches.back()->fdb_entry);
+  matches.clear();
+  assert(sai_thrift_fdb_snapshot_query(snapshot, filter, &after, 2, matches));
+  assert(matches.size() == 2 && matches[0] == &snapshot.entries[2]);
+  after = SaiThriftFdbTable::key(matches.back()->fdb_entry);
+  matches.clear();
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, &after, 2, matches));
+  assert(matches.size() == 1 && matches[0] == &snapshot.entries[4]);
+
+  // A limit matching the remaining entries exactly has nothing more.
+  matches.clear();
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, &after, 1, matches));
+  assert(matches.size() == 1);
+}
+
+static void test_snapshot_query_prefix() {
+  sai_thrift_fdb_snapshot_t snapshot;
+  std::vector<const sai_thrift_fdb_shadow_entry_t *> matches;
+  sai_thrift_fdb_filter_t filter;
+
+  snapshot.entries.push_back(shadow_entry(1, 0x001100000001ULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.entries.push_back(shadow_entry(1, 0x00110000ff02ULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.entries.push_back(shadow_entry(1, 0x001200000001ULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.entries.push_back(shadow_entry(2, 0x001100000003ULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.entries.push_back(shadow_entry(2, 0xffffffffffffULL, 100, SAI_FDB_ENTRY_TYPE_DYNAMIC));
+  snapshot.version = 5;
+
+  // Bits past the prefix length are ignored.
+  filter = filter_any();
+  filter.mac_prefix = 0x0011ffffffffULL;
+  filter.mac_prefix_len = 16;
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 3);
+  assert(matches[0] == &snapshot.entries[0] && matches[1] == &snapshot.entries[1] &&
+         matches[2] == &snapshot.entries[3]);
+
+  // Within a bv_id the prefix narrows the range walked.
+  matches.clear();
+  filter.bv_id = 1;
+  filter.mac_prefix = 0x001100000000ULL;
+  filter.mac_prefix_len = 40;
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 1 && matches[0] == &snapshot.entries[0]);
+
+  // A prefix not on a byte boundary.
+  matches.clear();
+  filter = filter_any();
+  filter.mac_prefix = 0x001000000000ULL;
+  filter.mac_prefix_len = 14;
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 4);
+
+  // The full MAC.
+  matches.clear();
+  filter = filter_any();
+  filter.bv_id = 2;
+  filter.mac_prefix = 0xffffffffffffULL;
+  filter.mac_prefix_len = 48;
+  assert(!sai_thrift_fdb_snapshot_query(snapshot, filter, nullptr, 10, matches));
+  assert(matches.size() == 1 && matches[0] == &snapshot.entries[4]);
+}
+
+static void test_cursor() {
+  sai_thrift_fdb_key_t key = { 0xfedcba987654ULL, 0x2600000000000001ULL };
+  sai_thrift_fdb_key_t decoded;
+
+  std::string cursor = sai_thrift_fdb_cursor_encode(key);
+  assert(cursor == "2600000000000001fedcba987654");
+  assert(sai_thrift_fdb_cursor_decode(cursor, decoded));
+  assert(decoded == key);
+
+  sai_thrift_fdb_key_t zero = { 0, 0 };
+  assert(sai_thrift_fdb_cursor_decode(sai_thrift_fdb_cursor_encode(zero), decoded));
+  assert(decoded == zero);
+
+  assert(!sai_thrift_fdb_cursor_decode("", decoded));
+  assert(!sai_thrift_fdb_cursor_decode(cursor.substr(1), decoded));
+  assert(!sai_thrift_fdb_cursor_decode(cursor + "0", decoded));
+  assert(!sai_thrift_fdb_cursor_decode("2600000000000001FEDCBA987654", decoded));
+  assert(!sai_thrift_fdb_cursor_decode("-600000000000001fedcba987654", decoded));
+  assert(!sai_thrift_fdb_cursor_decode("2600000000000001 edcba987654", decoded));
+}
+
+static void test_change_records() {
+  SaiThriftFdbTable table;
+  std::vector<sai_thrift_fdb_change_record_t> changes;
+
+  table.learn(fdb_entry(1, 0xa), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.learn(fdb_entry(1, 0xb), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.learn(fdb_entry(1, 0xa), 200, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_STATIC);
+  table.remove(fdb_entry(1, 0xa));
+  table.flush(1, 100);
+
+  assert(table.changes(0, 10, changes));
+  assert(changes.size() == 5);
+  assert(changes[0].seq == 1 && changes[0].event_type == SAI_FDB_EVENT_LEARNED);
+  assert(changes[1].seq == 2 && changes[1].event_type == SAI_FDB_EVENT_LEARNED);
+  // Entries are recorded as they are after the change, or as removed.
+  assert(changes[2].seq == 3 && changes[2].event_type == SAI_FDB_EVENT_MOVE);
+  assert(changes[2].entry.bport_id == 200);
+  assert(changes[2].entry.entry_type == (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_STATIC);
+  assert(changes[3].seq == 4 && changes[3].event_type == SAI_FDB_EVENT_AGED);
+  assert(SaiThriftFdbTable::key(changes[3].entry.fdb_entry).mac == 0xa);
+  assert(changes[4].seq == 5 && changes[4].event_type == SAI_FDB_EVENT_FLUSHED);
+  assert(SaiThriftFdbTable::key(changes[4].entry.fdb_entry).mac == 0xb);
+}
+
+static void test_change_log() {
+  SaiThriftFdbTable table;
+  std::vector<sai_thrift_fdb_change_record_t> changes;
+
+  for (uint64_t mac = 1; mac <= 5; mac++) {
+    table.learn(fdb_entry(1, mac), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  }
+
+  assert(table.changes(2, 2, changes));
+  assert(changes.size() == 2 && changes[0].seq == 3 && changes[1].seq == 4);
+
+  changes.clear();
+  assert(table.changes(5, 10, changes));
+  assert(changes.empty());
+  assert(!table.changes(6, 10, changes));
+
+  // Flushing everything resets the log, clients have to reload.
+  table.flush(0, 0);
+  assert(table.size() == 0);
+  assert(table.version() == 6);
+  assert(!table.changes(5, 10, changes));
+  assert(table.changes(6, 10, changes));
+  assert(changes.empty());
+
+  // Replacing keeps counting versions.
+  SaiThriftFdbTable other;
+  other.learn(fdb_entry(1, 1), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  table.replace(std::move(other));
+  assert(table.size() == 1);
+  assert(table.version() == 7);
+  assert(!table.changes(6, 10, changes));
+  table.learn(fdb_entry(1, 2), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  assert(table.changes(7, 10, changes));
+  assert(changes.size() == 1 && changes[0].seq == 8);
+}
+
+static void test_change_log_window() {
+  SaiThriftFdbTable table;
+  std::vector<sai_thrift_fdb_change_record_t> changes;
+  const uint64_t count = SAI_THRIFT_FDB_CHANGE_LOG_SIZE + 10;
+
+  for (uint64_t mac = 1; mac <= count; mac++) {
+    table.learn(fdb_entry(1, mac), 100, (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC);
+  }
+
+  assert(!table.changes(9, 1, changes));
+  assert(table.changes(10, 1, changes));
+  assert(changes.size() == 1 && changes[0].seq == 11);
+}
+
+static void test_table_changes() {
+  std::vector<sai_thrift_fdb_change_record_t> changes;
+  sai_thrift_fdb_event_t event;
+  uint64_t version;
+
+  // The shadow of the switch holds what earlier tests left in it, start
+  // from its current version.
+  sai_thrift_fdb_table_changes(0, 0, changes, version);
+  uint64_t start = version;
+
+  event.event_type = SAI_FDB_EVENT_LEARNED;
+  event.fdb_entry = fdb_entry(3, 0x1);
+  event.bport_id = 100;
+  event.entry_type = (sai_fdb_entry_type_t) SAI_FDB_ENTRY_TYPE_DYNAMIC;
+  sai_thrift_fdb_table_apply_events(&event, 1);
+
+  changes.clear();
+  assert(sai_thrift_fdb_table_changes(start, 10, changes, version));
+  assert(version == start + 1);
+  assert(changes.size() == 1 && changes[0].seq == version);
+  assert(!sai_thrift_fdb_table_changes(version + 1, 10, changes, version));
+}
+
+int main() {
+  test_key();
+  test_learn_move_age();
+  test_flush();
+  test_version();
+  test_apply_events_publish();
+  test_snapshot_query();
+  test_snapshot_query_prefix();
+  test_cursor();
+  test_change_records();
+  test_change_log();
+  test_change_log_window();
+  test_table_changes();
+
+  std::cout << "test_fdb_table: OK" << std::endl;
+  return 0;
+}
@@ -0,0 +1,151 @@
+#undef NDEBUG
+#include <cassert>
+#include <cstring>
+#include <iostream>
+#include <vector>
+
+#include "sai_api_table.h"
+#include "sai_stats.h"
+
+sai_object_id_t gSwitchId = 0x21000000000000;
+
+// Status the bulk call returns, filling the counters on success.
+static sai_status_t gBulkStatus;
+static uint32_t gBulkCalls;
+static uint32_t gPortCalls;
+
+// Object ID the stubs fail to read.
+static const sai_object_id_t failing_port = 0x1000000000003;
+
+static uint64_t counter_value(sai_object_id_t object_id, sai_stat_id_t counter_id) {
+  return (object_id & 0xff) * 100 + counter_id;
+}
+
+extern "C" sai_status_t sai_bulk_object_get_stats(sai_object_id_t switch_id, sai_object_type_t object_type,
+                                                  uint32_t object_count, const sai_object_key_t *object_key,
+                                                  uint32_t number_of_counters, const sai_stat_id_t *counter_ids,
+                                                  sai_stats_mode_t mode, sai_status_t *object_statuses,
+                                                  uint64_t *counters) {
+  gBulkCalls++;
+  assert(switch_id == gSwitchId);
+  if (gBulkStatus == SAI_STATUS_NOT_IMPLEMENTED || gBulkStatus == SAI_STATUS_NOT_SUPPORTED) {
+    return gBulkStatus;
+  }
+  for (uint32_t i = 0; i < object_count; i++) {
+    object_statuses[i] = object_key[i].key.object_id == failing_port ? SAI_STATUS_FAILURE : SAI_STATUS_SUCCESS;
+    for (uint32_t j = 0; j < number_of_counters; j++) {
+      counters[i * number_of_counters + j] = counter_value(object_key[i].key.object_id, counter_ids[j]);
+    }
+  }
+  return gBulkStatus;
+}
+
+static sai_status_t stub_get_port_stats(sai_object_id_t port_id, uint32_t number_of_counters,
+                                        const sai_stat_id_t *counter_ids, uint64_t *counters) {
+  gPortCalls++;
+  if (port_id == failing_port) {
+    return SAI_STATUS_INVALID_PARAMETER;
+  }
+  for (uint32_t j = 0; j < number_of_counters; j++) {
+    counters[j] = counter_value(port_id, counter_ids[j]);
+  }
+  return SAI_STATUS_SUCCESS;
+}
+
+static sai_status_t stub_get_port_stats_ext(sai_object_id_t port_id, uint32_t number_of_counters,
+                                            const sai_stat_id_t *counter_ids, sai_stats_mode_t mode,
+                                            uint64_t *counters) {
+  assert(mode == SAI_STATS_MODE_READ_AND_CLEAR);
+  return stub_get_port_stats(port_id, number_of_counters, counter_ids, counters);
+}
+
+static const sai_object_id_t port_ids[] = { 0x1000000000001, 0x1000000000002, failing_port };
+static const sai_stat_id_t counter_ids[] = { 1, 2 };
+
+static sai_status_t get_stats(uint32_t object_count, sai_stats_mode_t mode, std::vector<sai_status_t> &statuses,
+                              std::vector<uint64_t> &counters) {
+  statuses.assign(object_count, SAI_STATUS_NOT_EXECUTED);
+  counters.assign(object_count * 2, 0);
+  gBulkCalls = 0;
+  gPortCalls = 0;
+  return sai_thrift_get_objects_stats(SAI_OBJECT_TYPE_PORT, object_count, port_ids, 2, counter_ids, mode,
+                                      statuses.data(), counters.data());
+}
+
+static void test_bulk() {
+  std::vector<sai_status_t> statuses;
+  std::vector<uint64_t> counters;
+
+  gBulkStatus = SAI_STATUS_SUCCESS;
+  assert(get_stats(2, SAI_STATS_MODE_READ, statuses, counters) == SAI_STATUS_SUCCESS);
+  assert(gBulkCalls == 1 && gPortCalls == 0);
+  assert(statuses[0] == SAI_STATUS_SUCCESS && statuses[1] == SAI_STATUS_SUCCESS);
+  assert(counters[0] == 101 && counters[1] == 102 && counters[2] == 201 && counters[3] == 202);
+
+  // Errors of the bulk call are returned as they are, not retried per object.
+  gBulkStatus = SAI_STATUS_FAILURE;
+  assert(get_stats(3, SAI_STATS_MODE_READ, statuses, counters) == SAI_STATUS_FAILURE);
+  assert(gBulkCalls == 1 && gPortCalls == 0);
+  assert(statuses[1] == SAI_STATUS_SUCCESS && statuses[2] == SAI_STATUS_FAILURE);
+}
+
+static void test_fallback() {
+  std::vector<sai_status_t> statuses;
+  std::vector<uint64_t> counters;
+
+  gBulkStatus = SAI_STATUS_NOT_IMPLEMENTED;
+  assert(get_stats(2, SAI_STATS_MODE_READ, statuses, counters) == SAI_STATUS_SUCCESS);
+  assert(gBulkCalls == 1 && gPortCalls == 2);
+  assert(statuses[0] == SAI_STATUS_SUCCESS && statuses[1] == SAI_STATUS_SUCCESS);
+  assert(counters[0] == 101 && counters[1] == 102 && counters[2] == 201 && counters[3] == 202);
+
+  gBulkStatus = SAI_STATUS_NOT_SUPPORTED;
+  assert(get_stats(2, SAI_STATS_MODE_READ_AND_CLEAR, statuses, counters) == SAI_STATUS_SUCCESS);
+  assert(gBulkCalls == 1 && gPortCalls == 2);
+  assert(counters[3] == 202);
+}
+
+static void test_fallback_object_statuses() {
+  std::vector<sai_status_t> statuses;
+  std::vector<uint64_t> counters;
+
+  // One unreadable object fails the call, the others are still read.
+  gBulkStatus = SAI_STATUS_NOT_IMPLEMENTED;
+  assert(get_stats(3, SAI_STATS_MODE_READ, statuses, counters) == SAI_STATUS_FAILURE);
+  assert(gPortCalls == 3);
+  assert(statuses[0] == SAI_STATUS_SUCCESS && statuses[1] == SAI_STATUS_SUCCESS);
+  assert(statuses[2] == SAI_STATUS_INVALID_PARAMETER);
+  assert(counters[2] == 201 && counters[3] == 202);
+  assert(counters[4] == 0 && counters[5] == 0);
+
+  // Objects of a type without stats.
+  statuses.assign(2, SAI_STATUS_NOT_EXECUTED);
+  counters.assign(4, 0);
+  assert(sai_thrift_get_objects_stats(SAI_OBJECT_TYPE_NULL, 2, port_ids, 2, counter_ids, SAI_STATS_MODE_READ,
+                                      statuses.data(), counters.data()) == SAI_STATUS_FAILURE);
+  assert(statuses[0] == SAI_STATUS_NOT_SUPPORTED && statuses[1] == SAI_STATUS_NOT_SUPPORTED);
+}
+
+static void test_no_objects() {
+  gBulkCalls = 0;
+  assert(sai_thrift_get_objects_stats(SAI_OBJECT_TYPE_PORT, 0, nullptr, 2, counter_ids, SAI_STATS_MODE_READ,
+                                      nullptr, nullptr) == SAI_STATUS_SUCCESS);
+  assert(gBulkCalls == 0);
+}
+
+int main() {
+  sai_port_api_t port_api;
+
+  memset(&port_api, 0, sizeof(port_api));
+  port_api.get_port_stats = stub_get_port_stats;
+  port_api.get_port_stats_ext = stub_get_port_stats_ext;
+  gSaiApiTable[SAI_API_PORT] = &port_api;
+
+  test_bulk();
+  test_fallback();
+  test_fallback_object_statuses();
+  test_no_objects();
+
+  std::cout << "test_stats: OK" << std::endl;
+  return 0;
+}